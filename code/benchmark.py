@@ -0,0 +1,384 @@
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def _make_articles(path, records, seed=0):
+    # Word counts spread across every category, long tail included
+    rng = random.Random(seed)
+    sizes = [200, 800, 3000, 12000, 30000]
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta"]
+    with open(path, "w") as file:
+        data = [
+            {"ARTICLE_ID": i, "CONTENT": " ".join(rng.choices(words, k=rng.choice(sizes)))}
+            for i in range(records)
+        ]
+        json.dump(data, file, indent=4)
+    return os.path.getsize(path)
+
+
+def bench_categorize(args):
+    from categorizeContent import categorize_parallel, categorize_stream
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "articles.json")
+        size = _make_articles(input_file, args.records)
+        print(f"Input: {args.records} records, {size / 1e6:.1f} MB")
+
+        baseline, expected = _timed(categorize_stream, input_file)
+        print(f"{'serial (stream)':<20} {baseline:8.2f}s  1.00x")
+        for workers in args.workers:
+            elapsed, result = _timed(categorize_parallel, input_file, workers=workers,
+                                     shard_bytes=args.shard_mb << 20)
+            assert result[:2] == expected[:2], "parallel counts differ from serial"
+            print(f"{f'{workers} workers':<20} {elapsed:8.2f}s  {baseline / elapsed:.2f}x")
+
+
+def _make_goldset_tsv(path, rows, seed=0):
+    rng = random.Random(seed)
+    header = ["articleText", "leagueDivision", "playerAge", "playerRank", "playercountry",
+              "playerID", "teamID", "teamName", "teamDescription", "source", "importDate"]
+    divisions = ["US", "United States", "Canada", "Mexico"]
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, delimiter="\t")
+        writer.writerow(header)
+        for i in range(rows):
+            writer.writerow([
+                f"Article text {i}", rng.choice(divisions), rng.randint(18, 40), rng.randint(1, 500),
+                "USA", f"P{i}", f"T{i % 300}", f"Team {i % 300}", "Description", "feed", "2024-01-01",
+            ])
+    return os.path.getsize(path)
+
+
+def _dictreader_rows(path):
+    # The csv.DictReader + row.get(...) path csvToJsonType2.py used before RowMapping
+    with open(path, "r", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file, delimiter="\t"):
+            yield {
+                "articleText": row.get("articleText", ""),
+                "sportsOutlet": "",
+                "eventId": "",
+                "leagueDivision": row.get("leagueDivision", ""),
+                "playerName": "",
+                "playerAge": row.get("playerAge", ""),
+                "playerRank": row.get("playerRank", ""),
+                "score": "",
+                "playercountry": row.get("playercountry", ""),
+                "playerID": row.get("playerID", ""),
+                "teamID": row.get("teamID", ""),
+                "teamName": row.get("teamName", ""),
+                "teamDescription": row.get("teamDescription", "")
+            }
+
+
+def bench_mapping(args):
+    from csvToJsonType2 import iter_json_objects
+
+    def drain(rows):
+        count = 0
+        for _ in rows:
+            count += 1
+        return count
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "goldset.tsv")
+        size = _make_goldset_tsv(input_file, args.rows)
+        print(f"Input: {args.rows} rows, {size / 1e6:.1f} MB")
+
+        assert next(_dictreader_rows(input_file)) == next(iter_json_objects(input_file))
+        baseline, _ = _timed(drain, _dictreader_rows(input_file))
+        elapsed, _ = _timed(drain, iter_json_objects(input_file))
+        print(f"{'DictReader + get':<20} {baseline:8.2f}s  {args.rows / baseline:>12,.0f} rows/s")
+        print(f"{'RowMapping':<20} {elapsed:8.2f}s  {args.rows / elapsed:>12,.0f} rows/s"
+              f"  {baseline / elapsed:.2f}x")
+
+
+def bench_durations(args):
+    import numpy as np
+    import pandas as pd
+
+    from durationParser import parse_duration, parse_duration_series
+
+    rng = np.random.default_rng(0)
+    minutes = rng.integers(0, 60, args.rows)
+    seconds = rng.random(args.rows) * 60
+    values = pd.Series([f"{m:02d}:{s:06.3f}" for m, s in zip(minutes, seconds)])
+    # A sprinkle of blanks and junk, like real exports
+    values[rng.random(args.rows) < 0.01] = None
+    values[rng.random(args.rows) < 0.01] = "N/A"
+    print(f"Input: {args.rows} values")
+
+    baseline, expected = _timed(values.apply, parse_duration)
+    elapsed, result = _timed(parse_duration_series, values)
+    expected = expected.astype("float64")
+    assert expected.isna().equals(result.isna()), "NaN positions differ from parse_duration"
+    assert np.allclose(expected.dropna(), result.dropna())
+    print(f"{'.apply(parse_duration)':<24} {baseline:8.2f}s")
+    print(f"{'parse_duration_series':<24} {elapsed:8.2f}s  {baseline / elapsed:.2f}x")
+
+
+def _make_perf_log(path, rows, seed=0):
+    # Load-test log with the columns both analyzers read, MM:SS.fff timestamps
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["requestId", "created", "updated", "status", "started_time", "ended_time",
+                         "Flag_Success"])
+        for i in range(rows):
+            start = rng.uniform(0, 3000)
+            end = start + rng.expovariate(1 / 60)
+            stamps = [f"{int(t // 60) % 60:02d}:{t % 60:06.3f}" for t in (start, end)]
+            status = rng.choices(["COMPLETED", "ERROR", "IN_PROGRESS"], [90, 7, 3])[0]
+            writer.writerow([f"r{i}", *stamps, status, *stamps, int(status == "COMPLETED")])
+
+
+def _fresh_python(code, cwd):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True,
+                            capture_output=True, text=True).stdout
+    return time.perf_counter() - start, output
+
+
+def bench_startup(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "run.csv")
+        _make_perf_log(log, args.records)
+        print(f"Input: {args.records} requests; best of {args.repeat} fresh interpreters")
+
+        imports = [
+            ("import perfAnalyzerCore", f"import sys; sys.path.insert(0, {here!r}); import perfAnalyzerCore"),
+            ("+ matplotlib.pyplot", f"import sys; sys.path.insert(0, {here!r}); import perfAnalyzerCore; "
+                                   "import matplotlib.pyplot"),
+        ]
+        for label, code in imports:
+            elapsed = min(_fresh_python(code, tmp)[0] for _ in range(args.repeat))
+            print(f"{label:<28} {elapsed:8.3f}s")
+
+        script = os.path.join(here, "perfTestAnalyzerStatus.py")
+        for label, extra in [("numbers only", ["--no-charts", "--raw-format", "none"]), ("full report", [])]:
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                output = subprocess.run([sys.executable, script, log, "--startup-time", *extra], cwd=tmp,
+                                        check=True, capture_output=True, text=True).stdout
+                total = time.perf_counter() - start
+                first_metric = float(output.rsplit("Import to first metric: ", 1)[1].rstrip().rstrip("s"))
+                best = min(best or (total, first_metric), (total, first_metric))
+            print(f"{label:<28} {best[0]:8.3f}s total, first metric after {best[1]:.3f}s")
+
+
+def _make_nested_json(path, records, seed=0):
+    # Unsorted keys, nested objects and arrays, some non-ASCII text
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "épsilon", "zeta"]
+    data = [
+        {
+            "id": i,
+            "title": " ".join(rng.choices(words, k=8)),
+            "counts": {word: rng.randint(0, 500) for word in rng.sample(words, 4)},
+            "scores": [round(rng.random(), 4) for _ in range(6)],
+            "meta": {"source": "feed", "flags": [True, None, rng.random() < 0.5]},
+        }
+        for i in range(records)
+    ]
+    with open(path, "w") as file:
+        json.dump(data, file)
+    return os.path.getsize(path)
+
+
+def bench_format(args):
+    from formatJson import format_json, orjson
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "in.json")
+        size = _make_nested_json(input_file, args.records)
+        print(f"Input: {args.records} records, {size / 1e6:.1f} MB")
+
+        outputs = {}
+        runs = [("json (original)", "json", 4), ("stream", "stream", 4)]
+        if orjson is not None:
+            runs.append(("orjson (indent 2)", "orjson", 2))
+        for label, engine, indent in runs:
+            output_file = os.path.join(tmp, f"{engine}.json")
+            elapsed, _ = _timed(format_json, input_file, output_file, engine, indent)
+            outputs[engine] = output_file
+            print(f"{label:<20} {elapsed:8.2f}s  {size / 1e6 / elapsed:8.1f} MB/s")
+
+        with open(outputs["json"], "rb") as expected, open(outputs["stream"], "rb") as result:
+            assert expected.read() == result.read(), "stream output differs from json.dump"
+
+
+def _file_hops(input_file, tmp, stages):
+    # The chained scripts: every step json.loads the previous file and json.dumps its own
+    from csvToJsonType2 import iter_json_objects
+
+    path = os.path.join(tmp, "hop0.json")
+    with open(path, "w") as file:
+        json.dump(list(iter_json_objects(input_file)), file, indent=4)
+    for i, stage in enumerate(stages, 1):
+        with open(path) as file:
+            data = json.load(file)
+        path = os.path.join(tmp, f"hop{i}.json")
+        with open(path, "w") as file:
+            json.dump(list(stage(data)), file, indent=4)
+    return path
+
+
+def bench_pipeline(args):
+    from csvToJsonType2 import iter_json_objects
+    from pipeline import MODES, CategorizeStage, FilterStage, run_pipeline
+
+    def stages():
+        return [FilterStage(["articleText", "leagueDivision"]), CategorizeStage("articleText")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "goldset.tsv")
+        size = _make_goldset_tsv(input_file, args.rows)
+        print(f"Input: {args.rows} rows, {size / 1e6:.1f} MB")
+
+        baseline, expected = _timed(_file_hops, input_file, tmp, stages())
+        print(f"{'file per step':<20} {baseline:8.2f}s  {args.rows / baseline:>12,.0f} rows/s")
+        for mode in MODES:
+            output_file = os.path.join(tmp, f"{mode}.json")
+            elapsed, _ = _timed(run_pipeline, iter_json_objects(input_file), stages(), output_file, mode=mode)
+            print(f"{'pipeline ' + mode:<20} {elapsed:8.2f}s  {args.rows / elapsed:>12,.0f} rows/s"
+                  f"  {baseline / elapsed:.2f}x")
+            with open(expected, "rb") as hops, open(output_file, "rb") as result:
+                assert hops.read() == result.read(), f"{mode} pipeline output differs from the file hops"
+
+
+def bench_columnar(args):
+    from categorizeContent import categorize_columnar, categorize_stream
+    from dataFilter import process_and_format_json
+    from formatJson import convert_columnar
+
+    with tempfile.TemporaryDirectory() as tmp:
+        articles = os.path.join(tmp, "articles.json")
+        _make_articles(articles, args.records)
+        rng = random.Random(1)
+        with open(articles) as file:
+            data = json.load(file)
+        for item in data:
+            item.update(articleText="text", sportsOutlet=rng.choice(["outlet", ""]), eventId="event",
+                        leagueDivision=rng.choice(["US", "United States", "Canada", "Mexico"]))
+        inputs = {"json": os.path.join(tmp, "in.json")}
+        with open(inputs["json"], "w") as file:
+            json.dump(data, file, indent=4)
+        del data
+        for fmt in ("parquet", "arrow"):
+            inputs[fmt] = os.path.join(tmp, f"in.{fmt}")
+            convert_columnar(inputs["json"], inputs[fmt])
+        print(f"Input: {args.records} records, "
+              + ", ".join(f"{fmt} {os.path.getsize(path) / 1e6:.1f} MB" for fmt, path in inputs.items()))
+
+        print("categorize (word counts only)")
+        baseline, expected = _timed(categorize_stream, inputs["json"])
+        print(f"{'  json (stream)':<20} {baseline:8.2f}s")
+        for fmt in ("parquet", "arrow"):
+            elapsed, result = _timed(categorize_columnar, inputs[fmt])
+            assert result[:2] == expected[:2], f"{fmt} counts differ from json"
+            print(f"{'  ' + fmt:<20} {elapsed:8.2f}s  {baseline / elapsed:.2f}x")
+
+        print("filter (same format out)")
+        kept = {}
+        for fmt, path in inputs.items():
+            elapsed, pipeline = _timed(process_and_format_json, path, os.path.join(tmp, f"out.{fmt}"))
+            kept[fmt] = pipeline.passed
+            if fmt == "json":
+                baseline = elapsed
+            print(f"{'  ' + fmt:<20} {elapsed:8.2f}s  {baseline / elapsed:.2f}x")
+        assert len(set(kept.values())) == 1, f"formats kept different records: {kept}"
+
+
+def bench_dedup(args):
+    from categorizeContent import categorize_stream
+    from dedupContent import MinHashIndex, dedup_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # _make_articles' six-word texts all look alike to shingling, so use a real-sized vocabulary
+        rng = random.Random(2)
+        vocabulary = [f"word{i}" for i in range(20000)]
+        data = [{"ARTICLE_ID": i, "CONTENT": " ".join(rng.choices(vocabulary, k=rng.choice([200, 800, 3000])))}
+                for i in range(args.records)]
+        # 30% of the output are copies: exact, or with a few words changed
+        for i in range(len(data) * 3 // 7):
+            copy = dict(rng.choice(data[:args.records]), ARTICLE_ID=len(data))
+            if i % 2:
+                words = copy["CONTENT"].split()
+                for _ in range(max(1, len(words) // 200)):
+                    words[rng.randrange(len(words))] = "omega"
+                copy["CONTENT"] = " ".join(words)
+            data.append(copy)
+        rng.shuffle(data)
+        input_file = os.path.join(tmp, "in.json")
+        with open(input_file, "w") as file:
+            json.dump(data, file, indent=4)
+        print(f"Input: {len(data)} records, {len(data) - args.records} copies, "
+              f"{os.path.getsize(input_file) / 1e6:.1f} MB")
+        del data
+
+        baseline, _ = _timed(categorize_stream, input_file)
+        print(f"{'categorize, no dedup':<24} {baseline:8.2f}s")
+        for label, near in (("exact", None), ("exact + near", MinHashIndex())):
+            output_file = os.path.join(tmp, "deduped.json")
+            elapsed, dedup = _timed(dedup_file, input_file, output_file, near=near)
+            downstream, _ = _timed(categorize_stream, output_file)
+            removed = dedup.exact + dedup.near_duplicates
+            print(f"{label:<24} {elapsed:8.2f}s dedup ({dedup.seen / dedup.seconds:,.0f} records/s, "
+                  f"{removed} removed), categorize after: {downstream:.2f}s")
+
+
+def bench_trace(args):
+    import stepTrace
+
+    def steps(make_step, n):
+        for _ in range(n):
+            with make_step("Step"):
+                pass
+
+    n = args.records
+    with tempfile.TemporaryDirectory() as tmp:
+        tracer = stepTrace.Tracer(os.path.join(tmp, "trace.json"))
+        for label, make_step in (("off", stepTrace.step), ("on", tracer.step)):
+            elapsed, _ = _timed(steps, make_step, n)
+            print(f"tracing {label:<4} {elapsed / n * 1e6:8.2f} us per step")
+        print(f"{len(tracer.steps)} steps recorded")
+
+
+BENCHMARKS = {
+    "columnar": bench_columnar,
+    "dedup": bench_dedup,
+    "durations": bench_durations,
+    "format": bench_format,
+    "categorize": bench_categorize,
+    "mapping": bench_mapping,
+    "pipeline": bench_pipeline,
+    "startup": bench_startup,
+    "trace": bench_trace,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the scripts in this folder.")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=lambda v: [int(w) for w in v.split(",")],
+                        default=[1, 2, 4, 8, os.cpu_count()])
+    parser.add_argument("--shard-mb", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    BENCHMARKS[args.name](args)
@@ -1,40 +1,231 @@
+import argparse
+import io
 import json
+import os
+from array import array
 from collections import Counter
+from multiprocessing import Pool
+
+import numpy as np
+
+from columnarStore import columnar_format
+from jsonStream import JsonArrayWriter, iter_array_shards, iter_json_array, open_writer, read_array_shard
+from stepTrace import add_trace_arguments, start_from_args, step
+from wordCountCache import WordCountCache
+from wordBuckets import DEFAULT_LABELS, BucketEngine, count_words, print_word_count_stats, word_counts
+
+CATEGORIES = DEFAULT_LABELS
+
+# Target size of one parallel work unit (bytes of input JSON)
+SHARD_BYTES = 16 << 20
+
+DEFAULT_ENGINE = BucketEngine()
+
 
 # Function to categorize content based on word count
-def categorize_content(item):
-    word_count = len(item["CONTENT"].split())
-    if word_count <= 500:
-        return "Small"
-    elif word_count <= 1000:
-        return "Medium"
-    elif word_count <= 5000:
-        return "Large"
-    elif word_count <= 25000:
-        return "XLarge"
-    else:
-        return "XXLarge"
+def categorize_content(item, engine=DEFAULT_ENGINE):
+    return engine.label(count_words(item["CONTENT"]))
+
+
+def categorize_records(data, engine=DEFAULT_ENGINE, cache=None):
+    """
+    Categorize a batch of records in place with one vectorized bucket pass.
+
+    Returns the word count of every record as an int64 array.
+    """
+    counts = word_counts(data, counter=(lambda item: cache.word_count(item, engine)) if cache else None)
+    for item, category in zip(data, engine.categories(counts)):
+        item["CATEGORY"] = category
+    return counts
+
+
+def categorize_stream(input_file, output_file=None, engine=DEFAULT_ENGINE, cache=None):
+    """
+    Categorize records one at a time with memory bounded by the largest record.
+
+    Annotated records are written to output_file (if given) as they are
+    processed. Returns (category_counts, total_records, word_counts).
+    """
+    category_counts = Counter()
+    counts = array("q")
+    writer = JsonArrayWriter(output_file, indent=4) if output_file else None
+    try:
+        for item in iter_json_array(input_file):
+            word_count = cache.word_count(item, engine) if cache else count_words(item["CONTENT"])
+            category = engine.label(word_count)
+            item["CATEGORY"] = category
+            category_counts[category] += 1
+            counts.append(word_count)
+            if writer:
+                writer.write(item)
+    finally:
+        if writer:
+            writer.close()
+    return category_counts, len(counts), np.frombuffer(counts, dtype=np.int64)
+
+
+def categorize_columnar(input_file, output_file=None, engine=DEFAULT_ENGINE, field="CONTENT"):
+    """
+    Categorize a Parquet/Arrow file, counting words with Arrow compute kernels.
 
-# Load data from a JSON file
-with open("XXLargewordformatted.json", "r") as file:
-    data = json.load(file)
+    Without an output only the `field` column is read (memory-mapped and
+    zero-copy for Arrow files). With one, batches get a CATEGORY column
+    and go to a columnar output as-is, or become records for JSON.
+    Returns (category_counts, total_records, word_counts).
+    """
+    import pyarrow as pa
+    from columnarStore import ColumnarWriter, iter_batches, read_table, word_counts as column_word_counts
+
+    if output_file is None:
+        counts = column_word_counts(read_table(input_file, columns=[field])[field])
+        return engine.category_counts(counts), len(counts), counts
+
+    shard_counts = []
+    columnar = columnar_format(output_file) is not None
+    with (ColumnarWriter(output_file) if columnar else open_writer(output_file, indent=4)) as writer:
+        for batch in iter_batches(input_file):
+            counts = column_word_counts(batch.column(field))
+            categories = engine.categories(counts)
+            shard_counts.append(counts)
+            if columnar:
+                table = pa.Table.from_batches([batch])
+                category = pa.array(categories, type=pa.string())
+                if "CATEGORY" in table.column_names:
+                    table = table.set_column(table.column_names.index("CATEGORY"), "CATEGORY", category)
+                else:
+                    table = table.append_column("CATEGORY", category)
+                writer.write_table(table)
+            else:
+                for item, category in zip(batch.to_pylist(), categories):
+                    item["CATEGORY"] = category
+                    writer.write(item)
+    counts = np.concatenate(shard_counts) if shard_counts else np.zeros(0, dtype=np.int64)
+    return engine.category_counts(counts), len(counts), counts
+
+
+def _categorize_shard(args):
+    input_file, start, end, write_output, engine = args
+    records = read_array_shard(input_file, start, end)
+    counts = categorize_records(records, engine)
+    text = None
+    if write_output:
+        # Format in the worker so the parent only concatenates text
+        formatter = JsonArrayWriter(io.StringIO(), indent=4)
+        text = formatter.separator.join(formatter.format(item) for item in records)
+    return counts, text
+
+
+def categorize_parallel(input_file, output_file=None, workers=None, shard_bytes=SHARD_BYTES,
+                        engine=DEFAULT_ENGINE):
+    """
+    Categorize records across a process pool.
+
+    The input is split into byte-range shards at record boundaries; each
+    worker parses and classifies its shard, and the per-shard Counters are
+    merged. Annotated output keeps the original record order.
+    Returns (category_counts, total_records, word_counts).
+    """
+    workers = workers or os.cpu_count()
+    shard_counts = []
+    writer = JsonArrayWriter(output_file, indent=4) if output_file else None
+    shards = ((input_file, start, end, writer is not None, engine)
+              for start, end in iter_array_shards(input_file, shard_bytes))
+    try:
+        with Pool(workers) as pool:
+            for counts, text in pool.imap(_categorize_shard, shards):
+                shard_counts.append(counts)
+                if writer:
+                    writer.write_text(text, len(counts))
+    finally:
+        if writer:
+            writer.close()
+    counts = np.concatenate(shard_counts) if shard_counts else np.zeros(0, dtype=np.int64)
+    return engine.category_counts(counts), len(counts), counts
+
+
+def print_summary(category_counts, total_records, categories=CATEGORIES):
+    # Print summary with percentages
+    print("Summary of Categories:")
+    for category in categories:
+        count = category_counts.get(category, 0)
+        percentage = (count / total_records * 100) if total_records > 0 else 0
+        print(f"{category}: {count} ({percentage:.2f}%)")
+
+    print(f"\nTotal records in file: {total_records}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Categorize content by word count.")
+    parser.add_argument("input_file", nargs="?", default="XXLargewordformatted.json",
+                        help="JSON array, or a Parquet/Arrow file (only CONTENT is read)")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse one record at a time with bounded memory")
+    parser.add_argument("--output", help="write CATEGORY-annotated records to this JSON (or, for "
+                                         "Parquet/Arrow input, .parquet/.arrow) file")
+    parser.add_argument("--workers", type=int,
+                        help="classify shards in a process pool with this many workers")
+    parser.add_argument("--shard-mb", type=float, default=SHARD_BYTES / (1 << 20),
+                        help="approximate shard size in MB for --workers (default: %(default)s)")
+    parser.add_argument("--boundaries", help="comma-separated bucket upper bounds (default: 500,1000,5000,25000)")
+    parser.add_argument("--labels", help="comma-separated bucket names, one more than --boundaries")
+    parser.add_argument("--stats", action="store_true", help="print word count percentiles and a histogram")
+    parser.add_argument("--save-counts", help="save word counts to a .npy file for re-bucketing with wordBuckets.py")
+    parser.add_argument("--cache", help="SQLite word-count cache; reruns only count new or changed articles")
+    parser.add_argument("--cache-key", help="record field to key the cache on (default: content hash)")
+    parser.add_argument("--evict-days", type=float,
+                        help="drop cache entries unseen for this many days (0: unseen in this run)")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    engine = BucketEngine.from_spec(args.boundaries, args.labels)
+    cache = WordCountCache(args.cache, args.cache_key) if args.cache else None
+    if cache and args.workers:
+        parser.error("--cache is not supported with --workers")
+
+    if columnar_format(args.input_file):
+        if cache or args.workers:
+            parser.error("--cache and --workers are not supported for Parquet/Arrow input")
+        with step("Categorize (columnar)") as categorized:
+            category_counts, total_records, counts = categorize_columnar(args.input_file, args.output, engine)
+            categorized.records = total_records
+    elif args.workers:
+        with step("Categorize (parallel)") as categorized:
+            category_counts, total_records, counts = categorize_parallel(
+                args.input_file, args.output, args.workers, int(args.shard_mb * (1 << 20)), engine)
+            categorized.records = total_records
+    elif args.stream:
+        with step("Categorize (stream)") as categorized:
+            category_counts, total_records, counts = categorize_stream(args.input_file, args.output, engine, cache)
+            categorized.records = total_records
+    else:
+        # Load data from a JSON file
+        with step("Load JSON") as loaded:
+            with open(args.input_file, "r") as file:
+                data = json.load(file)
+            loaded.records = len(data)
 
-# Count categories
-category_counts = Counter()
+        # Count categories
+        with step("Count words", records=len(data)):
+            counts = categorize_records(data, engine, cache)
+            category_counts = engine.category_counts(counts)
 
-for item in data:
-    category = categorize_content(item)
-    item["CATEGORY"] = category
-    category_counts[category] += 1
+        # Total records
+        total_records = len(data)
 
-# Total records
-total_records = len(data)
+        if args.output:
+            with step("Save output", records=total_records):
+                with open(args.output, "w") as file:
+                    json.dump(data, file, indent=4)
 
-# Print summary with percentages
-print("Summary of Categories:")
-for category in ["Small", "Medium", "Large", "XLarge", "XXLarge"]:
-    count = category_counts.get(category, 0)
-    percentage = (count / total_records * 100) if total_records > 0 else 0
-    print(f"{category}: {count} ({percentage:.2f}%)")
+    print_summary(category_counts, total_records, engine.labels)
 
-print(f"\nTotal records in file: {total_records}")
+    if args.stats:
+        print_word_count_stats(counts)
+    if args.save_counts:
+        np.save(args.save_counts, counts)
+    if cache:
+        if args.evict_days is not None:
+            cache.evict_stale(args.evict_days)
+        cache.print_stats()
+        cache.close()
@@ -0,0 +1,261 @@
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = ds = ipc = pq = None
+
+# Suffix -> columnar format; "arrow" is the Arrow IPC file format (Feather v2)
+COLUMNAR_SUFFIXES = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+COLUMNAR_FORMATS = ["parquet", "arrow"]
+
+# Records buffered per row group / record batch when writing record by record
+BATCH_ROWS = 64_000
+
+# Texts counted at once by word_counts()
+WORD_BATCH_ROWS = 2048
+WORD_BATCH_BYTES = 8 << 20
+
+# Bytes str.split() treats as whitespace, for the ASCII fast path
+_ASCII_SPACE = np.zeros(256, dtype=bool)
+_ASCII_SPACE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+
+
+def columnar_format(path):
+    """
+    "parquet" or "arrow" for a columnar file name, else None.
+    """
+    return COLUMNAR_SUFFIXES.get(os.path.splitext(os.fspath(path))[1].lower())
+
+
+def require_arrow():
+    if pa is None:
+        raise ImportError("Parquet/Arrow files require the pyarrow package")
+
+
+def _settle(schema):
+    # Columns that were all None in the first batch become strings, not nulls
+    return pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                      for field in schema])
+
+
+class ColumnarWriter:
+    """
+    Write records to a Parquet or Arrow IPC file in row groups.
+
+    Accepts single records (buffered batch_rows at a time, like the JSON
+    writers' write()) or whole Arrow tables / DataFrames. The schema is the
+    one given, or taken from the first batch; later records are cast to it
+    and keys it does not have are dropped.
+
+    Parquet is zstd-compressed by default; Arrow files are left uncompressed
+    so that reading them through a memory map is zero-copy.
+    """
+
+    def __init__(self, path, fmt=None, schema=None, batch_rows=BATCH_ROWS, compression="infer"):
+        require_arrow()
+        self.path = path
+        self.fmt = fmt or columnar_format(path) or "parquet"
+        if self.fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {self.fmt}")
+        self.schema = schema
+        self.batch_rows = batch_rows
+        if compression == "infer":
+            compression = "zstd" if self.fmt == "parquet" else None
+        self.compression = compression
+        self.count = 0
+        self._buffer = []
+        self._writer = None
+
+    def _open(self, schema):
+        self.schema = schema
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression)
+        else:
+            options = ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = ipc.new_file(self.path, schema, options=options)
+
+    def write_table(self, table):
+        """
+        Append an Arrow table or a pandas DataFrame.
+        """
+        if not isinstance(table, pa.Table):
+            table = pa.Table.from_pandas(table, schema=self.schema, preserve_index=False)
+        if self._writer is None:
+            self._open(self.schema or _settle(table.schema))
+        if table.schema != self.schema:
+            table = table.select(self.schema.names).cast(self.schema)
+        self._writer.write_table(table)
+        self.count += len(table)
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            records, self._buffer = self._buffer, []
+            self.write_table(pa.Table.from_pylist(records, schema=self.schema))
+
+    def close(self):
+        self.flush()
+        if self._writer is None:
+            # No rows at all: still leave a valid (empty) file behind
+            self._open(self.schema or pa.schema([]))
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _dataset(path):
+    require_arrow()
+    fmt = columnar_format(path) or "parquet"
+    return ds.dataset(path, format="ipc" if fmt == "arrow" else "parquet")
+
+
+def read_table(path, columns=None, filter=None, memory_map=True):
+    """
+    Load only `columns` of the rows matching `filter` (a pyarrow.compute expression).
+
+    Parquet skips row groups whose statistics rule the filter out and never
+    decodes the other columns. Arrow IPC files are memory-mapped, so
+    selecting columns is zero-copy and only the pages touched are read.
+    """
+    require_arrow()
+    if columnar_format(path) == "arrow":
+        source = pa.memory_map(path) if memory_map else pa.OSFile(path)
+        table = ipc.open_file(source).read_all()
+        if filter is not None:
+            table = table.filter(filter)
+        return table.select(columns) if columns is not None else table
+    return pq.read_table(path, columns=columns, filters=filter, memory_map=memory_map)
+
+
+def iter_batches(path, columns=None, filter=None, batch_rows=BATCH_ROWS):
+    """
+    Stream record batches of `columns` matching `filter`, with bounded memory.
+    """
+    return _dataset(path).to_batches(columns=columns, filter=filter, batch_size=batch_rows)
+
+
+def iter_records(path, columns=None, filter=None, batch_rows=BATCH_ROWS):
+    """
+    Yield the rows of a Parquet/Arrow file as dicts, one batch decoded at a time.
+    """
+    for batch in iter_batches(path, columns, filter, batch_rows):
+        yield from batch.to_pylist()
+
+
+def read_schema(path):
+    """
+    Column names and types, from the file metadata (no data is read).
+    """
+    return _dataset(path).schema
+
+
+def truthy(name, type):
+    """
+    Expression for a column being truthy the way `if item.get(name)` is.
+
+    Nulls are always false; so are "" for strings, 0 for numbers and False.
+    """
+    field = pc.field(name)
+    if pa.types.is_string(type) or pa.types.is_large_string(type):
+        return field.is_valid() & (field != "")
+    if pa.types.is_boolean(type):
+        return field == True  # noqa: E712  (an Arrow expression, not a Python comparison)
+    if pa.types.is_integer(type) or pa.types.is_floating(type):
+        return field.is_valid() & (field != 0)
+    return field.is_valid()
+
+
+def count_rows(path, filter=None):
+    """
+    Number of rows, from the file metadata (no data is read).
+
+    With a filter, the matching rows are counted a batch at a time, decoding
+    only the columns the filter needs.
+    """
+    if filter is None:
+        return _dataset(path).count_rows()
+    return sum(batch.num_rows for batch in iter_batches(path, columns=[], filter=filter))
+
+
+def _offsets(piece):
+    offset_type = np.int64 if pa.types.is_large_string(piece.type) else np.int32
+    return np.frombuffer(piece.buffers()[1], dtype=offset_type)[piece.offset:piece.offset + len(piece) + 1]
+
+
+def _slices(strings, rows, max_bytes):
+    # Zero-copy slices of at most `rows` values and (unless one value is
+    # bigger) max_bytes of text
+    chunks = strings.chunks if isinstance(strings, pa.ChunkedArray) else [strings]
+    for chunk in chunks:
+        offsets = _offsets(chunk)
+        start = 0
+        while start < len(chunk):
+            end = int(np.searchsorted(offsets, offsets[start] + max_bytes, side="right")) - 1
+            end = min(max(end, start + 1), start + rows, len(chunk))
+            yield chunk.slice(start, end - start)
+            start = end
+
+
+def _ascii_word_counts(piece):
+    # Count word starts (a non-space byte after a space or a string start)
+    # straight from the UTF-8 buffer; None if any byte is non-ASCII
+    offsets = _offsets(piece)
+    data = piece.buffers()[2]
+    data = np.frombuffer(data, dtype=np.uint8)[offsets[0]:offsets[-1]] if data is not None \
+        else np.zeros(0, dtype=np.uint8)
+    if (data >= 0x80).any():
+        return None
+    counts = np.zeros(len(piece), dtype=np.int64)
+    if not len(data):
+        return counts
+    space = _ASCII_SPACE[data]
+    starts = np.empty(len(data), dtype=bool)
+    starts[0] = True
+    starts[1:] = space[:-1]
+    bounds = (offsets - offsets[0]).astype(np.int64)
+    nonempty = bounds[1:] > bounds[:-1]
+    starts[bounds[:-1][nonempty]] = True
+    starts &= ~space
+    counts[nonempty] = np.add.reduceat(starts, bounds[:-1][nonempty], dtype=np.int64)
+    if piece.null_count:
+        counts[piece.is_null().to_numpy(zero_copy_only=False)] = 0
+    return counts
+
+
+def word_counts(strings, batch_rows=WORD_BATCH_ROWS, batch_bytes=WORD_BATCH_BYTES):
+    """
+    Words per value of an Arrow string array, same as len(text.split()); nulls count 0.
+
+    All-ASCII slices are counted on the raw bytes with numpy. Otherwise
+    Arrow's whitespace split, which uses the same Unicode whitespace as
+    str.split(), does it; trimming first leaves no empty words but an empty
+    text's single "". Zero-copy slices of up to batch_rows values /
+    batch_bytes of text are handled at a time, so the temporaries stay small.
+    """
+    counts = np.zeros(len(strings), dtype=np.int64)
+    position = 0
+    for piece in _slices(strings, batch_rows, batch_bytes):
+        words = _ascii_word_counts(piece)
+        if words is None:
+            trimmed = pc.utf8_trim_whitespace(piece)
+            split = pc.list_value_length(pc.utf8_split_whitespace(trimmed))
+            empty = pc.equal(pc.binary_length(trimmed), 0).cast(split.type)
+            words = pc.fill_null(pc.subtract(split, empty), 0).to_numpy()
+        counts[position:position + len(piece)] = words
+        position += len(piece)
+    return counts
@@ -1,23 +1,36 @@
-import pandas as pd
-print(pd.__version__)
+import argparse
 import csv
+import warnings
+
+import pandas as pd
+
+from columnarStore import COLUMNAR_FORMATS, ColumnarWriter, columnar_format
+from jsonStream import open_text
+from schemaMapping import RowMapping
+from stepTrace import add_trace_arguments, start_from_args, step
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
 
-# Increase field size limit to handle large cells
+# Increase field size limit to handle large cells (python engine / csv module only;
+# the C and pyarrow parsers have no per-field limit)
 csv.field_size_limit(2_000_000)
 
 # Define the CSV file path
-csv_file = "GOLDSET.csv"
+CSV_FILE = "GOLDSET.csv"
+CLEAN_CSV_FILE = "Cleaned_GOLDSET.csv"
+OUTPUT_JSON_FILE = "JSONOutput.json"
 
-# Use ONLY this - do NOT include error_bad_lines or warn_bad_lines
-try:
-    df = pd.read_csv(csv_file, encoding="utf-8", on_bad_lines='skip', engine="python")
-except Exception as e:
-    print(f"Error reading CSV: {e}")
-    exit()
+# Errors reading or parsing the input CSV, reported without a traceback
+READ_ERRORS = (OSError, UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError) + \
+              ((pa.ArrowInvalid,) if pa is not None else ())
 
-# Print actual column names
-print("Actual column names in CSV:")
-print(df.columns.tolist())
+# Rows per chunk for the C engine; bytes per block for pyarrow (must exceed the longest row)
+CHUNK_ROWS = 50_000
+BLOCK_BYTES = 64 << 20
 
 # Define expected columns
 columns_to_extract = [
@@ -27,23 +40,274 @@ columns_to_extract = [
     "LANGUAGE_ORIGINAL"
 ]
 
-# Check for missing columns
-missing_columns = [col for col in columns_to_extract if col not in df.columns]
-if missing_columns:
-    print(f"Missing columns in CSV: {missing_columns}")
-else:
-    print("All expected columns found!")
+# Output keys are the CSV column names; edit the mapping to rename or add constants
+column_mapping = RowMapping([(col, col) for col in columns_to_extract])
+
+
+def read_columns(csv_file):
+    """
+    Read only the header row and return the column names.
+    """
+    return pd.read_csv(csv_file, encoding="utf-8", nrows=0).columns.tolist()
+
+
+def check_columns(actual_columns):
+    """
+    Report missing expected columns and return the ones present, in expected order.
+    """
+    missing_columns = [col for col in columns_to_extract if col not in actual_columns]
+    if missing_columns:
+        print(f"Missing columns in CSV: {missing_columns}")
+    else:
+        print("All expected columns found!")
+    return [col for col in columns_to_extract if col in actual_columns]
+
+
+class BadLineCounter:
+    def __init__(self):
+        self.count = 0
+
+    def skip(self, row):
+        # pyarrow invalid_row_handler: count the row and drop it
+        self.count += 1
+        return "skip"
+
+
+def _count_skipped(caught):
+    count = sum(str(w.message).count("Skipping line") for w in caught)
+    caught.clear()
+    return count
+
+
+def _read_c_chunks(csv_file, dtype, bad_lines, chunk_rows, usecols=None):
+    # The C parser only drops rows with extra fields (and warns) without usecols;
+    # with it they are kept, truncated to the selected columns
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+        reader = pd.read_csv(csv_file, encoding="utf-8", engine="c", on_bad_lines="warn",
+                             usecols=usecols, dtype=dtype, chunksize=chunk_rows)
+        for chunk in reader:
+            bad_lines.count += _count_skipped(caught)
+            yield chunk
+        bad_lines.count += _count_skipped(caught)
+
+
+def infer_dtypes(csv_file, columns, chunk_rows=CHUNK_ROWS, usecols=None):
+    """
+    Column dtypes as pandas infers them reading the whole file at once.
+
+    One pass in chunks: a column keeps its dtype if every chunk agrees
+    (int64, float64, bool), becomes float64 if chunks mix integers and
+    floats (e.g. IDs with blanks), and text otherwise.
+    """
+    found = {col: set() for col in columns}
+    # Columns that are not extracted are read as text, skipping their inference
+    dtype = {col: str for col in read_columns(csv_file) if col not in found}
+    for chunk in _read_c_chunks(csv_file, dtype, BadLineCounter(), chunk_rows, usecols):
+        for col in columns:
+            found[col].add(chunk[col].dtype)
+    dtypes = {}
+    for col, seen in found.items():
+        if len(seen) == 1 and next(iter(seen)).kind in "iufb":
+            dtypes[col] = next(iter(seen))
+        elif seen and all(dtype.kind in "iuf" for dtype in seen):
+            dtypes[col] = "float64"
+        else:
+            dtypes[col] = str
+    return dtypes
+
+
+def _iter_pyarrow_chunks(csv_file, columns, bad_lines, block_bytes):
+    reader = pa_csv.open_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(encoding="utf-8", block_size=block_bytes),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=bad_lines.skip),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={col: pa.string() for col in columns},
+            strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def _iter_c_chunks(csv_file, columns, bad_lines, chunk_rows, infer_types=False, skip_long_rows=True):
+    # Skipping rows with extra fields needs every column parsed (as text, then
+    # dropped); without that only `columns` are read
+    usecols = None if skip_long_rows else columns
+    dtype = {col: str for col in columns}
+    if infer_types:
+        dtype = infer_dtypes(csv_file, columns, chunk_rows, usecols)
+    if usecols is None:
+        dtype.update({col: str for col in read_columns(csv_file) if col not in dtype})
+    # Rows with too few fields are kept with the missing cells empty, as the python engine does
+    for chunk in _read_c_chunks(csv_file, dtype, bad_lines, chunk_rows, usecols):
+        yield chunk[columns]
+
+
+def iter_chunks(csv_file, columns, bad_lines, engine="c", chunk_rows=CHUNK_ROWS,
+                block_bytes=BLOCK_BYTES, infer_types=False, skip_long_rows=True):
+    """
+    Yield DataFrames of only `columns`, skipping bad lines into `bad_lines`.
+
+    Peak memory is proportional to one chunk, not to the file. The c engine
+    reads the file once as text and keeps rows with too few fields, like the
+    python engine. infer_types adds a first pass so the column types match
+    the original in-memory read too. skip_long_rows=False reads only
+    `columns`, keeping rows with extra fields (truncated) instead of
+    skipping and counting them. The pyarrow engine also reads text but
+    skips rows with too few fields.
+    """
+    if engine == "pyarrow":
+        if pa_csv is None:
+            raise ImportError("engine='pyarrow' requires the pyarrow package")
+        return _iter_pyarrow_chunks(csv_file, columns, bad_lines, block_bytes)
+    if engine == "c":
+        return _iter_c_chunks(csv_file, columns, bad_lines, chunk_rows, infer_types, skip_long_rows)
+    raise ValueError(f"Unsupported chunked engine: {engine}")
+
+
+def iter_csv_records(csv_file, engine="c", chunk_rows=CHUNK_ROWS, block_bytes=BLOCK_BYTES, infer_types=False,
+                     skip_long_rows=True):
+    """
+    Yield the mapped records of csv_file one dict at a time (missing cells -> None).
+
+    Same rows and keys as convert_chunked() writes, for in-process consumers.
+    """
+    columns = [col for col in columns_to_extract if col in read_columns(csv_file)]
+    bad_lines = BadLineCounter()
+    for chunk in iter_chunks(csv_file, columns, bad_lines, engine, chunk_rows, block_bytes, infer_types,
+                             skip_long_rows):
+        if chunk.empty:
+            continue
+        chunk = column_mapping.map_frame(chunk, fill_missing=False)
+        yield from chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+
+
+def _records_text(df):
+    # Body of df.to_json(orient="records", indent=4) without the outer brackets
+    return df.to_json(orient="records", indent=4)[1:-1].strip("\n")
+
+
+def convert_chunked(csv_file, clean_csv_file, output_json_file, engine="c",
+                    chunk_rows=CHUNK_ROWS, block_bytes=BLOCK_BYTES, fmt="json",
+                    compression="infer", infer_types=False, skip_long_rows=True):
+    """
+    Write the cleaned CSV and the JSON records chunk by chunk.
+
+    fmt="json" writes the indented records array, fmt="jsonl" compact JSON
+    Lines (optionally gzip/zstd compressed), fmt="parquet"/"arrow" a columnar
+    file with one row group per chunk. Returns (rows written, bad lines skipped).
+    """
+    actual_columns = read_columns(csv_file)
+    print("Actual column names in CSV:")
+    print(actual_columns)
+    columns = check_columns(actual_columns)
+    bad_lines = BadLineCounter()
+    rows = 0
+    columnar = fmt in COLUMNAR_FORMATS
+    with open(clean_csv_file, "w", newline="", encoding="utf-8") as csv_out, \
+            (ColumnarWriter(output_json_file, fmt) if columnar
+             else open_text(output_json_file, "w", compression, "utf-8")) as json_out:
+        if fmt == "json":
+            json_out.write("[\n")
+        for chunk in iter_chunks(csv_file, columns, bad_lines, engine, chunk_rows, block_bytes, infer_types,
+                                 skip_long_rows):
+            if chunk.empty:
+                continue
+            chunk = column_mapping.map_frame(chunk, fill_missing=False)
+            chunk.to_csv(csv_out, index=False, header=rows == 0)
+            if columnar:
+                json_out.write_table(chunk)
+            elif fmt == "json":
+                json_out.write(",\n" if rows else "")
+                json_out.write(_records_text(chunk))
+            else:
+                json_out.write(chunk.to_json(orient="records", lines=True, force_ascii=False))
+            rows += len(chunk)
+        if fmt == "json":
+            json_out.write("\n]")
+    return rows, bad_lines.count
+
+
+def convert_in_memory(csv_file, clean_csv_file, output_json_file, fmt="json", compression="infer"):
+    """
+    Original path: load the whole file with the python engine, then select columns.
+    """
+    # Use ONLY this - do NOT include error_bad_lines or warn_bad_lines
+    df = pd.read_csv(csv_file, encoding="utf-8", on_bad_lines='skip', engine="python")
+
+    # Print actual column names
+    print("Actual column names in CSV:")
+    print(df.columns.tolist())
+
+    # Keep only valid columns
+    df = column_mapping.map_frame(df[check_columns(df.columns)], fill_missing=False)
+
+    # Save cleaned CSV
+    df.to_csv(clean_csv_file, index=False)
+
+    # Convert to JSON
+    if fmt in COLUMNAR_FORMATS:
+        with ColumnarWriter(output_json_file, fmt) as writer:
+            writer.write_table(df)
+    elif fmt == "jsonl":
+        df.to_json(output_json_file, orient="records", lines=True, force_ascii=False,
+                   compression=compression)
+    else:
+        df.to_json(output_json_file, orient="records", indent=4, compression=compression)
+    return len(df)
+
 
-# Keep only valid columns
-df = df[[col for col in columns_to_extract if col in df.columns]]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract GOLDSET columns to CSV and JSON.")
+    parser.add_argument("csv_file", nargs="?", default=CSV_FILE)
+    parser.add_argument("--engine", choices=["c", "pyarrow", "python"], default="c",
+                        help="c: one pass in chunks, extracted columns as text (default); pyarrow: "
+                             "chunks, all text, also skips rows with too few fields; python: loads everything")
+    parser.add_argument("--infer-types", action="store_true",
+                        help="c engine: an extra first pass so the column types match the python engine "
+                             "(IDs as 0, not \"0\")")
+    parser.add_argument("--keep-long-rows", action="store_true",
+                        help="c engine: parse only the extracted columns (faster); rows with too many fields "
+                             "are kept, truncated, instead of skipped and counted")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk (c engine)")
+    parser.add_argument("--block-mb", type=int, default=BLOCK_BYTES >> 20,
+                        help="MB per block (pyarrow engine); must exceed the longest row")
+    parser.add_argument("--clean-csv", default=CLEAN_CSV_FILE)
+    parser.add_argument("--output", default=OUTPUT_JSON_FILE)
+    parser.add_argument("--format", choices=["json", "jsonl"] + COLUMNAR_FORMATS,
+                        help="json: indented array (default); jsonl: compact JSON Lines; "
+                             "parquet/arrow: columnar (default for .parquet/.arrow/.feather outputs)")
+    parser.add_argument("--compress", choices=["gzip", "zstd"],
+                        help="compress the JSON output (default: from the .gz/.zst suffix)")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
 
-# Save cleaned CSV
-clean_csv_file = "Cleaned_GOLDSET.csv"
-df.to_csv(clean_csv_file, index=False)
+    print(pd.__version__)
+    fmt = args.format or columnar_format(args.output) or "json"
 
-# Convert to JSON
-output_json_file = "JSONOutput.json"
-df.to_json(output_json_file, orient="records", indent=4)
+    try:
+        with step(f"Convert CSV ({args.engine})") as convert:
+            if args.engine == "python":
+                rows = convert_in_memory(args.csv_file, args.clean_csv, args.output,
+                                         fmt, args.compress or "infer")
+            else:
+                rows, bad_line_count = convert_chunked(args.csv_file, args.clean_csv, args.output,
+                                                       args.engine, args.chunk_rows, args.block_mb << 20,
+                                                       fmt, args.compress or "infer", args.infer_types,
+                                                       not args.keep_long_rows)
+            convert.records = rows
+        if args.engine != "python":
+            print(f"Rows written: {rows}, bad lines skipped: {bad_line_count}")
+    except READ_ERRORS as e:
+        # Only failures reading the input; errors writing the outputs propagate
+        if isinstance(e, OSError) and e.filename != args.csv_file:
+            raise
+        print(f"Error reading CSV: {e}")
+        exit()
 
-print(f"Cleaned CSV saved as {clean_csv_file}")
-print(f"JSON output saved as {output_json_file}")
+    print(f"Cleaned CSV saved as {args.clean_csv}")
+    print(f"JSON output saved as {args.output}")
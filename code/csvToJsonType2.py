@@ -1,5 +1,10 @@
+import argparse
 import csv
-import json
+
+from columnarStore import columnar_format
+from jsonStream import open_writer
+from schemaMapping import Constant, RowMapping, iter_mapped_rows
+from stepTrace import add_trace_arguments, start_from_args, step
 
 # Increase the field size limit to a reasonably large value
 csv.field_size_limit(1000000)  # You can adjust this value as needed
@@ -8,32 +13,61 @@ csv.field_size_limit(1000000)  # You can adjust this value as needed
 input_csv_file = 'GOLDSET.csv'
 output_json_file = 'Formatted_Output.json'
 
-# Initialize a list to store the JSON objects
-json_data = []
-
-# Read data from the CSV file and convert it to JSON
-with open(input_csv_file, 'r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file, delimiter='\t')
-    for row in csv_reader:
-        json_object = {
-            "articleText": row.get("articleText", ""),
-            "sportsOutlet": "",
-            "eventId": "",
-            "leagueDivision": row.get("leagueDivision", ""),
-            "playerName": "",
-            "playerAge": row.get("playerAge", ""),
-            "playerRank": row.get("playerRank", ""),
-            "score": "",
-            "playercountry": row.get("playercountry", ""),
-            "playerID": row.get("playerID", ""),
-            "teamID": row.get("teamID", ""),
-            "teamName": row.get("teamName", ""),
-            "teamDescription": row.get("teamDescription", "")
-        }
-        json_data.append(json_object)
-
-# Write the JSON data to the output file
-with open(output_json_file, 'w', encoding='utf-8') as json_file:
-    json.dump(json_data, json_file, indent=2)
-
-print(f"Data from '{input_csv_file}' has been converted and saved to '{output_json_file}'.")
+
+# Output key -> input column; the blank fields are filled in later stages
+json_mapping = RowMapping([
+    ("articleText", "articleText"),
+    ("sportsOutlet", Constant("")),
+    ("eventId", Constant("")),
+    ("leagueDivision", "leagueDivision"),
+    ("playerName", Constant("")),
+    ("playerAge", "playerAge"),
+    ("playerRank", "playerRank"),
+    ("score", Constant("")),
+    ("playercountry", "playercountry"),
+    ("playerID", "playerID"),
+    ("teamID", "teamID"),
+    ("teamName", "teamName"),
+    ("teamDescription", "teamDescription"),
+])
+
+
+def iter_json_objects(input_csv_file):
+    """
+    Yield one output object per row of the tab-separated input.
+    """
+    return iter_mapped_rows(input_csv_file, json_mapping, delimiter='\t')
+
+
+def convert(input_csv_file, output_json_file, fmt="json", compression="infer"):
+    """
+    Stream rows straight to the output file; returns the number of records.
+
+    fmt="json" writes the original indented array, fmt="jsonl" compact JSON
+    Lines, fmt="parquet"/"arrow" a columnar file.
+    """
+    with open_writer(output_json_file, fmt, indent=2, compression=compression,
+                     encoding="utf-8") as writer:
+        for json_object in iter_json_objects(input_csv_file):
+            writer.write(json_object)
+        return writer.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the tab-separated GOLDSET export to JSON.")
+    parser.add_argument("input", nargs="?", default=input_csv_file)
+    parser.add_argument("output", nargs="?", default=output_json_file)
+    parser.add_argument("--format", choices=["json", "jsonl", "parquet", "arrow"],
+                        help="json: indented array; jsonl: compact JSON Lines; parquet/arrow: columnar "
+                             "(default: json, or columnar for .parquet/.arrow/.feather outputs)")
+    parser.add_argument("--compress", choices=["gzip", "zstd"],
+                        help="compress the output (default: from the .gz/.zst suffix)")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    fmt = args.format or columnar_format(args.output) or "json"
+    with step("Convert TSV") as converted:
+        converted.records = convert(args.input, args.output, fmt, args.compress or "infer")
+
+    print(f"Data from '{args.input}' has been converted and saved to '{args.output}'.")
@@ -1,45 +1,420 @@
+import argparse
+import io
 import json
+import os
+import re
 import uuid
+from collections import OrderedDict
 
-def is_valid_content(item):
+from columnarStore import columnar_format
+from jsonStream import JsonArrayWriter, JsonLinesWriter, iter_records, open_writer
+from stepTrace import add_trace_arguments, start_from_args, step
+
+REQUIRED_FIELDS = ["articleText", "sportsOutlet", "eventId", "leagueDivision"]
+
+# Variations of the U.S. jurisdiction name to match
+US_JURISDICTIONS = frozenset(["United States of America", "US", "United States"])
+
+
+def is_valid_content(item, required_fields=REQUIRED_FIELDS):
     """
     Check if the item has all required fields and is valid.
     """
-    required_fields = ["articleText", "sportsOutlet", "eventId", "leagueDivision"]
-    
     # Check if all required fields are present and non-empty
     for field in required_fields:
         if not item.get(field):
             return False  # Invalid if any required field is missing or empty
-    
+
     return True
 
+
+def has_fields(fields):
+    """
+    is_valid_content() as a one-argument predicate for any list of required fields.
+    """
+    fields = list(fields)
+
+    def predicate(item):
+        return is_valid_content(item, fields)
+
+    # Rejects are reported under the same name as with is_valid_content itself
+    predicate.__name__ = is_valid_content.__name__
+    return predicate
+
+
+def normalize_value(value):
+    """
+    Case- and whitespace-insensitive form of a value ("  united  STATES " -> "united states").
+    """
+    return " ".join(str(value).split()).casefold()
+
+
+def field_in(field, values, normalize=False):
+    """
+    Build a predicate that checks item[field] against a set of values.
+
+    With normalize=True both sides are compared after normalize_value().
+    """
+    if normalize:
+        allowed = frozenset(normalize_value(value) for value in values)
+
+        def predicate(item):
+            value = item.get(field)
+            return value is not None and normalize_value(value) in allowed
+    else:
+        allowed = frozenset(values)
+
+        def predicate(item):
+            return item.get(field) in allowed
+
+    predicate.__name__ = f"{field}_in"
+    return predicate
+
+
 def filter_us_data(data):
     """
     Filter the data to keep only U.S. jurisdiction items.
     """
-    us_jurisdictions = ["United States of America", "US", "United States"]  # List of variations to match
-    filtered_data = [item for item in data if item.get("leagueDivision") in us_jurisdictions]
-    
+    filtered_data = [item for item in data if item.get("leagueDivision") in US_JURISDICTIONS]
+
     return filtered_data
 
-def process_and_format_json(input_file, output_file):
-    # Load the input data from the JSON file
-    with open(input_file, 'r') as infile:
-        input_data = json.load(infile)
-    
-    # Filter out invalid content
-    valid_data = [item for item in input_data if is_valid_content(item)]
-    
-    # Filter for U.S. jurisdiction
-    us_data = filter_us_data(valid_data)
-    
+
+class FilterPipeline:
+    """
+    Apply any number of predicates to a stream of records in a single pass.
+
+    Records are yielded as soon as they pass every predicate; the first
+    predicate that rejects a record gets the reject counted against it.
+    """
+
+    def __init__(self, predicates=()):
+        self.names = []
+        self.predicates = []
+        self.seen = 0
+        self.passed = 0
+        self._rejected = []
+        for predicate in predicates:
+            if isinstance(predicate, tuple):
+                self.add(*predicate)
+            else:
+                self.add(predicate.__name__, predicate)
+
+    def add(self, name, predicate):
+        self.names.append(name)
+        self.predicates.append(predicate)
+        self._rejected.append(0)
+        return self
+
+    def add_counts(self, seen, rejected):
+        """
+        Record counts computed outside run(), e.g. by a columnar filter;
+        `rejected` lists the rejects of each predicate, in order.
+        """
+        rejected = list(rejected)
+        if len(rejected) != len(self.predicates):
+            raise ValueError(f"Expected {len(self.predicates)} reject counts, got {len(rejected)}")
+        self.seen += seen
+        self.passed += seen - sum(rejected)
+        for i, count in enumerate(rejected):
+            self._rejected[i] += count
+        return self
+
+    @property
+    def rejected(self):
+        return dict(zip(self.names, self._rejected))
+
+    def run(self, records):
+        predicates = list(enumerate(self.predicates))
+        rejected = self._rejected
+        for item in records:
+            self.seen += 1
+            for i, predicate in predicates:
+                if not predicate(item):
+                    rejected[i] += 1
+                    break
+            else:
+                self.passed += 1
+                yield item
+
+    def print_report(self):
+        print(f"Records read: {self.seen}, kept: {self.passed}")
+        for name, count in self.rejected.items():
+            print(f"  rejected by {name}: {count}")
+
+
+def process_and_format_json(input_file, output_file, jurisdictions=US_JURISDICTIONS,
+                            normalize=False, fmt=None):
+    """
+    Stream valid items of the given jurisdictions from input_file to output_file.
+
+    Input and output may be JSON arrays, JSON Lines or Parquet/Arrow (by
+    suffix); survivors are written as they are found. Returns the
+    FilterPipeline with its counters.
+    """
+    if columnar_format(input_file):
+        return filter_columnar(input_file, output_file, jurisdictions, normalize, fmt)
+
+    pipeline = FilterPipeline([
+        is_valid_content,
+        field_in("leagueDivision", jurisdictions, normalize),
+    ])
+
     # Save the filtered data to the output JSON file
-    with open(output_file, 'w') as outfile:
-        json.dump(us_data, outfile, indent=4)
+    with open_writer(output_file, fmt, indent=4) as writer:
+        for item in pipeline.run(iter_records(input_file)):
+            writer.write(item)
+
+    return pipeline
+
+
+def filter_expression(input_file, required=REQUIRED_FIELDS, jurisdictions=US_JURISDICTIONS,
+                      field="leagueDivision", normalize=False):
+    """
+    (required-fields expression, jurisdiction expression) for a Parquet/Arrow file.
+
+    Same tests as is_valid_content() and field_in(). With normalize=True the
+    distinct values of `field` are read (that column only) and the raw
+    spellings that normalize to an allowed value are matched exactly.
+    """
+    import pyarrow.compute as pc
+    from columnarStore import read_schema, read_table, truthy
+
+    schema = read_schema(input_file)
+    if any(name not in schema.names for name in list(required) + [field]):
+        # A column that does not exist is missing from every record
+        return pc.scalar(False), pc.scalar(False)
+    valid = pc.scalar(True)
+    for name in required:
+        valid = valid & truthy(name, schema.field(name).type)
+
+    values = list(jurisdictions)
+    if normalize:
+        allowed = frozenset(normalize_value(value) for value in values)
+        distinct = pc.unique(read_table(input_file, columns=[field])[field]).to_pylist()
+        values = [value for value in distinct if value is not None and normalize_value(value) in allowed]
+    return valid, pc.field(field).isin(values)
+
+
+def filter_columnar(input_file, output_file, jurisdictions=US_JURISDICTIONS, normalize=False, fmt=None):
+    """
+    process_and_format_json() for a Parquet/Arrow input.
+
+    The reject counts come from the filter columns alone; the output read
+    pushes the filter down, so only matching rows are decoded (Parquet skips
+    row groups whose statistics rule them out) and rows never become dicts
+    when the output is columnar too. Returns a FilterPipeline with the counters.
+    """
+    from columnarStore import ColumnarWriter, count_rows, iter_records as iter_columnar_records, read_table
+
+    valid, in_jurisdiction = filter_expression(input_file, REQUIRED_FIELDS, jurisdictions,
+                                               "leagueDivision", normalize)
+    expression = valid & in_jurisdiction
+    # Counted a batch at a time, so long text columns are never held whole
+    seen = count_rows(input_file)
+    after_valid = count_rows(input_file, valid)
+    passed = count_rows(input_file, expression)
+    pipeline = FilterPipeline([
+        is_valid_content,
+        field_in("leagueDivision", jurisdictions, normalize),
+    ]).add_counts(seen, [seen - after_valid, after_valid - passed])
+
+    if (fmt or columnar_format(output_file)) in ("parquet", "arrow"):
+        with ColumnarWriter(output_file, fmt) as writer:
+            writer.write_table(read_table(input_file, filter=expression))
+    else:
+        with open_writer(output_file, fmt, indent=4) as writer:
+            for item in iter_columnar_records(input_file, filter=expression):
+                writer.write(item)
+    return pipeline
+
+
+def partition_file_name(value):
+    """
+    File-system safe stem for a partition value.
+    """
+    if value is None:
+        return "_missing"
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(value)).strip("._") or "_empty"
+
+
+# Partition files are reopened in append mode, which only text formats allow
+PARTITION_FORMATS = ["json", "jsonl"]
+
+
+class PartitionWriter:
+    """
+    Route records to one output file per partition value.
+
+    Each partition buffers up to buffer_records formatted records before it
+    is flushed, the total buffered across partitions is capped at
+    max_buffered, and at most max_open_files handles are kept open (least
+    recently used are closed and reopened in append mode when needed).
+    """
+
+    def __init__(self, output_dir, fmt="jsonl", buffer_records=1000, max_buffered=100_000,
+                 max_open_files=64, indent=4):
+        if fmt not in PARTITION_FORMATS:
+            raise ValueError(f"Unsupported partition format: {fmt} (expected one of {', '.join(PARTITION_FORMATS)})")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.buffer_records = buffer_records
+        self.max_buffered = max_buffered
+        self.max_open_files = max_open_files
+        formatter = (JsonLinesWriter(io.StringIO()) if fmt == "jsonl"
+                     else JsonArrayWriter(io.StringIO(), indent=indent))
+        self._format = formatter.format
+        self._separator = formatter.separator
+        self._indented = fmt == "json" and indent is not None
+        self.partitions = {}
+        self._names = set()
+        self._handles = OrderedDict()
+        self._buffered = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _partition(self, value):
+        partition = self.partitions.get(value)
+        if partition is None:
+            stem = partition_file_name(value)
+            name = stem
+            suffix = 2
+            # Different values can share a stem ("U.S." and "U S", or "US" and "us"
+            # on case-insensitive file systems); keep their files apart
+            while name.casefold() in self._names:
+                name = f"{stem}_{suffix}"
+                suffix += 1
+            self._names.add(name.casefold())
+            partition = {"file": f"{name}.{self.fmt}", "count": 0, "written": 0, "buffer": []}
+            self.partitions[value] = partition
+        return partition
+
+    def _handle(self, partition):
+        path = os.path.join(self.output_dir, partition["file"])
+        handle = self._handles.pop(path, None)
+        if handle is None:
+            if len(self._handles) >= self.max_open_files:
+                _, oldest = self._handles.popitem(last=False)
+                oldest.close()
+            handle = open(path, "a" if partition["written"] else "w", encoding="utf-8")
+        self._handles[path] = handle
+        return handle
+
+    def _flush(self, partition):
+        buffer = partition["buffer"]
+        if not buffer:
+            return
+        handle = self._handle(partition)
+        if self.fmt == "jsonl":
+            handle.write("\n".join(buffer))
+            handle.write("\n")
+        else:
+            if partition["written"]:
+                handle.write(self._separator)
+            else:
+                handle.write("[\n" if self._indented else "[")
+            handle.write(self._separator.join(buffer))
+        partition["written"] += len(buffer)
+        self._buffered -= len(buffer)
+        buffer.clear()
+
+    def write(self, value, record):
+        partition = self._partition(value)
+        partition["buffer"].append(self._format(record))
+        partition["count"] += 1
+        self._buffered += 1
+        if len(partition["buffer"]) >= self.buffer_records:
+            self._flush(partition)
+        elif self._buffered >= self.max_buffered:
+            for other in self.partitions.values():
+                self._flush(other)
+
+    def close(self):
+        for partition in self.partitions.values():
+            self._flush(partition)
+            if self.fmt == "json":
+                handle = self._handle(partition)
+                handle.write("\n]" if self._indented else "]")
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+    def manifest(self):
+        return [{"value": value, "file": partition["file"], "count": partition["count"]}
+                for value, partition in self.partitions.items()]
+
+
+def partition_json(input_file, output_dir, key="leagueDivision", normalize=False, fmt="jsonl",
+                   buffer_records=1000, max_open_files=64):
+    """
+    Read input_file once and write every valid item to a file per value of `key`.
+
+    A manifest.json with per-partition counts is written next to the outputs.
+    Returns the manifest.
+    """
+    pipeline = FilterPipeline([is_valid_content])
+    writer = PartitionWriter(output_dir, fmt, buffer_records, max_open_files=max_open_files)
+    try:
+        for item in pipeline.run(iter_records(input_file)):
+            value = item.get(key)
+            if normalize and value is not None:
+                value = normalize_value(value)
+            writer.write(value, item)
+    finally:
+        writer.close()
+
+    manifest = {
+        "input": input_file,
+        "key": key,
+        "records_read": pipeline.seen,
+        "records_written": pipeline.passed,
+        "rejected": pipeline.rejected,
+        "partitions": writer.manifest(),
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=4)
+    return manifest
+
+
+if __name__ == "__main__":
+    # Example usage
+    # Replace with the path to your input JSON file (the one generated from previous script)
+    input_json_file = 'output.json'
+    output_json_file = 'filtered_outputus1.json'  # Replace with the desired output JSON file path
+
+    parser = argparse.ArgumentParser(description="Keep valid items for the given jurisdictions.")
+    parser.add_argument("input", nargs="?", default=input_json_file)
+    parser.add_argument("output", nargs="?", default=output_json_file)
+    parser.add_argument("--jurisdictions", help="comma-separated leagueDivision values (default: U.S. variants)")
+    parser.add_argument("--normalize", action="store_true",
+                        help="match jurisdictions ignoring case and extra whitespace")
+    parser.add_argument("--format", choices=["json", "jsonl", "parquet", "arrow"],
+                        help="output format (default: from suffix); --partition-by writes json or jsonl "
+                             "(default: jsonl)")
+    parser.add_argument("--partition-by", metavar="KEY",
+                        help="write every valid item to a file per KEY value (e.g. leagueDivision) in one pass")
+    parser.add_argument("--output-dir", default="partitions", help="directory for --partition-by outputs")
+    parser.add_argument("--max-open-files", type=int, default=64)
+    parser.add_argument("--buffer-records", type=int, default=1000)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    if args.partition_by and args.format not in (None, *PARTITION_FORMATS):
+        parser.error(f"--partition-by writes {' or '.join(PARTITION_FORMATS)} files, not {args.format}")
 
-# Example usage
-input_json_file = 'output.json'  # Replace with the path to your input JSON file (the one generated from previous script)
-output_json_file = 'filtered_outputus1.json'  # Replace with the desired output JSON file path
+    if args.partition_by:
+        with step("Partition records") as partitioned:
+            manifest = partition_json(args.input, args.output_dir, args.partition_by, args.normalize,
+                                      args.format or "jsonl", args.buffer_records, args.max_open_files)
+            partitioned.records = manifest["records_read"]
+        print(f"Records read: {manifest['records_read']}, written: {manifest['records_written']} "
+              f"to {len(manifest['partitions'])} partitions in {args.output_dir}")
+        for partition in manifest["partitions"]:
+            print(f"  {partition['value']!r}: {partition['count']} -> {partition['file']}")
+        raise SystemExit
 
-process_and_format_json(input_json_file, output_json_file)
+    jurisdictions = args.jurisdictions.split(",") if args.jurisdictions else US_JURISDICTIONS
+    with step("Filter records") as filtered:
+        pipeline = process_and_format_json(args.input, args.output, jurisdictions, args.normalize, args.format)
+        filtered.records = pipeline.seen
+    pipeline.print_report()
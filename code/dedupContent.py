@@ -0,0 +1,285 @@
+import argparse
+import csv
+import time
+import zlib
+
+import numpy as np
+
+from jsonStream import iter_records, open_writer
+from stepTrace import add_trace_arguments, start_from_args, step
+from wordCountCache import content_digest
+
+# Text fields tried in order when none are given: csvToJson, csvToJsonType2, categorizeContent
+TEXT_FIELDS = ["BODY_TEXT", "articleText", "CONTENT"]
+
+# Multiplier combining consecutive word hashes into a shingle hash (mod 2**64)
+_ROLL = np.uint64(0x9E3779B97F4A7C15)
+
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+THRESHOLD = 0.8
+MAX_INDEX = 200_000
+
+
+def normalize_text(text):
+    """
+    Case- and whitespace-insensitive form of a text, for fingerprinting.
+    """
+    return " ".join(text.split()).casefold()
+
+
+def shingle_hashes(text, k=SHINGLE_WORDS):
+    """
+    64-bit hashes of the k-word shingles of a text (one for shorter texts).
+
+    Words are hashed once (CRC32 of the casefolded word) and each run of k
+    is combined polynomially in numpy, so no shingle string is ever built.
+    """
+    words = text.casefold().split()
+    hashes = np.fromiter(map(zlib.crc32, map(str.encode, words)), dtype=np.uint64, count=len(words))
+    if len(hashes) <= k:
+        k = max(len(hashes), 1)
+        hashes = np.append(hashes, np.zeros(k - len(hashes), dtype=np.uint64))
+    shingles = hashes[:len(hashes) - k + 1].copy()
+    for offset in range(1, k):
+        shingles *= _ROLL
+        shingles += hashes[offset:len(hashes) - k + 1 + offset]
+    return shingles
+
+
+def choose_bands(num_perm, threshold):
+    """
+    LSH bands for a similarity threshold: the fewest bands whose collision
+    point (1/bands) ** (1/rows) is at or below the threshold, so likely
+    duplicates become candidates and the signature check weeds out the rest.
+    """
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands == 0 and (1 / bands) ** (bands / num_perm) <= threshold:
+            return bands
+    return num_perm
+
+
+class MinHashIndex:
+    """
+    Near-duplicate lookup with MinHash signatures banded into LSH tables.
+
+    Holds at most max_entries signatures in a ring buffer; when it is full
+    the oldest entry and its band keys are evicted, so memory is fixed at
+    about max_entries * num_perm * 4 bytes plus the band dictionaries.
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, shingle_words=SHINGLE_WORDS,
+                 max_entries=MAX_INDEX, seed=1):
+        rng = np.random.default_rng(seed)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.bands = choose_bands(num_perm, threshold)
+        self.rows = num_perm // self.bands
+        # Multiply-shift hash functions: the top 32 bits of a * x + b (mod 2**64), a odd
+        self._a = (rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1))[:, None]
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)[:, None]
+        self.signatures = np.zeros((max_entries, num_perm), dtype=np.uint32)
+        self.ids = [None] * max_entries
+        self.tables = [{} for _ in range(self.bands)]
+        self.size = 0
+        self.next_slot = 0
+        self.evicted = 0
+
+    def signature(self, text):
+        hashes = shingle_hashes(text, self.shingle_words)
+        return ((self._a * hashes + self._b) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+    def _keys(self, signature):
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def query(self, signature):
+        """
+        (id, estimated Jaccard similarity) of the best indexed match at or
+        above the threshold, or None.
+        """
+        candidates = {slot for table, key in zip(self.tables, self._keys(signature))
+                      for slot in table.get(key, ())}
+        best = None
+        for slot in candidates:
+            similarity = float(np.mean(self.signatures[slot] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (self.ids[slot], similarity)
+        return best
+
+    def add(self, signature, record_id):
+        slot = self.next_slot
+        if self.size == len(self.ids):
+            # Full (decided by count: a record ID may itself be None): drop the
+            # oldest entry from every band table
+            for table, key in zip(self.tables, self._keys(self.signatures[slot])):
+                slots = table[key]
+                slots.discard(slot)
+                if not slots:
+                    del table[key]
+            self.evicted += 1
+        else:
+            self.size += 1
+        self.signatures[slot] = signature
+        self.ids[slot] = record_id
+        for table, key in zip(self.tables, self._keys(signature)):
+            table.setdefault(key, set()).add(slot)
+        self.next_slot = (slot + 1) % len(self.ids)
+
+
+class Deduplicator:
+    """
+    Drop records whose text was already seen, in one streaming pass.
+
+    Every non-empty value of `fields` (default: the first of TEXT_FIELDS a
+    record has) is fingerprinted with a 16-byte BLAKE2b digest, and a record
+    is an exact duplicate when any of its digests was seen before. All
+    fields share one digest set, so with e.g. BODY_TEXT,BODY_TRANSLATED a
+    row whose text is another row's translation is caught too. With `near`
+    (a MinHashIndex), texts that are not exact duplicates are also checked
+    for near duplicates. Records without any text are kept.
+    """
+
+    def __init__(self, fields=None, normalize=False, near=None, id_field=None):
+        self.fields = list(fields) if fields else None
+        self.normalize = normalize
+        self.near = near
+        self.id_field = id_field
+        self.digests = {}
+        self.seen = 0
+        self.kept = 0
+        self.exact = 0
+        self.near_duplicates = 0
+        self.removed = []
+        self.seconds = 0.0
+
+    def _texts(self, item):
+        if self.fields is None:
+            for field in TEXT_FIELDS:
+                if item.get(field):
+                    return [item[field]]
+            return []
+        return [item[field] for field in self.fields if item.get(field)]
+
+    def check(self, item, record_id):
+        """
+        None for a new record, else (kind, id of the record it duplicates, similarity).
+
+        New records are remembered under record_id.
+        """
+        texts = [normalize_text(text) if self.normalize else text for text in map(str, self._texts(item))]
+        digests = [content_digest(text) for text in texts]
+        for digest in digests:
+            if digest in self.digests:
+                return "exact", self.digests[digest], 1.0
+        signatures = []
+        if self.near is not None:
+            for text in texts:
+                signature = self.near.signature(text)
+                match = self.near.query(signature)
+                if match is not None:
+                    return ("near",) + match
+                signatures.append(signature)
+        for digest in digests:
+            self.digests[digest] = record_id
+        for signature in signatures:
+            self.near.add(signature, record_id)
+        return None
+
+    def run(self, records, keep_removed=False):
+        """
+        Yield the records that are not duplicates; counters and timings
+        (time spent deciding, not in upstream/downstream steps) accumulate.
+        """
+        for item in records:
+            start = time.perf_counter()
+            record_id = item.get(self.id_field, self.seen) if self.id_field else self.seen
+            duplicate = self.check(item, record_id)
+            self.seen += 1
+            self.seconds += time.perf_counter() - start
+            if duplicate is None:
+                self.kept += 1
+                yield item
+                continue
+            kind, original, similarity = duplicate
+            if kind == "exact":
+                self.exact += 1
+            else:
+                self.near_duplicates += 1
+            if keep_removed:
+                self.removed.append((record_id, kind, original, similarity))
+
+    def summary(self):
+        summary = {"read": self.seen, "kept": self.kept, "exact_duplicates": self.exact,
+                   "seconds": round(self.seconds, 3)}
+        if self.near is not None:
+            summary["near_duplicates"] = self.near_duplicates
+            summary["index_evictions"] = self.near.evicted
+        return summary
+
+    def print_report(self):
+        removed = self.exact + self.near_duplicates
+        rate = removed / self.seen * 100 if self.seen else 0
+        print(f"Records read: {self.seen}, kept: {self.kept}, removed: {removed} ({rate:.2f}%)")
+        print(f"  exact duplicates: {self.exact}")
+        if self.near is not None:
+            print(f"  near duplicates (Jaccard >= {self.near.threshold}): {self.near_duplicates}")
+            print(f"  MinHash index: {self.near.size} entries, {self.near.evicted} evicted, "
+                  f"{self.near.bands} bands x {self.near.rows} rows")
+        if self.seconds > 0:
+            print(f"Dedup time: {self.seconds:.2f}s ({self.seen / self.seconds:,.0f} records/s)")
+
+
+def dedup_file(input_file, output_file, fields=None, normalize=False, near=None, id_field=None,
+               removed_csv=None, fmt=None):
+    """
+    Stream input_file to output_file without duplicates; returns the Deduplicator.
+
+    removed_csv, if given, lists every dropped record and what it duplicates.
+    """
+    dedup = Deduplicator(fields, normalize, near, id_field)
+    with open_writer(output_file, fmt, indent=4) as writer:
+        for item in dedup.run(iter_records(input_file), keep_removed=removed_csv is not None):
+            writer.write(item)
+
+    if removed_csv:
+        with open(removed_csv, "w", newline="", encoding="utf-8") as csvfile:
+            out = csv.writer(csvfile)
+            out.writerow(["Record", "Kind", "Duplicate of", "Similarity"])
+            for record_id, kind, original, similarity in dedup.removed:
+                out.writerow([record_id, kind, original, f"{similarity:.3f}"])
+    return dedup
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drop duplicate articles right after csvToJson/csvToJsonType2.")
+    parser.add_argument("input", nargs="?", default="JSONOutput.json",
+                        help="JSON, JSON Lines or Parquet/Arrow records")
+    parser.add_argument("output", nargs="?", default="Deduped_Output.json")
+    parser.add_argument("--fields", help="comma-separated text fields to fingerprint, e.g. "
+                                         "BODY_TEXT,BODY_TRANSLATED (default: first of "
+                                         f"{', '.join(TEXT_FIELDS)} present)")
+    parser.add_argument("--normalize", action="store_true", help="ignore case and whitespace differences")
+    parser.add_argument("--id-field", help="record ID for the removed list (e.g. ARTICLE_ID; default: position)")
+    parser.add_argument("--near", action="store_true", help="also drop near duplicates (MinHash/LSH)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="near: estimated Jaccard similarity")
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM, help="near: MinHash permutations")
+    parser.add_argument("--shingle", type=int, default=SHINGLE_WORDS, help="near: words per shingle")
+    parser.add_argument("--max-index", type=int, default=MAX_INDEX,
+                        help="near: signatures kept (oldest evicted first); bounds memory")
+    parser.add_argument("--removed", help="CSV listing every removed record and what it duplicates")
+    parser.add_argument("--format", choices=["json", "jsonl", "parquet", "arrow"],
+                        help="output format (default: from suffix)")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    near = MinHashIndex(args.threshold, args.num_perm, args.shingle, args.max_index) if args.near else None
+    fields = args.fields.split(",") if args.fields else None
+    with step("Deduplicate") as deduped:
+        dedup = dedup_file(args.input, args.output, fields, args.normalize, near, args.id_field, args.removed,
+                           args.format)
+        deduped.records = dedup.seen
+    dedup.print_report()
+    print(f"Deduplicated records saved to '{args.output}'")
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+# Plain decimal number; anything else float() might accept goes to the scalar parser
+_NUMBER = r"^[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?$"
+
+
+def parse_duration(val):
+    """
+    Row-by-row parser the analyzers used originally: "MM:SS(.fff)" -> seconds, else None.
+    """
+    try:
+        minutes, seconds = str(val).split(":")
+        return float(minutes) * 60 + float(seconds)
+    except:
+        return None
+
+
+def _arrow_floats(strings):
+    try:
+        return pc.cast(strings, pa.float64()).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # Some value is not a plain number: convert the ones that are, NaN the rest
+        numeric = pc.fill_null(pc.match_substring_regex(strings, _NUMBER), False)
+        out = np.full(len(strings), np.nan)
+        mask = numeric.to_numpy(zero_copy_only=False)
+        out[mask] = pc.cast(pc.filter(strings, numeric), pa.float64()).to_numpy(zero_copy_only=False)
+        return out
+
+
+def _split_arrow(text):
+    parts = pc.split_pattern(pa.array(text, type=pa.string(), from_pandas=True), ":")
+    lengths = pc.fill_null(pc.list_value_length(parts), 0).to_numpy(zero_copy_only=False)
+
+    def part(mask, index):
+        rows = pc.filter(parts, pa.array(mask))
+        return _arrow_floats(pc.list_element(rows, index))
+
+    return lengths, part
+
+
+def _split_pandas(text):
+    lengths = (text.str.count(":").fillna(-1) + 1).to_numpy(dtype=np.int64)
+    parts = text.str.split(":", n=2, expand=True).reindex(columns=range(3))
+
+    def part(mask, index):
+        # Same plain-number check as the arrow path: to_numeric alone also
+        # takes spellings float() rejects (e.g. "1e\t98")
+        strings = parts[index][mask]
+        numeric = strings.str.match(_NUMBER).fillna(False).astype(bool)
+        return pd.to_numeric(strings.where(numeric), errors="coerce").to_numpy(dtype="float64")
+
+    return lengths, part
+
+
+def parse_duration_series(values, formats="mm:ss"):
+    """
+    Vectorized parse_duration() over a whole column, returning float seconds.
+
+    formats="mm:ss" gives NaN exactly where parse_duration() returns None.
+    formats="auto" additionally accepts "HH:MM:SS(.fff)" and plain numbers,
+    which are read as epoch milliseconds (e.g. 1700000000123 -> 1700000000.123).
+    Uses pyarrow compute kernels when available, pandas string ops otherwise.
+    """
+    if formats not in ("mm:ss", "auto"):
+        raise ValueError(f"Unsupported duration format: {formats}")
+
+    values = pd.Series(values)
+    text = values.astype(str)
+    lengths, part = _split_arrow(text) if pc is not None else _split_pandas(text)
+    result = np.full(len(values), np.nan)
+
+    mm_ss = lengths == 2
+    if mm_ss.any():
+        result[mm_ss] = part(mm_ss, 0) * 60 + part(mm_ss, 1)
+
+        # float() accepts a few spellings the vector path does not (" 5", "1_0",
+        # "inf", non-ASCII digits); re-check unparsed mm:ss rows with the scalar parser
+        unparsed = mm_ss & np.isnan(result)
+        if unparsed.any():
+            result[unparsed] = values[unparsed].map(parse_duration).to_numpy(dtype="float64")
+
+    if formats == "auto":
+        hh_mm_ss = lengths == 3
+        if hh_mm_ss.any():
+            result[hh_mm_ss] = part(hh_mm_ss, 0) * 3600 + part(hh_mm_ss, 1) * 60 + part(hh_mm_ss, 2)
+        epoch = lengths == 1
+        if epoch.any():
+            result[epoch] = part(epoch, 0) / 1000
+
+    return pd.Series(result, index=values.index)
@@ -1,12 +1,117 @@
+import argparse
 import json
 
-# Load the unformatted JSON file
-# if input file on the same file, file name should be enough
-with open('XXLargewordcount.json', 'r') as unformatted_file:
-    data = json.load(unformatted_file)
+from columnarStore import ColumnarWriter, columnar_format
+from jsonStream import JsonArrayWriter, iter_records, reformat_json
+from stepTrace import add_trace_arguments, start_from_args, step
 
-# Write the formatted JSON to a new file
-with open('Formatted.json', 'w') as formatted_file:
-    json.dump(data, formatted_file, indent=4, sort_keys=True)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-print("Formatted JSON written to 'Formatted.json'")
\ No newline at end of file
+
+def format_in_memory(input_file, output_file, indent=4, sort_keys=True, separators=None):
+    """
+    The original approach: json.load the whole document, then json.dump it.
+    """
+    # Load the unformatted JSON file
+    with open(input_file, 'r') as unformatted_file:
+        data = json.load(unformatted_file)
+
+    # Write the formatted JSON to a new file
+    with open(output_file, 'w') as formatted_file:
+        json.dump(data, formatted_file, indent=indent, sort_keys=sort_keys, separators=separators)
+
+
+def format_orjson(input_file, output_file, indent=2, sort_keys=True):
+    """
+    Fast path for documents that fit in memory, using orjson.
+
+    orjson can only indent by 2 (or minify), writes non-ASCII text as UTF-8
+    instead of \\u escapes and may spell floats differently (1e16 vs 1e+16),
+    so the output is the same JSON but not byte-identical to the json module's.
+    """
+    if orjson is None:
+        raise ImportError("the orjson engine requires the orjson package")
+    if indent not in (None, 2):
+        raise ValueError("orjson only supports indent=2 or minified output")
+    option = orjson.OPT_INDENT_2 if indent == 2 else 0
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+
+    with open(input_file, 'rb') as unformatted_file:
+        data = orjson.loads(unformatted_file.read())
+    with open(output_file, 'wb') as formatted_file:
+        formatted_file.write(orjson.dumps(data, option=option))
+
+
+def convert_columnar(input_file, output_file, indent=4, sort_keys=True, separators=None):
+    """
+    Parquet/Arrow -> formatted JSON array, or JSON/JSON Lines -> Parquet/Arrow.
+
+    Records are streamed a batch at a time either way; JSON output matches
+    json.dump of the rows (missing values come out as null).
+    """
+    records = iter_records(input_file)
+    if columnar_format(output_file):
+        with ColumnarWriter(output_file) as writer:
+            for record in records:
+                writer.write(record)
+    else:
+        with JsonArrayWriter(output_file, indent=indent, sort_keys=sort_keys, separators=separators) as writer:
+            for record in records:
+                writer.write(record)
+
+
+ENGINES = ["stream", "orjson", "json"]
+
+
+def format_json(input_file, output_file, engine="stream", indent=4, sort_keys=True, minify=False):
+    """
+    Pretty-print (or minify, with minify=True) input_file into output_file.
+
+    "stream" (the default) matches json.dump byte for byte with bounded
+    memory; "json" is the original load-everything path; "orjson" is the
+    fastest for inputs that fit in memory. A Parquet/Arrow input or output
+    (by suffix) is converted with convert_columnar() whatever the engine.
+    """
+    if minify:
+        indent = None
+    if columnar_format(input_file) or columnar_format(output_file):
+        convert_columnar(input_file, output_file, indent, sort_keys, (",", ":") if minify else None)
+    elif engine == "stream":
+        reformat_json(input_file, output_file, indent=indent, sort_keys=sort_keys,
+                      separators=(",", ":") if minify else None)
+    elif engine == "orjson":
+        format_orjson(input_file, output_file, indent, sort_keys)
+    elif engine == "json":
+        format_in_memory(input_file, output_file, indent, sort_keys, (",", ":") if minify else None)
+    else:
+        raise ValueError(f"Unsupported engine: {engine}")
+
+
+if __name__ == "__main__":
+    # if input file on the same file, file name should be enough
+    parser = argparse.ArgumentParser(
+        description="Pretty-print, minify or key-sort a JSON file; converts to/from .parquet/.arrow by suffix.")
+    parser.add_argument("input", nargs="?", default='XXLargewordcount.json')
+    parser.add_argument("output", nargs="?", default='Formatted.json')
+    parser.add_argument("--engine", choices=ENGINES, default="stream",
+                        help="stream: bounded memory, same bytes as json.dump (default); "
+                             "orjson: fastest, in memory, indent 2 only; json: the original in-memory path")
+    parser.add_argument("--indent", type=int, help="spaces per level (default: 4; 2 with --engine orjson)")
+    parser.add_argument("--minify", action="store_true", help="no whitespace at all")
+    parser.add_argument("--no-sort-keys", dest="sort_keys", action="store_false",
+                        help="keep keys in input order (default: sorted, for canonical, diffable output)")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    if args.indent is None:
+        args.indent = 2 if args.engine == "orjson" else 4
+    elif args.engine == "orjson" and args.indent != 2 and not args.minify:
+        parser.error("--engine orjson can only indent by 2 (or --minify)")
+    start_from_args(args)
+
+    with step(f"Format JSON ({args.engine})"):
+        format_json(args.input, args.output, args.engine, args.indent, args.sort_keys, args.minify)
+    print(f"Formatted JSON written to '{args.output}'")
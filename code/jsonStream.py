@@ -0,0 +1,614 @@
+import codecs
+import gzip
+import json
+import mmap
+import os
+import re
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Read size for the incremental parser (characters per read)
+CHUNK_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+# A complete JSON string or a single bracket, used to find record boundaries
+_structural = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+_pretty_head = re.compile(rb"\s*\[\r?\n([ \t]+)[\[{]")
+_NUMBER_TAIL = frozenset(".eE+-0123456789")
+_OPEN = frozenset(b"[{")
+_CLOSE = frozenset(b"]}")
+
+
+class _StreamReader:
+    """
+    Minimal incremental JSON reader over a text file object.
+
+    Keeps a sliding buffer and decodes one value at a time with
+    JSONDecoder.raw_decode, so only the value being decoded (plus one read
+    chunk) is held in memory.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        data = self.fp.read(size)
+        if not data:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer never grows past one value
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Return the next non-whitespace character without consuming it ('' at EOF).
+        """
+        while True:
+            self.pos = _whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON input, found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode and return the next complete JSON value.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                # Grow reads so a huge record is not re-decoded once per chunk
+                size *= 2
+                continue
+            # A number ending at the buffer edge, or cut before its fraction or
+            # exponent ("1" of "1.5"), may continue in the next chunk
+            cut = end == len(self.buf) or (
+                self.buf[end] in _NUMBER_TAIL and type(obj) in (int, float))
+            if not cut or self.eof or not self._fill(size):
+                self.pos = end
+                return obj
+
+
+def compression_for(path):
+    """
+    Compression implied by a file name: "gzip", "zstd" or None.
+    """
+    path = os.fspath(path)
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def open_text(path, mode="r", compression="infer", encoding=None):
+    """
+    Open a text file, transparently (de)compressing gzip/zstd.
+
+    compression="infer" picks it from the suffix (.gz/.zst). Compressed
+    files are always UTF-8.
+    """
+    if compression == "infer":
+        compression = compression_for(path)
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding=encoding or "utf-8")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        return zstandard.open(path, mode + "t", encoding=encoding or "utf-8")
+    if compression:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return open(path, mode, encoding=encoding)
+
+
+def is_json_lines(path):
+    """
+    True for .jsonl/.ndjson files (optionally .gz/.zst compressed).
+    """
+    path = os.fspath(path)
+    if compression_for(path):
+        path = os.path.splitext(path)[0]
+    return path.endswith((".jsonl", ".ndjson"))
+
+
+def _open_input(file, encoding=None):
+    if isinstance(file, (str, os.PathLike)):
+        return open_text(file, "r", encoding=encoding)
+    return file
+
+
+def detect_encoding(path):
+    """
+    Encoding of a JSON file from its BOM, or from the pattern of zero bytes
+    in its first four bytes (RFC 4627, section 3); UTF-8 otherwise.
+    """
+    with open(path, "rb") as file:
+        head = file.read(4)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        return "utf-32"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if len(head) == 4:
+        zeros = tuple(byte == 0 for byte in head)
+        if zeros == (True, True, True, False):
+            return "utf-32-be"
+        if zeros == (False, True, True, True):
+            return "utf-32-le"
+        if zeros[:2] == (True, False):
+            return "utf-16-be"
+        if zeros[:2] == (False, True):
+            return "utf-16-le"
+    return "utf-8"
+
+
+def _iter_items(reader):
+    # Items of an array whose '[' the reader has just consumed
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        char = reader.peek()
+        if char == ",":
+            reader.pos += 1
+        elif char == "]":
+            reader.pos += 1
+            return
+        else:
+            raise ValueError(f"Expected ',' or ']' in JSON array, found '{char or 'EOF'}'")
+
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE, encoding=None):
+    """
+    Yield the items of a top-level JSON array one at a time.
+
+    `file` may be a path or an open text file. Peak memory is bounded by the
+    largest single item rather than by the size of the file.
+    """
+    fp = _open_input(file, encoding)
+    try:
+        reader = _StreamReader(fp, chunk_size)
+        reader.expect("[")
+        yield from _iter_items(reader)
+    finally:
+        if fp is not file:
+            fp.close()
+
+
+def iter_json_member(file, key, chunk_size=CHUNK_SIZE, encoding=None):
+    """
+    Yield the items of the array under `key` in a top-level JSON object.
+
+    Members before it are decoded one at a time and dropped; reading stops
+    at the end of the array. Raises KeyError if the object has no such
+    member and ValueError if the input is not an object or the member is
+    not an array.
+    """
+    fp = _open_input(file, encoding)
+    try:
+        reader = _StreamReader(fp, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            raise KeyError(key)
+        while True:
+            if reader.peek() != '"':
+                raise ValueError(f"Expected a member name in JSON object, found '{reader.peek() or 'EOF'}'")
+            name = reader.value()
+            reader.expect(":")
+            if name == key:
+                if reader.peek() != "[":
+                    raise ValueError(f"Expected an array under '{key}'")
+                reader.pos += 1
+                yield from _iter_items(reader)
+                return
+            reader.value()
+            char = reader.peek()
+            if char == ",":
+                reader.pos += 1
+            elif char == "}":
+                raise KeyError(key)
+            else:
+                raise ValueError(f"Expected ',' or '}}' in JSON object, found '{char or 'EOF'}'")
+    finally:
+        if fp is not file:
+            fp.close()
+
+
+def iter_json_lines(file, encoding=None):
+    """
+    Yield one record per non-blank line of a JSON Lines file (path or text file).
+    """
+    fp = _open_input(file, encoding)
+    try:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if fp is not file:
+            fp.close()
+
+
+def iter_records(path, encoding=None):
+    """
+    Lazily yield records from a JSON array, JSON Lines or Parquet/Arrow file, chosen by suffix.
+    """
+    from columnarStore import columnar_format, iter_records as iter_columnar_records
+    if columnar_format(path):
+        return iter_columnar_records(path)
+    if is_json_lines(path):
+        return iter_json_lines(path, encoding)
+    return iter_json_array(path, encoding=encoding)
+
+
+def _pretty_shards(data, indent, start, shard_bytes):
+    # In indented output a raw newline is always layout, and only top-level
+    # records start on a line with exactly one level of indent
+    boundary = re.compile(rb"\n" + re.escape(indent) + rb"[\[{]")
+    end_of_array = data.rfind(b"]")
+    while True:
+        match = boundary.search(data, start + shard_bytes, end_of_array)
+        if not match:
+            yield start, end_of_array
+            return
+        next_start = match.end() - 1
+        yield start, data.rfind(b",", start, next_start)
+        start = next_start
+
+
+def _scanned_shards(data, shard_bytes):
+    # Compact input: walk every string and bracket to track nesting depth
+    depth = 0
+    shard_start = record_end = None
+    for match in _structural.finditer(data):
+        pos = match.start()
+        char = data[pos]
+        if char in _OPEN:
+            depth += 1
+            if depth == 2 and shard_start is None:
+                shard_start = pos
+        elif char in _CLOSE:
+            depth -= 1
+            if depth == 1:
+                record_end = pos + 1
+                if record_end - shard_start >= shard_bytes:
+                    yield shard_start, record_end
+                    shard_start = None
+            elif depth == 0:
+                break
+    if shard_start is not None:
+        yield shard_start, record_end
+
+
+def iter_array_shards(path, shard_bytes):
+    """
+    Split a top-level JSON array of objects/arrays into byte ranges.
+
+    Yields (start, end) offsets that each cover one or more whole records
+    (and the commas between them), about shard_bytes long, so that
+    b"[" + data[start:end] + b"]" is a valid JSON array on its own.
+    Indented files (json.dump(..., indent=N)) are split with a handful of
+    seeks; compact files need one scan over the whole input.
+    """
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pretty = _pretty_head.match(data[:4096])
+            if pretty:
+                yield from _pretty_shards(data, pretty.group(1), pretty.end() - 1, shard_bytes)
+            else:
+                yield from _scanned_shards(data, shard_bytes)
+
+
+def read_array_shard(path, start, end):
+    """
+    Decode the records in one (start, end) range from iter_array_shards().
+    """
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        data = fp.read(end - start)
+    return json.loads(b"[" + data + b"]")
+
+
+class JsonArrayWriter:
+    """
+    Write records as a JSON array one at a time.
+
+    The output is byte-for-byte what json.dump(list_of_records, ...) would
+    produce with the same indent/sort_keys, without holding the list in memory.
+    """
+
+    def __init__(self, file, indent=None, sort_keys=False, ensure_ascii=True, encoding=None,
+                 compression="infer", separators=None):
+        self._owns_file = isinstance(file, (str, os.PathLike))
+        self.fp = open_text(file, "w", compression, encoding) if self._owns_file else file
+        self.indent = indent
+        self.sort_keys = sort_keys
+        self.ensure_ascii = ensure_ascii
+        self.separators = separators
+        self.count = 0
+        if indent is None:
+            self._separator = separators[0] if separators else ", "
+            self._prefix = ""
+        else:
+            self._separator = (separators[0] if separators else ",") + "\n"
+            self._prefix = " " * indent if isinstance(indent, int) else indent
+        self.fp.write("[")
+
+    def format(self, record):
+        """
+        Return the text for one record as it appears inside the array.
+        """
+        text = json.dumps(record, indent=self.indent, sort_keys=self.sort_keys,
+                          ensure_ascii=self.ensure_ascii, separators=self.separators)
+        if self.indent is not None:
+            # json escapes newlines inside strings, so every "\n" here is layout
+            text = self._prefix + text.replace("\n", "\n" + self._prefix)
+        return text
+
+    @property
+    def separator(self):
+        return self._separator
+
+    def write_text(self, text, count=1):
+        """
+        Append already formatted records (joined with `separator`).
+        """
+        if not count:
+            return
+        if self.count:
+            self.fp.write(self._separator)
+        elif self.indent is not None:
+            self.fp.write("\n")
+        self.fp.write(text)
+        self.count += count
+
+    def write(self, record):
+        self.write_text(self.format(record))
+
+    def close(self):
+        if self.fp is None:
+            return
+        self.fp.write("\n]" if self.indent is not None and self.count else "]")
+        if self._owns_file:
+            self.fp.close()
+        self.fp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonLinesWriter:
+    """
+    Write records as compact JSON Lines, one object per line.
+
+    Nothing is buffered beyond the file object, so memory stays flat however
+    many records are written. Use a .gz/.zst path (or `compression`) to compress.
+    """
+
+    def __init__(self, file, sort_keys=False, ensure_ascii=False, encoding="utf-8",
+                 compression="infer"):
+        self._owns_file = isinstance(file, (str, os.PathLike))
+        self.fp = open_text(file, "w", compression, encoding) if self._owns_file else file
+        self.sort_keys = sort_keys
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+
+    def format(self, record):
+        return json.dumps(record, separators=(",", ":"), sort_keys=self.sort_keys,
+                          ensure_ascii=self.ensure_ascii)
+
+    separator = "\n"
+
+    def write_text(self, text, count=1):
+        """
+        Append already formatted records (joined with `separator`).
+        """
+        if not count:
+            return
+        self.fp.write(text)
+        self.fp.write("\n")
+        self.count += count
+
+    def write(self, record):
+        self.write_text(self.format(record))
+
+    def close(self):
+        if self.fp is None:
+            return
+        if self._owns_file:
+            self.fp.close()
+        self.fp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_writer(path, fmt=None, indent=None, compression="infer", **kwargs):
+    """
+    JsonLinesWriter for fmt="jsonl", JsonArrayWriter for fmt="json",
+    columnarStore.ColumnarWriter for fmt="parquet"/"arrow".
+
+    With fmt=None the format follows the file name (.jsonl/.ndjson -> lines,
+    .parquet/.arrow/.feather -> columnar).
+    """
+    from columnarStore import COLUMNAR_FORMATS, ColumnarWriter, columnar_format
+    if fmt is None:
+        fmt = columnar_format(path) or ("jsonl" if is_json_lines(path) else "json")
+    if fmt in COLUMNAR_FORMATS:
+        return ColumnarWriter(path, fmt)
+    if fmt == "jsonl":
+        return JsonLinesWriter(path, compression=compression, **kwargs)
+    if fmt == "json":
+        return JsonArrayWriter(path, indent=indent, compression=compression, **kwargs)
+    raise ValueError(f"Unsupported output format: {fmt}")
+
+
+class _Layout:
+    # json.dumps formatting of a value nested `level` containers deep
+    def __init__(self, indent, separators, sort_keys, ensure_ascii):
+        if isinstance(indent, int):
+            indent = " " * indent
+        self.indent = indent
+        if separators is None:
+            separators = (", ", ": ") if indent is None else (",", ": ")
+        self.item_separator, self.key_separator = separators
+        self.sort_keys = sort_keys
+        self.ensure_ascii = ensure_ascii
+
+    def dumps(self, value, level):
+        text = json.dumps(value, indent=self.indent, separators=(self.item_separator, self.key_separator),
+                          sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii)
+        if self.indent is not None and level:
+            # json escapes newlines inside strings, so every "\n" here is layout
+            text = text.replace("\n", "\n" + self.indent * level)
+        return text
+
+    def newline(self, level):
+        return "" if self.indent is None else "\n" + self.indent * level
+
+
+def _write_array(reader, out, layout, level):
+    # The '[' has been consumed; items are decoded and written one at a time
+    first = True
+    for item in _iter_items(reader):
+        out.write("[" if first else layout.item_separator)
+        out.write(layout.newline(level + 1))
+        out.write(layout.dumps(item, level + 1))
+        first = False
+    out.write("[]" if first else layout.newline(level) + "]")
+
+
+def _write_member_value(reader, out, layout):
+    # Arrays directly under the top-level object are streamed too ({"results": [...]})
+    if reader.peek() == "[":
+        reader.pos += 1
+        _write_array(reader, out, layout, 1)
+    else:
+        out.write(layout.dumps(reader.value(), 1))
+
+
+def _iter_members(reader):
+    # The '{' has been consumed; yields each member name, leaving its value unread
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        if reader.peek() != '"':
+            raise ValueError(f"Expected a member name in JSON object, found '{reader.peek() or 'EOF'}'")
+        name = reader.value()
+        reader.expect(":")
+        yield name
+        char = reader.peek()
+        if char == ",":
+            reader.pos += 1
+        elif char == "}":
+            reader.pos += 1
+            return
+        else:
+            raise ValueError(f"Expected ',' or '}}' in JSON object, found '{char or 'EOF'}'")
+
+
+def _write_object(reader, out, layout):
+    # Members are formatted into a spill file and copied out once every name
+    # is known, as json.load would build the dict: a repeated name keeps its
+    # first position and its last value. Sorted output then orders them.
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spill:
+        spans = {}
+        for name in _iter_members(reader):
+            start = spill.tell()
+            length = spill.write(layout.dumps(name, 1) + layout.key_separator)
+            counter = _CountingWriter(spill)
+            _write_member_value(reader, counter, layout)
+            spans[name] = (start, length + counter.written)
+        if not spans:
+            out.write("{}")
+            return
+        for i, name in enumerate(sorted(spans) if layout.sort_keys else spans):
+            out.write("{" if not i else layout.item_separator)
+            out.write(layout.newline(1))
+            start, length = spans[name]
+            spill.seek(start)
+            while length:
+                text = spill.read(min(length, CHUNK_SIZE))
+                out.write(text)
+                length -= len(text)
+        out.write(layout.newline(0) + "}")
+
+
+class _CountingWriter:
+    def __init__(self, fp):
+        self.fp = fp
+        self.written = 0
+
+    def write(self, text):
+        self.written += self.fp.write(text)
+
+
+def reformat_json(input_file, output_file, indent=4, sort_keys=True, ensure_ascii=True, separators=None,
+                  encoding=None, chunk_size=CHUNK_SIZE):
+    """
+    Re-serialize a JSON file without building the whole document in memory.
+
+    Output is byte-for-byte json.dump(json.load(input), output, indent=...,
+    sort_keys=..., ensure_ascii=..., separators=...). The top-level array,
+    or the top-level object and any arrays directly under its members, are
+    streamed item by item, so memory is bounded by the largest such item.
+    A top-level object's formatted members go through a temporary file, so
+    they can be sorted and repeated names collapse like json.load's. The
+    input encoding is detected from its first bytes unless given.
+    """
+    layout = _Layout(indent, separators, sort_keys, ensure_ascii)
+    if encoding is None and isinstance(input_file, (str, os.PathLike)) and not compression_for(input_file):
+        encoding = detect_encoding(input_file)
+    fp = _open_input(input_file, encoding)
+    out = open_text(output_file, "w", encoding="utf-8") if isinstance(output_file, (str, os.PathLike)) \
+        else output_file
+    try:
+        reader = _StreamReader(fp, chunk_size)
+        char = reader.peek()
+        if char == "[":
+            reader.pos += 1
+            _write_array(reader, out, layout, 0)
+        elif char == "{":
+            reader.pos += 1
+            _write_object(reader, out, layout)
+        else:
+            out.write(layout.dumps(reader.value(), 0))
+        if reader.peek():
+            raise ValueError("Extra data after the top-level JSON value")
+    finally:
+        if fp is not input_file:
+            fp.close()
+        if out is not output_file:
+            out.close()
@@ -0,0 +1,732 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from durationParser import parse_duration_series
+from perfReport import (
+    EXCEL_MAX_ROWS, HAVE_PARQUET, RAW_FORMATS, XLSX_ENGINES, print_write_times, table_file_name, write_table,
+    write_workbook,
+)
+from stepTrace import add_trace_arguments, start_from_args, step
+
+# Requests running longer than this count as timeout failures (> 5 min)
+TIMEOUT_SEC = 300
+
+PERCENTILES = [0.01, 0.05, 0.10, 0.25, 0.50, 0.80, 0.95, 0.99]
+PERCENTILE_LABELS = ["1st", "5th", "10th", "25th", "50th", "80th", "95th", "99th"]
+
+
+def load_requests(input_file):
+    """
+    Step 1: Load CSV or Excel file (NO FILTERING).
+    """
+    if input_file.lower().endswith(".csv"):
+        df_all = pd.read_csv(input_file, encoding_errors="ignore")
+    elif input_file.lower().endswith((".xls", ".xlsx")):
+        df_all = pd.read_excel(input_file)
+    else:
+        raise ValueError("Unsupported file format.")
+
+    df_all.columns = df_all.columns.str.strip()
+    return df_all
+
+
+def stability_label(cv):
+    if cv is not None:
+        if cv < 0.1:
+            return "Very Stable"
+        elif cv <= 0.3:
+            return "Acceptable Variance"
+        else:
+            return "Unstable / Unpredictable"
+    return "N/A"
+
+
+def _pct(count, total):
+    return (count / total) * 100 if total else 0.0
+
+
+class SuccessCriterion:
+    """
+    How one kind of load-test log says whether a request succeeded.
+
+    Subclasses name the timestamp columns, build the success/failure masks,
+    add their own additive counts, and describe their report layout. The
+    engine does everything else.
+    """
+
+    name = ""
+    start_column = ""
+    end_column = ""
+    console_title = "--- System Summary ---"
+    success_sheet = "Successful Requests"
+    chart_subject = "Successful Requests"
+    excel_suffix = "_summary"
+    chart_suffix = ""
+
+    def success_mask(self, df):
+        raise NotImplementedError
+
+    def failure_mask(self, df):
+        raise NotImplementedError
+
+    def extra_counts(self, df):
+        """
+        Criterion-specific counts; must be additive across chunks of a log.
+        """
+        return {}
+
+    def console_lines(self, m):
+        raise NotImplementedError
+
+    def summary_rows(self, m):
+        raise NotImplementedError
+
+
+class StatusCriterion(SuccessCriterion):
+    """
+    Success from the `status` column: anything not IN_PROGRESS/ACCEPTED/ERROR is completed.
+    """
+
+    name = "status"
+    start_column = "created"
+    end_column = "updated"
+    success_sheet = "Completed Requests"
+    chart_subject = "Completed Requests"
+    excel_suffix = "_with_duration_summary"
+    chart_suffix = ""
+
+    statuses = ["COMPLETED", "ACCEPTED", "IN_PROGRESS", "RECEIVED", "ERROR"]
+
+    def success_mask(self, df):
+        return (~df["status"].isin(["IN_PROGRESS", "ACCEPTED", "ERROR"])).to_numpy(dtype=bool)
+
+    def failure_mask(self, df):
+        return (df["status"] == "ERROR").to_numpy(dtype=bool)
+
+    def extra_counts(self, df):
+        status_counts = df["status"].value_counts(dropna=False)
+        counts = {f"{status.lower()}_count": int(status_counts.get(status, 0))
+                  for status in self.statuses}
+        counts["other_status_count"] = len(df) - sum(counts.values())
+        return counts
+
+    def console_lines(self, m):
+        return [
+            f"Completed Requests: {m['success_count']} ({m['success_rate']:.2f}%)",
+        ]
+
+    def summary_rows(self, m):
+        return [
+            ("Total Requests", m["total_requests"]),
+
+            ("Processed Requests", m["completed_count"]),
+            ("Accepted Requests", m["accepted_count"]),
+            ("In Progress Requests", m["in_progress_count"]),
+            ("Received Requests", m["received_count"]),
+            ("Error Requests", m["error_count"]),
+            ("Other / Unknown Status Requests", m["other_status_count"]),
+
+            ("Completed Requests", m["success_count"]),
+            ("Completed Requests (%)", f"{m['success_rate']:.2f}%"),
+
+            ("Error Requests (Status)", m["failure_count"]),
+            ("Error Rate (Status) (%)", f"{m['failure_rate']:.2f}%"),
+            ("Error Requests (Timeout >5min)", m["timeout_count"]),
+            ("Error Rate (Timeout) (%)", f"{m['timeout_rate']:.2f}%"),
+            ("Error Requests (Combined)", m["combined_failure_count"]),
+            ("Error Rate (Combined) (%)", f"{m['combined_failure_rate']:.2f}%"),
+        ] + _timing_rows(m)
+
+
+class FlagCriterion(SuccessCriterion):
+    """
+    Success from the `Flag_Success` column: 1 is success, 0 failure, anything else unknown.
+    """
+
+    name = "flag"
+    start_column = "started_time"
+    end_column = "ended_time"
+    console_title = "--- System Summary (Flag_Success Based) ---"
+    success_sheet = "Successful Requests"
+    chart_subject = "Successful Requests"
+    excel_suffix = "_flag_success_summary"
+    chart_suffix = "_flag_success"
+
+    def success_mask(self, df):
+        return (df["Flag_Success"] == 1).to_numpy(dtype=bool)
+
+    def failure_mask(self, df):
+        return (df["Flag_Success"] == 0).to_numpy(dtype=bool)
+
+    def console_lines(self, m):
+        return [
+            f"Successful Requests: {m['success_count']} ({m['success_rate']:.2f}%)",
+            f"Failed Requests: {m['failure_count']} ({m['failure_rate']:.2f}%)",
+        ]
+
+    def summary_rows(self, m):
+        return [
+            ("Total Requests", m["total_requests"]),
+            ("Successful Requests", m["success_count"]),
+            ("Successful Requests (%)", f"{m['success_rate']:.2f}%"),
+            ("Failed Requests", m["failure_count"]),
+            ("Failed Requests (%)", f"{m['failure_rate']:.2f}%"),
+            ("Unknown Flag Requests", m["total_requests"] - (m["success_count"] + m["failure_count"])),
+            ("Timeout Failures (>5 min)", m["timeout_count"]),
+            ("Combined Failures", m["combined_failure_count"]),
+            ("Combined Failure Rate (%)", f"{m['combined_failure_rate']:.2f}%"),
+        ] + _timing_rows(m)
+
+
+CRITERIA = {
+    StatusCriterion.name: StatusCriterion,
+    FlagCriterion.name: FlagCriterion,
+}
+
+
+def _timing_rows(m):
+    return [
+        ("Average Response Time (s)", round(m["avg_duration_sec"], 2)),
+        ("Variance (σ²)", round(m["variance"], 2)),
+        ("Standard Deviation (σ)", round(m["std_dev"], 2)),
+        ("Coefficient of Variation (CV)", round(m["cv"], 3)),
+        ("System Stability", m["stability"]),
+        ("Arrival Rate λ (req/sec)", round(m["arrival_rate"], 4)),
+        ("Little’s Law (L = λ × W)", round(m["L"], 2)),
+    ]
+
+
+def add_durations(df_all, criterion):
+    """
+    Steps 2-3: parse start/end columns and add created_sec/updated_sec/duration_sec.
+    """
+    df_all["created_sec"] = parse_duration_series(df_all[criterion.start_column])
+    df_all["updated_sec"] = parse_duration_series(df_all[criterion.end_column])
+    df_all["duration_sec"] = df_all["updated_sec"] - df_all["created_sec"]
+    return df_all
+
+
+def chunk_stats(df, criterion, timeout_sec=TIMEOUT_SEC):
+    """
+    One fused pass over a frame that already has duration columns.
+
+    Every mask is built once. Returns (counts, valid_mask): additive counts
+    for the frame and the boolean mask of successful requests with a usable
+    duration, which all timing math is based on.
+    """
+    duration = df["duration_sec"].to_numpy(dtype="float64")
+    success = criterion.success_mask(df)
+    failure = criterion.failure_mask(df)
+    # NaN compares False, so missing durations are neither timeouts nor valid
+    with np.errstate(invalid="ignore"):
+        timeout = duration > timeout_sec
+        valid = success & (duration >= 0)
+
+    counts = {
+        "total_requests": len(df),
+        "success_count": int(success.sum()),
+        "failure_count": int(failure.sum()),
+        "timeout_count": int(timeout.sum()),
+        "combined_failure_count": int((failure | timeout).sum()),
+        "valid_count": int(valid.sum()),
+    }
+    counts.update(criterion.extra_counts(df))
+    return counts, valid
+
+
+def derive_metrics(counts, avg_duration_sec, variance, window_start, window_end, percentiles):
+    """
+    Steps 4-4.5 from totals: rates, spread, stability and Little's Law.
+
+    Shared by the in-memory and streaming engines, so both report the same
+    numbers from the same inputs.
+    """
+    m = dict(counts)
+    total = m["total_requests"]
+    m["success_rate"] = _pct(m["success_count"], total)
+    m["failure_rate"] = _pct(m["failure_count"], total)
+    m["timeout_rate"] = _pct(m["timeout_count"], total)
+    m["combined_failure_rate"] = _pct(m["combined_failure_count"], total)
+
+    m["avg_duration_sec"] = avg_duration_sec
+    m["variance"] = variance
+    m["std_dev"] = float(np.sqrt(variance))
+    m["cv"] = m["std_dev"] / avg_duration_sec if avg_duration_sec else None
+    m["stability"] = stability_label(m["cv"])
+
+    # Step 4.4: Observation window (valid successful only)
+    m["window_start"] = window_start
+    m["window_end"] = window_end
+    m["total_observation_time_sec"] = window_end - window_start
+    if m["total_observation_time_sec"] <= 0:
+        raise ValueError("Invalid observation window")
+
+    # Step 4.5: Arrival rate λ (Little’s Law)
+    m["arrival_rate"] = m["success_count"] / m["total_observation_time_sec"]
+    m["L"] = m["arrival_rate"] * avg_duration_sec if avg_duration_sec else 0
+    m["percentiles"] = percentiles
+    return m
+
+
+class PerfRun:
+    """
+    Result of analyzing one load-test log: the frame, the valid mask and the metrics.
+    """
+
+    def __init__(self, input_file, criterion, df_all, valid, metrics, percentile_note=None):
+        self.input_file = input_file
+        self.criterion = criterion
+        self.df_all = df_all
+        self.valid = valid
+        self.metrics = metrics
+        # Set when percentiles are estimates (e.g. from a sketch) rather than exact
+        self.percentile_note = percentile_note
+        # Per-interval series from add_windows(), if requested
+        self.windows = None
+        self.window_sec = None
+        # (sink, rows, seconds) from the last save_excel()
+        self.write_times = []
+        # perf_counter() when the metrics became available
+        self.metrics_at = time.perf_counter()
+        self.base_filename = os.path.splitext(os.path.basename(input_file))[0]
+
+    @property
+    def df_valid(self):
+        return self.df_all[self.valid]
+
+    def percentiles_df(self):
+        percentiles = self.metrics["percentiles"]
+        return pd.DataFrame({
+            "Percentile": percentiles.index,
+            "Duration (s)": percentiles.to_numpy(),
+            "Note": [self.percentile_note or ""] * len(percentiles),
+        })
+
+    def summary_df(self):
+        """
+        Step 6: Summary DataFrame.
+        """
+        rows = self.criterion.summary_rows(self.metrics)
+        return pd.DataFrame({
+            "Metric": [metric for metric, _ in rows],
+            "Value": [value for _, value in rows],
+        })
+
+
+def analyze_frame(df_all, criterion, input_file="", timeout_sec=TIMEOUT_SEC):
+    """
+    Steps 2-4 on an in-memory frame with exact moments and percentiles.
+    """
+    with step("Steps 2-3: Parse durations", records=len(df_all)):
+        add_durations(df_all, criterion)
+    with step("Step 4: Metrics", records=len(df_all)):
+        counts, valid = chunk_stats(df_all, criterion, timeout_sec)
+
+        durations = df_all["duration_sec"].to_numpy(dtype="float64")[valid]
+        if len(durations):
+            avg_duration_sec = float(durations.mean())
+            variance = float(durations.var())
+            window_start = float(df_all["created_sec"].to_numpy()[valid].min())
+            window_end = float(df_all["updated_sec"].to_numpy()[valid].max())
+            quantiles = np.quantile(durations, PERCENTILES)
+        else:
+            avg_duration_sec = variance = window_start = window_end = float("nan")
+            quantiles = np.full(len(PERCENTILES), np.nan)
+        percentiles = pd.Series(quantiles, index=PERCENTILE_LABELS)
+
+        metrics = derive_metrics(counts, avg_duration_sec, variance, window_start, window_end, percentiles)
+    return PerfRun(input_file, criterion, df_all, valid, metrics)
+
+
+def in_flight(starts, ends, edges):
+    """
+    Time-weighted average and peak number of requests in flight per window.
+
+    Sweep over +1 (start) / -1 (end) events sorted by time; the running sum
+    after the last event at a timestamp is the concurrency from then on.
+    Windows are [edges[i], edges[i + 1]). O(n log n) for the sort.
+    """
+    if not len(starts):
+        return np.zeros(len(edges) - 1), np.zeros(len(edges) - 1)
+    times = np.concatenate([starts, ends])
+    deltas = np.concatenate([np.ones(len(starts)), -np.ones(len(ends))])
+    order = np.argsort(times, kind="stable")
+    times, levels = times[order], np.cumsum(deltas[order])
+    # area[i]: integral of the level from the first event up to times[i]
+    area = np.concatenate([[0.0], np.cumsum(levels[:-1] * np.diff(times))])
+
+    idx = np.searchsorted(times, edges, side="right") - 1
+    before = idx < 0
+    idx = np.maximum(idx, 0)
+    level_at = np.where(before, 0.0, levels[idx])
+    area_at = np.where(before, 0.0, area[idx] + levels[idx] * (edges - times[idx]))
+    average = np.diff(area_at) / np.diff(edges)
+
+    # Only the level after the last event at a timestamp is ever observable
+    settled = np.append(times[1:] != times[:-1], True)
+    peak = level_at[:-1].copy()
+    window = np.searchsorted(edges, times, side="right") - 1
+    inside = settled & (window >= 0) & (window < len(peak))
+    np.maximum.at(peak, window[inside], levels[inside])
+    return average, peak
+
+
+def windowed_series(df_all, valid, criterion, interval_sec, timeout_sec=TIMEOUT_SEC):
+    """
+    Per-interval view of a run, with requests binned by start time.
+
+    Arrival rate and error rate (status failures or timeouts) count every
+    request started in the interval; throughput counts successful requests
+    finishing in it; latency percentiles are over the successful requests
+    started in it. Concurrency covers every request with a start and end.
+    """
+    if interval_sec <= 0:
+        raise ValueError("interval_sec must be positive")
+    start = df_all["created_sec"].to_numpy(dtype="float64")
+    end = df_all["updated_sec"].to_numpy(dtype="float64")
+    duration = df_all["duration_sec"].to_numpy(dtype="float64")
+    has_start = ~np.isnan(start)
+    if not has_start.any():
+        return pd.DataFrame()
+
+    t0 = start[has_start].min()
+    t_end = max(start[has_start].max(), np.nanmax(end[valid], initial=t0))
+    n_windows = max(int(np.floor((t_end - t0) / interval_sec)) + 1, 1)
+    edges = t0 + interval_sec * np.arange(n_windows + 1)
+
+    def bin_of(times):
+        return np.minimum(((times - t0) // interval_sec).astype(np.int64), n_windows - 1)
+
+    started = np.bincount(bin_of(start[has_start]), minlength=n_windows)
+    with np.errstate(invalid="ignore"):
+        failed = has_start & (criterion.failure_mask(df_all) | (duration > timeout_sec))
+    errors = np.bincount(bin_of(start[failed]), minlength=n_windows)
+    finished = np.bincount(bin_of(end[valid]), minlength=n_windows)
+
+    spans = has_start & (duration >= 0)
+    avg_in_flight, peak_in_flight = in_flight(start[spans], end[spans], edges)
+
+    latency = pd.Series(duration[valid]).groupby(bin_of(start[valid]))
+    quantiles = latency.quantile([0.50, 0.95, 0.99]).unstack().reindex(range(n_windows))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        error_rate = np.where(started > 0, errors / started * 100, 0.0)
+    return pd.DataFrame({
+        "Window Start (s)": edges[:-1] - t0,
+        "Requests Started": started,
+        "Arrival Rate (req/s)": started / interval_sec,
+        "Throughput (req/s)": finished / interval_sec,
+        "Avg In-Flight": avg_in_flight,
+        "Peak In-Flight": peak_in_flight.astype(np.int64),
+        "Error Rate (%)": error_rate,
+        "Avg Latency (s)": latency.mean().reindex(range(n_windows)).to_numpy(),
+        "p50 Latency (s)": quantiles[0.50].to_numpy(),
+        "p95 Latency (s)": quantiles[0.95].to_numpy(),
+        "p99 Latency (s)": quantiles[0.99].to_numpy(),
+    })
+
+
+def add_windows(run, interval_sec, timeout_sec=TIMEOUT_SEC):
+    run.windows = windowed_series(run.df_all, run.valid, run.criterion, interval_sec, timeout_sec)
+    run.window_sec = interval_sec
+    return run.windows
+
+
+def print_summary(run):
+    """
+    Step 5: Console output.
+    """
+    m = run.metrics
+    print(f"\n{run.criterion.console_title}")
+    print(f"Total Requests Sent: {m['total_requests']}")
+    for line in run.criterion.console_lines(m):
+        print(line)
+    print(f"Average Response Time (sec): {m['avg_duration_sec']:.2f}")
+    print(f"Std Dev (sec): {m['std_dev']:.2f}")
+    print(f"CV: {m['cv']:.3f} → {m['stability']}")
+
+    print("\n--- Little’s Law ---")
+    print(f"Observation Window (sec): {round(m['total_observation_time_sec'], 2)}")
+    print(f"Arrival Rate λ (req/sec): {m['arrival_rate']:.4f}")
+    print(f"Average Time W (sec): {round(m['avg_duration_sec'], 2)}")
+    print(f"Average Concurrency L: {round(m['L'], 2)}")
+
+
+def save_excel(run, excel_output=None, raw_format="xlsx", xlsx_engine="openpyxl", show_times=False):
+    """
+    Step 7: Save Excel output.
+
+    raw_format="xlsx" keeps the request tables as sheets (the original report);
+    "parquet" or "csv.gz" writes them as files next to the workbook, and
+    "none" skips them, leaving only the Summary and derived sheets in Excel.
+    Tables too long for a sheet are always written as files.
+    """
+    excel_output = excel_output or f"{run.base_filename}{run.criterion.excel_suffix}.xlsx"
+    stem = os.path.splitext(excel_output)[0]
+    times = []
+
+    sheets = []
+    # Streamed runs keep no request rows, only the summary
+    if run.df_all is not None:
+        raw_tables = [("All Requests", run.df_all), (run.criterion.success_sheet, run.df_valid)]
+        if raw_format == "xlsx" and len(run.df_all) >= EXCEL_MAX_ROWS:
+            raw_format = "parquet" if HAVE_PARQUET else "csv.gz"
+            print(f"{len(run.df_all)} requests exceed Excel's row limit; writing them as {raw_format}")
+        for sheet_name, df in raw_tables:
+            if raw_format == "xlsx":
+                sheets.append((sheet_name, df))
+            elif raw_format != "none":
+                path = table_file_name(stem, sheet_name, raw_format)
+                start = time.perf_counter()
+                write_table(df, path, raw_format)
+                times.append((path, len(df), time.perf_counter() - start))
+                print(f"Saved {sheet_name}: {path}")
+
+    sheets.append(("Summary", run.summary_df()))
+    if run.percentile_note:
+        sheets.append(("Percentiles", run.percentiles_df()))
+    if run.windows is not None:
+        sheets.append(("Windowed", run.windows))
+    write_workbook(excel_output, sheets, xlsx_engine, times)
+
+    print(f"\nSaved Excel report: {excel_output}")
+    run.write_times = times
+    if show_times:
+        print_write_times(times)
+    return excel_output
+
+
+def _pyplot():
+    """
+    matplotlib is only imported once a chart is drawn, headless (Agg), so
+    numbers-only runs skip its import cost.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def plot_percentiles(percentile_values, chart_subject, output_file):
+    """
+    Step 8: Percentiles chart.
+    """
+    plt = _pyplot()
+    plt.figure(figsize=(8, 5))
+    ax = percentile_values.plot(kind="bar", color="#00ADB5", edgecolor="black")
+    plt.title(f"Job Process Time Percentiles ({chart_subject})")
+    plt.ylabel("Duration (seconds)")
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+
+    for i, value in enumerate(percentile_values):
+        ax.text(i, value * 1.02, f"{value:.2f}s", ha="center", va="bottom")
+
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close()
+
+
+def plot_mean_vs_stddev(avg_duration_sec, std_dev, cv, stability, output_file):
+    """
+    Step 9: Mean vs Std Dev chart.
+    """
+    plt = _pyplot()
+    plt.figure(figsize=(6, 5))
+    bars = plt.bar(
+        ["Mean (μ)", "Std Dev (σ)"],
+        [avg_duration_sec, std_dev],
+        color=["#0077b6", "#ffb703"],
+        edgecolor="black"
+    )
+
+    for bar in bars:
+        plt.text(
+            bar.get_x() + bar.get_width() / 2,
+            bar.get_height() * 1.02,
+            f"{bar.get_height():.2f}",
+            ha="center"
+        )
+
+    plt.text(
+        0.5,
+        max(avg_duration_sec, std_dev) * 0.85,
+        f"CV = {cv:.3f}\n{stability}",
+        ha="center",
+        bbox=dict(boxstyle="round", fc="lightyellow")
+    )
+
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close()
+
+
+def plot_windowed(windows, interval_sec, chart_subject, output_file):
+    """
+    Step 10: Load, concurrency and latency over time, one panel each.
+    """
+    plt = _pyplot()
+    x = windows["Window Start (s)"]
+    fig, (load_ax, flight_ax, latency_ax) = plt.subplots(3, 1, figsize=(10, 9), sharex=True)
+
+    load_ax.plot(x, windows["Arrival Rate (req/s)"], label="Arrival rate", color="#0077b6")
+    load_ax.plot(x, windows["Throughput (req/s)"], label="Throughput", color="#00ADB5")
+    load_ax.set_ylabel("req/s")
+    error_ax = load_ax.twinx()
+    error_ax.plot(x, windows["Error Rate (%)"], label="Error rate", color="#d62828", linestyle=":")
+    error_ax.set_ylabel("Error rate (%)")
+    load_ax.legend(loc="upper left")
+    error_ax.legend(loc="upper right")
+
+    flight_ax.plot(x, windows["Avg In-Flight"], label="Average", color="#0077b6")
+    flight_ax.plot(x, windows["Peak In-Flight"], label="Peak", color="#ffb703", drawstyle="steps-post")
+    flight_ax.set_ylabel("In-flight requests")
+    flight_ax.legend(loc="upper left")
+
+    for column, color in [("p50", "#00ADB5"), ("p95", "#ffb703"), ("p99", "#d62828")]:
+        latency_ax.plot(x, windows[f"{column} Latency (s)"], label=column, color=color)
+    latency_ax.set_ylabel("Latency (seconds)")
+    latency_ax.set_xlabel(f"Time since first request (s), {interval_sec:g}s windows")
+    latency_ax.legend(loc="upper left")
+
+    for ax in (load_ax, flight_ax, latency_ax):
+        ax.grid(linestyle="--", alpha=0.7)
+    fig.suptitle(f"Load, Concurrency and Latency Over Time ({chart_subject})")
+    fig.tight_layout()
+    fig.savefig(output_file)
+    plt.close(fig)
+
+
+def chart_jobs(run):
+    """
+    The charts of a run as picklable (plot_function, args) pairs.
+    """
+    m = run.metrics
+    suffix = run.criterion.chart_suffix
+    jobs = [
+        (plot_percentiles, (m["percentiles"], run.criterion.chart_subject,
+                            f"{run.base_filename}_percentile_chart{suffix}.png")),
+        (plot_mean_vs_stddev, (m["avg_duration_sec"], m["std_dev"], m["cv"], m["stability"],
+                               f"{run.base_filename}_mean_vs_stddev{suffix}.png")),
+    ]
+    if run.windows is not None and len(run.windows):
+        jobs.append((plot_windowed, (run.windows, run.window_sec, run.criterion.chart_subject,
+                                     f"{run.base_filename}_windowed{suffix}.png")))
+    return jobs
+
+
+def _render(job):
+    plot, args = job
+    plot(*args)
+    return args[-1]
+
+
+def render_charts(jobs, workers=1):
+    """
+    Draw chart jobs serially or, with workers > 1, in a process pool.
+
+    Each worker imports matplotlib once and draws many charts, so the pool
+    pays off when rendering the charts of many runs. Returns the file names.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return [_render(job) for job in jobs]
+    with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+        return list(pool.map(_render, jobs))
+
+
+def save_charts(run, workers=1):
+    return render_charts(chart_jobs(run), workers)
+
+
+def run_analysis(input_file, criterion, timeout_sec=TIMEOUT_SEC, excel=True, charts=True,
+                 window_sec=None, chart_workers=1, **excel_options):
+    """
+    Full analyzer run for one log: metrics, console summary, Excel report and charts.
+
+    With window_sec, a per-interval series is added to both (see windowed_series).
+    excel_options are passed on to save_excel().
+    """
+    with step("Step 1: Load requests") as load:
+        df_all = load_requests(input_file)
+        load.records = len(df_all)
+    run = analyze_frame(df_all, criterion, input_file, timeout_sec)
+    if window_sec:
+        with step("Windowed series", records=len(df_all)):
+            add_windows(run, window_sec, timeout_sec)
+    with step("Step 5: Console output"):
+        print_summary(run)
+    if excel:
+        with step("Step 7: Save Excel", records=len(df_all)):
+            save_excel(run, **excel_options)
+    if charts:
+        with step("Steps 8-10: Charts"):
+            save_charts(run, chart_workers)
+    return run
+
+
+def analyze_files(input_files, criterion, timeout_sec=TIMEOUT_SEC):
+    """
+    Analyze many logs in one process (no reports); returns {input_file: metrics}.
+    """
+    return {
+        input_file: analyze_frame(load_requests(input_file), criterion, input_file, timeout_sec).metrics
+        for input_file in input_files
+    }
+
+
+def main(criterion, description, started_at=None):
+    """
+    Command line of the analyzer entry points (perfTestAnalyzerStatus/Flag.py).
+
+    started_at is the entry point's perf_counter() before its heavy imports,
+    for --startup-time.
+    """
+    # perfStream builds on this module, so it is imported only when run
+    from perfStream import CHUNK_ROWS, run_stream_analysis
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("input_file", nargs="?", default="sample.csv", help="CSV or Excel log")
+    parser.add_argument("--stream", action="store_true",
+                        help="one pass in fixed memory for logs larger than RAM (Summary-only report)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk with --stream")
+    parser.add_argument("--accuracy", type=float, default=0.01,
+                        help="relative error bound of streamed percentiles (default: 0.01)")
+    parser.add_argument("--save-state", metavar="PATH",
+                        help="with --stream, write the mergeable summary state (see perfStream.py)")
+    parser.add_argument("--window", type=float, metavar="SEC",
+                        help="add throughput, concurrency, error rate and latency per SEC-second window")
+    parser.add_argument("--raw-format", choices=RAW_FORMATS, default="xlsx",
+                        help="where the request tables go: Excel sheets (default), "
+                             "Parquet / gzip CSV files next to the workbook, or nowhere")
+    parser.add_argument("--xlsx-engine", choices=XLSX_ENGINES, default="openpyxl",
+                        help="xlsxwriter writes rows in constant memory")
+    parser.add_argument("--write-times", action="store_true", help="print the time spent on each report sink")
+    parser.add_argument("--no-charts", action="store_true", help="numbers only; matplotlib is never imported")
+    parser.add_argument("--chart-workers", type=int, default=1, help="render charts in a process pool")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print the time from the start of this script to the first metric")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    if args.save_state and not args.stream:
+        parser.error("--save-state requires --stream")
+    if args.window and args.stream:
+        parser.error("--window needs the request rows and cannot be combined with --stream")
+    start_from_args(args)
+    options = dict(charts=not args.no_charts, chart_workers=args.chart_workers,
+                   raw_format=args.raw_format, xlsx_engine=args.xlsx_engine, show_times=args.write_times)
+
+    if args.stream:
+        run = run_stream_analysis(args.input_file, criterion, args.chunk_rows, relative_accuracy=args.accuracy,
+                                  **options)
+        if args.save_state:
+            run.state.save(args.save_state)
+    else:
+        run = run_analysis(args.input_file, criterion, window_sec=args.window, **options)
+
+    if args.startup_time and started_at is not None:
+        print(f"\nImport to first metric: {run.metrics_at - started_at:.3f}s")
+    return run
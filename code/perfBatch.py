@@ -0,0 +1,225 @@
+import argparse
+import glob
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from perfAnalyzerCore import (
+    CRITERIA, TIMEOUT_SEC, analyze_frame, chart_jobs, load_requests, render_charts, save_excel,
+)
+from perfReport import RAW_FORMATS, write_workbook
+from stepTrace import add_trace_arguments, start_from_args, step
+
+# Comparison columns: (column, metric key or percentile label, "higher" / "lower" is worse, or None)
+COMPARE_COLUMNS = [
+    ("Requests", "total_requests", None),
+    ("Success Rate (%)", "success_rate", "lower"),
+    ("Error Rate (%)", "failure_rate", "higher"),
+    ("Combined Failure Rate (%)", "combined_failure_rate", "higher"),
+    ("p50 (s)", "50th", "higher"),
+    ("p95 (s)", "95th", "higher"),
+    ("p99 (s)", "99th", "higher"),
+    ("Avg (s)", "avg_duration_sec", "higher"),
+    ("CV", "cv", "higher"),
+    ("λ (req/s)", "arrival_rate", "lower"),
+    ("L", "L", None),
+]
+
+# Rates are compared in percentage points, everything else relative to the baseline
+RATE_COLUMNS = {"Success Rate (%)", "Error Rate (%)", "Combined Failure Rate (%)"}
+
+
+def expand_inputs(patterns):
+    """
+    Sorted, de-duplicated CSV/Excel files matching any of the glob patterns.
+    """
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) or ([pattern] if os.path.isfile(pattern) else [])
+        files.update(path for path in matches if path.lower().endswith((".csv", ".xls", ".xlsx")))
+    return sorted(files)
+
+
+def run_names(input_files):
+    """
+    {input_file: name} for reports, charts and the comparison table.
+
+    The file name without extension, prefixed with its parent directory when
+    several inputs share it (node1/run.csv, node2/run.csv -> node1_run,
+    node2_run), and numbered if that is still ambiguous.
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in input_files]
+    names = {}
+    for path, stem in zip(input_files, stems):
+        if stems.count(stem) > 1:
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            stem = f"{parent}_{stem}"
+        names[path] = stem
+    counts = Counter(names.values())
+    seen = Counter()
+    for path, name in names.items():
+        if counts[name] > 1:
+            seen[name] += 1
+            names[path] = f"{name}_{seen[name]}"
+    return names
+
+
+def _analyze_one(job):
+    input_file, name, criterion_name, timeout_sec, reports, charts = job
+    try:
+        run = analyze_frame(load_requests(input_file), CRITERIA[criterion_name](), input_file, timeout_sec)
+        # Reports and charts are named after the run, so same-named logs do not overwrite each other
+        run.base_filename = name
+        if reports:
+            save_excel(run, **reports)
+        return input_file, run.metrics, chart_jobs(run) if charts else []
+    except Exception as error:
+        # One broken log should not sink the batch; it is reported instead
+        return input_file, error, []
+
+
+def analyze_batch(input_files, criterion_name="status", workers=None, timeout_sec=TIMEOUT_SEC,
+                  reports=None, charts=False):
+    """
+    Analyze many logs in one worker pool, in input order.
+
+    Returns {input_file: metrics or the exception raised}. reports, a dict of
+    save_excel() options, also writes each run's workbook; charts=True draws
+    every run's charts in the same pool afterwards.
+    """
+    names = run_names(input_files)
+    jobs = [(input_file, names[input_file], criterion_name, timeout_sec, reports, charts)
+            for input_file in input_files]
+    workers = workers or os.cpu_count()
+    # Pool workers' CPU time shows up as child_cpu_sec once the pool has shut down
+    with step("Analyze logs", records=len(jobs)):
+        if workers <= 1 or len(jobs) <= 1:
+            outcomes = [_analyze_one(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+                outcomes = list(pool.map(_analyze_one, jobs))
+
+    if charts:
+        with step("Steps 8-10: Charts"):
+            render_charts([job for _, _, run_jobs in outcomes for job in run_jobs], workers)
+    return {input_file: result for input_file, result, _ in outcomes}
+
+
+def delta_column(column):
+    """
+    "p95 (s)" -> "Δ p95 (%)"; rates change in percentage points: "Error Rate (%)" -> "Δ Error Rate (pp)".
+    """
+    name = column.split(" (")[0]
+    return f"Δ {name} (pp)" if column in RATE_COLUMNS else f"Δ {name} (%)"
+
+
+def _value(metrics, key):
+    percentiles = metrics["percentiles"]
+    return float(percentiles[key]) if key in percentiles.index else metrics[key]
+
+
+def comparison_table(results, baseline, threshold_pct=10.0, rate_threshold=1.0):
+    """
+    One row per run with the COMPARE_COLUMNS, their change against the
+    baseline run, and the list of metrics that regressed.
+
+    A latency, CV or λ change beyond threshold_pct percent in the worse
+    direction is a regression, as is a rate that worsened by more than
+    rate_threshold percentage points.
+    """
+    base = results[baseline]
+    names = run_names(list(results))
+    rows = []
+    for input_file, metrics in results.items():
+        row = {"Run": names[input_file], "Baseline": input_file == baseline}
+        if isinstance(metrics, Exception):
+            row["Regressions"] = f"failed: {metrics}"
+            rows.append(row)
+            continue
+
+        regressions = []
+        for column, key, worse in COMPARE_COLUMNS:
+            value = _value(metrics, key)
+            row[column] = value
+            if worse is None or input_file == baseline:
+                continue
+            reference = _value(base, key)
+            if column in RATE_COLUMNS:
+                change = value - reference
+                limit = rate_threshold
+            else:
+                change = (value - reference) / reference * 100 if reference else float("nan")
+                limit = threshold_pct
+            row[delta_column(column)] = change
+            if (change > limit) if worse == "higher" else (change < -limit):
+                regressions.append(column)
+        row["Regressions"] = ", ".join(regressions)
+        rows.append(row)
+
+    columns = ["Run", "Baseline"] + [column for column, _, _ in COMPARE_COLUMNS]
+    columns += [delta_column(column) for column, _, worse in COMPARE_COLUMNS if worse]
+    return pd.DataFrame(rows, columns=columns + ["Regressions"]).fillna({"Regressions": ""})
+
+
+def save_comparison(table, output_file):
+    if output_file.lower().endswith(".csv"):
+        table.to_csv(output_file, index=False)
+    else:
+        write_workbook(output_file, [("Comparison", table)])
+    print(f"\nSaved comparison: {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Analyze many load-test logs in one process pool and compare them against a baseline.")
+    parser.add_argument("inputs", nargs="+", help="CSV/Excel files or glob patterns (quote them)")
+    parser.add_argument("--criterion", choices=sorted(CRITERIA), default="status",
+                        help="success from the status column or from Flag_Success")
+    parser.add_argument("--baseline", help="run to compare against (default: the first file)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="relative change (%%) in latency, CV or λ that counts as a regression")
+    parser.add_argument("--rate-threshold", type=float, default=1.0,
+                        help="change in success/error rates (percentage points) that counts as a regression")
+    parser.add_argument("--output", default="comparison.xlsx", help=".xlsx or .csv")
+    parser.add_argument("--reports", action="store_true", help="also write each run's Excel report")
+    parser.add_argument("--raw-format", choices=RAW_FORMATS, default="none",
+                        help="request tables in the per-run reports (default: none)")
+    parser.add_argument("--charts", action="store_true", help="also draw each run's charts")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on any regression")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    input_files = expand_inputs(args.inputs)
+    if args.baseline:
+        if not os.path.isfile(args.baseline):
+            parser.error(f"baseline {args.baseline} does not exist")
+        baseline = next((path for path in input_files if os.path.realpath(path) == os.path.realpath(args.baseline)),
+                        args.baseline)
+        if baseline not in input_files:
+            input_files.insert(0, baseline)
+    elif input_files:
+        baseline = input_files[0]
+    else:
+        parser.error("no CSV/Excel files match the given inputs")
+
+    reports = dict(raw_format=args.raw_format) if args.reports else None
+    results = analyze_batch(input_files, args.criterion, args.workers, reports=reports, charts=args.charts)
+    if isinstance(results[baseline], Exception):
+        raise SystemExit(f"Baseline {baseline} failed: {results[baseline]}")
+
+    with step("Compare runs", records=len(results)):
+        table = comparison_table(results, baseline, args.threshold, args.rate_threshold)
+    with pd.option_context("display.max_columns", None, "display.width", 200, "display.precision", 2):
+        print(table.to_string(index=False))
+    with step("Save comparison"):
+        save_comparison(table, args.output)
+
+    regressed = table.loc[table["Regressions"] != "", "Run"].tolist()
+    if regressed:
+        print(f"\nRegressions against {run_names(list(results))[baseline]}: {', '.join(regressed)}")
+    if args.fail_on_regression and regressed:
+        raise SystemExit(1)
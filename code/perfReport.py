@@ -0,0 +1,102 @@
+import math
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet  # noqa: F401  (pandas.to_parquet backend)
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Excel's hard sheet limit, header row included
+EXCEL_MAX_ROWS = 1_048_576
+
+# Where the raw request tables go; "xlsx" keeps them as workbook sheets
+RAW_FORMATS = ["xlsx", "parquet", "csv.gz", "none"]
+XLSX_ENGINES = ["openpyxl", "xlsxwriter"]
+
+
+def table_file_name(stem, sheet_name, raw_format):
+    """
+    "sample_flag_success_summary" + "All Requests" -> "sample_flag_success_summary_all_requests.parquet"
+    """
+    return f"{stem}_{sheet_name.lower().replace(' ', '_')}.{raw_format}"
+
+
+def write_table(df, path, raw_format):
+    """
+    Write one raw table as Parquet (columnar, compressed) or gzip CSV.
+    """
+    if raw_format == "parquet":
+        if not HAVE_PARQUET:
+            raise ImportError("raw_format='parquet' requires the pyarrow package")
+        df.to_parquet(path, index=False)
+    elif raw_format == "csv.gz":
+        df.to_csv(path, index=False, compression="gzip")
+    else:
+        raise ValueError(f"Unsupported table format: {raw_format}")
+
+
+def _cell(value):
+    # xlsxwriter writes None as an empty cell; NaN/inf are not valid in a sheet
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _write_xlsxwriter(path, sheets, times):
+    if xlsxwriter is None:
+        raise ImportError("xlsx_engine='xlsxwriter' requires the xlsxwriter package")
+    # constant_memory flushes each row as soon as the next one starts, so rows
+    # must be written in order; pandas' to_excel writes column by column and
+    # would lose data, hence the row loop
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    for sheet_name, df in sheets:
+        start = time.perf_counter()
+        sheet = workbook.add_worksheet(sheet_name)
+        sheet.write_row(0, 0, [str(column) for column in df.columns])
+        for row_number, row in enumerate(df.itertuples(index=False, name=None), start=1):
+            sheet.write_row(row_number, 0, [_cell(value) for value in row])
+        times.append((f"{sheet_name} (sheet)", len(df), time.perf_counter() - start))
+    start = time.perf_counter()
+    workbook.close()
+    times.append((f"{path} (save)", None, time.perf_counter() - start))
+
+
+def write_workbook(path, sheets, xlsx_engine="openpyxl", times=None):
+    """
+    Write [(sheet_name, df), ...] to one .xlsx, timing each sheet and the final save.
+
+    Returns the list of (sink, rows, seconds) with this workbook's entries appended.
+    """
+    times = [] if times is None else times
+    if xlsx_engine == "xlsxwriter":
+        _write_xlsxwriter(path, sheets, times)
+        return times
+
+    writer = pd.ExcelWriter(path, engine=xlsx_engine)
+    try:
+        for sheet_name, df in sheets:
+            start = time.perf_counter()
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+            times.append((f"{sheet_name} (sheet)", len(df), time.perf_counter() - start))
+    finally:
+        # openpyxl builds the workbook in memory and serializes it here
+        start = time.perf_counter()
+        writer.close()
+        times.append((f"{path} (save)", None, time.perf_counter() - start))
+    return times
+
+
+def print_write_times(times):
+    print("\n--- Report Write Times ---")
+    for sink, rows, seconds in times:
+        rows = "" if rows is None else f"{rows} rows"
+        print(f"{sink:<60} {rows:>14} {seconds:8.3f}s")
+    print(f"{'Total':<60} {'':>14} {sum(seconds for _, _, seconds in times):8.3f}s")
@@ -0,0 +1,281 @@
+import argparse
+import json
+import math
+
+import pandas as pd
+
+from perfAnalyzerCore import (
+    CRITERIA, PERCENTILE_LABELS, PERCENTILES, TIMEOUT_SEC, PerfRun, add_durations, chunk_stats,
+    derive_metrics, load_requests, print_summary, save_charts, save_excel,
+)
+from perfReport import XLSX_ENGINES
+from quantileSketch import DDSketch
+from stepTrace import add_trace_arguments, start_from_args, step
+
+# Rows per chunk when streaming a log
+CHUNK_ROWS = 200_000
+
+# Bumped whenever the saved summary-state layout changes
+STATE_VERSION = 1
+
+
+def _as_text(values):
+    # Cell values as strings, missing stays missing; whole floats lose the
+    # ".0" a numeric ID picks up from Excel
+    def text(value):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    return values.map(text).astype(object)
+
+
+def iter_log_chunks(input_file, chunk_rows=CHUNK_ROWS, text_columns=()):
+    """
+    Yield the log as DataFrames of at most chunk_rows rows (columns stripped).
+
+    CSV and .xlsx are read incrementally; legacy .xls has no streaming reader
+    and is loaded in one piece. text_columns (stripped names, e.g. requestId)
+    are read as strings, so a chunk with a blank cell does not turn numeric
+    IDs into floats.
+    """
+    lower = input_file.lower()
+    if lower.endswith(".csv"):
+        header = pd.read_csv(input_file, encoding_errors="ignore", nrows=0).columns
+        dtype = {name: str for name in header if name.strip() in text_columns}
+        for chunk in pd.read_csv(input_file, encoding_errors="ignore", chunksize=chunk_rows, dtype=dtype):
+            chunk.columns = chunk.columns.str.strip()
+            yield chunk
+        return
+    if lower.endswith(".xlsx"):
+        chunks = _iter_xlsx_chunks(input_file, chunk_rows)
+    else:
+        chunks = [load_requests(input_file)]
+    for chunk in chunks:
+        for name in text_columns:
+            if name in chunk.columns:
+                chunk[name] = _as_text(chunk[name])
+        yield chunk
+
+
+def _iter_xlsx_chunks(input_file, chunk_rows):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(input_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(name).strip() for name in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+class SummaryState:
+    """
+    Everything the Summary sheet needs, accumulated chunk by chunk in O(1) memory.
+
+    Counts are summed; mean/variance use Welford's update in its pairwise form
+    (Chan et al.): each chunk's exact mean and M2 are folded into the running
+    ones, which is numerically stable however many chunks there are. The
+    observation window keeps min created / max updated of valid requests and
+    percentiles come from a DDSketch (see quantileSketch for its error bound).
+
+    States are plain data: to_dict()/save() on each load-generator node and
+    from_dict()/load() + merge() centrally give the same metrics as analyzing
+    the concatenated logs, in any merge order.
+    """
+
+    def __init__(self, criterion, timeout_sec=TIMEOUT_SEC, relative_accuracy=0.01):
+        self.criterion = criterion
+        self.timeout_sec = timeout_sec
+        self.counts = {}
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.window_start = math.inf
+        self.window_end = -math.inf
+        self.sketch = DDSketch(relative_accuracy)
+
+    def _add_counts(self, counts):
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def _add_moments(self, n, mean, m2):
+        if not n:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def update(self, chunk):
+        """
+        Fold one raw chunk of the log into the state.
+        """
+        add_durations(chunk, self.criterion)
+        counts, valid = chunk_stats(chunk, self.criterion, self.timeout_sec)
+        self._add_counts(counts)
+
+        durations = chunk["duration_sec"].to_numpy(dtype="float64")[valid]
+        if len(durations):
+            mean = durations.mean()
+            self._add_moments(len(durations), mean, float(((durations - mean) ** 2).sum()))
+            self.window_start = min(self.window_start, float(chunk["created_sec"].to_numpy()[valid].min()))
+            self.window_end = max(self.window_end, float(chunk["updated_sec"].to_numpy()[valid].max()))
+            self.sketch.add(durations)
+        return self
+
+    def merge(self, other):
+        """
+        Fold another state for the same criterion into this one.
+        """
+        if other.criterion.name != self.criterion.name:
+            raise ValueError("Cannot merge summaries of different success criteria")
+        if other.timeout_sec != self.timeout_sec:
+            raise ValueError("Cannot merge summaries with different timeouts")
+        self._add_counts(other.counts)
+        self._add_moments(other.n, other.mean, other.m2)
+        self.window_start = min(self.window_start, other.window_start)
+        self.window_end = max(self.window_end, other.window_end)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def metrics(self):
+        if self.n:
+            avg_duration_sec = self.mean
+            variance = self.m2 / self.n
+            window_start, window_end = self.window_start, self.window_end
+        else:
+            avg_duration_sec = variance = window_start = window_end = float("nan")
+        percentiles = pd.Series(self.sketch.quantiles(PERCENTILES), index=PERCENTILE_LABELS)
+        return derive_metrics(self.counts, avg_duration_sec, variance, window_start, window_end, percentiles)
+
+    def to_dict(self):
+        return {
+            "version": STATE_VERSION,
+            "criterion": self.criterion.name,
+            "timeout_sec": self.timeout_sec,
+            "counts": self.counts,
+            "n": self.n,
+            "mean": self.mean,
+            "m2": self.m2,
+            "window_start": self.window_start if self.n else None,
+            "window_end": self.window_end if self.n else None,
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported summary state version: {data.get('version')}")
+        state = cls(CRITERIA[data["criterion"]](), data["timeout_sec"])
+        state.counts = dict(data["counts"])
+        state.n = data["n"]
+        state.mean = data["mean"]
+        state.m2 = data["m2"]
+        if state.n:
+            state.window_start = data["window_start"]
+            state.window_end = data["window_end"]
+        state.sketch = DDSketch.from_dict(data["sketch"])
+        return state
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+    @property
+    def percentile_note(self):
+        return (f"DDSketch estimate, relative error <= "
+                f"{self.sketch.relative_accuracy:.2%} of the sample at rank q*(n-1)")
+
+
+def analyze_stream(input_file, criterion, chunk_rows=CHUNK_ROWS, timeout_sec=TIMEOUT_SEC,
+                   relative_accuracy=0.01):
+    """
+    One pass over a log of any size; returns a PerfRun without request rows.
+    """
+    state = SummaryState(criterion, timeout_sec, relative_accuracy)
+    with step("Steps 1-4: Stream chunks", records=0) as chunks:
+        for chunk in iter_log_chunks(input_file, chunk_rows):
+            state.update(chunk)
+            chunks.records += len(chunk)
+    return state_run(state, input_file)
+
+
+def state_run(state, name):
+    """
+    Wrap a (possibly merged) SummaryState as a PerfRun named after `name`.
+    """
+    run = PerfRun(name, state.criterion, None, None, state.metrics(), state.percentile_note)
+    run.state = state
+    return run
+
+
+def run_stream_analysis(input_file, criterion, chunk_rows=CHUNK_ROWS, timeout_sec=TIMEOUT_SEC,
+                        relative_accuracy=0.01, excel=True, charts=True, chart_workers=1,
+                        **excel_options):
+    """
+    Streaming counterpart of perfAnalyzerCore.run_analysis: Summary-only report.
+    """
+    run = analyze_stream(input_file, criterion, chunk_rows, timeout_sec, relative_accuracy)
+    with step("Step 5: Console output"):
+        print_summary(run)
+    if excel:
+        with step("Step 7: Save Excel"):
+            save_excel(run, **excel_options)
+    if charts:
+        with step("Steps 8-10: Charts"):
+            save_charts(run, chart_workers)
+    return run
+
+
+def merge_states(paths):
+    """
+    Load saved summary states and merge them into one.
+    """
+    states = [SummaryState.load(path) for path in paths]
+    merged = states[0]
+    for state in states[1:]:
+        merged.merge(state)
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge summary states saved with --save-state into one Summary report.")
+    parser.add_argument("states", nargs="+", help="state JSON files, one per node or log")
+    parser.add_argument("--name", default="merged", help="base name of the report files (default: merged)")
+    parser.add_argument("--save-state", metavar="PATH", help="also write the merged state")
+    parser.add_argument("--no-charts", action="store_true")
+    parser.add_argument("--xlsx-engine", choices=XLSX_ENGINES, default="openpyxl")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    with step("Merge states", records=len(args.states)):
+        merged = merge_states(args.states)
+    if args.save_state:
+        merged.save(args.save_state)
+    run = state_run(merged, args.name)
+    print(f"Merged {len(args.states)} summary states")
+    with step("Step 5: Console output"):
+        print_summary(run)
+    with step("Step 7: Save Excel"):
+        save_excel(run, xlsx_engine=args.xlsx_engine)
+    if not args.no_charts:
+        with step("Steps 8-10: Charts"):
+            save_charts(run)
@@ -0,0 +1,379 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from itertools import islice
+
+from columnarStore import columnar_format
+from dataFilter import REQUIRED_FIELDS, US_JURISDICTIONS, FilterPipeline, field_in, has_fields
+from dedupContent import MAX_INDEX, THRESHOLD, Deduplicator, MinHashIndex
+from jsonStream import is_json_lines, iter_records, open_writer
+from stepTrace import add_trace_arguments, start_from_args, step
+from wordBuckets import BucketEngine, count_words
+
+MODES = ["inline", "thread", "process"]
+
+# Records per queue message between threads/processes, and messages in flight per queue
+BATCH_SIZE = 512
+QUEUE_SIZE = 16
+
+
+# Sources: each returns an iterator of record dicts
+
+def csv_source(path):
+    from csvToJson import iter_csv_records
+    return iter_csv_records(path)
+
+
+def tsv_source(path):
+    from csvToJsonType2 import iter_json_objects
+    return iter_json_objects(path)
+
+
+def json_source(path):
+    return iter_records(path)
+
+
+def columnar_source(path):
+    from columnarStore import iter_records as iter_columnar_records
+    return iter_columnar_records(path)
+
+
+SOURCES = {"csv": csv_source, "tsv": tsv_source, "json": json_source, "columnar": columnar_source}
+
+
+def source_for(path):
+    lower = path.lower()
+    if columnar_format(lower):
+        return "columnar"
+    if is_json_lines(lower) or lower.endswith((".json", ".json.gz", ".json.zst")):
+        return "json"
+    return "tsv" if lower.endswith(".tsv") else "csv"
+
+
+# Stages: picklable callables from an iterator of records to an iterator of
+# records, with an optional summary() for the report
+
+class DedupStage:
+    """
+    dedupContent's duplicate removal; put it first so later steps skip the copies.
+    """
+
+    name = "dedup"
+
+    def __init__(self, fields=None, normalize=False, near=False, threshold=THRESHOLD, max_index=MAX_INDEX):
+        self.fields = fields
+        self.normalize = normalize
+        self.near = near
+        self.threshold = threshold
+        self.max_index = max_index
+        self.dedup = None
+
+    def __call__(self, records):
+        # The index is built here, not in __init__, so a process-mode stage pickles small
+        near = MinHashIndex(self.threshold, max_entries=self.max_index) if self.near else None
+        self.dedup = Deduplicator(self.fields, self.normalize, near)
+        return self.dedup.run(records)
+
+    def summary(self):
+        return self.dedup.summary() if self.dedup else {}
+
+
+class FilterStage:
+    """
+    dataFilter's checks: required fields present, `field` in `values`.
+    """
+
+    name = "filter"
+
+    def __init__(self, required=REQUIRED_FIELDS, values=US_JURISDICTIONS, field="leagueDivision",
+                 normalize=False):
+        self.required = list(required)
+        self.values = list(values)
+        self.field = field
+        self.normalize = normalize
+        self.pipeline = None
+
+    def __call__(self, records):
+        self.pipeline = FilterPipeline([
+            has_fields(self.required),
+            field_in(self.field, self.values, self.normalize),
+        ])
+        return self.pipeline.run(records)
+
+    def summary(self):
+        return {"rejected": self.pipeline.rejected} if self.pipeline else {}
+
+
+class CategorizeStage:
+    """
+    categorizeContent's word-count bucketing; adds CATEGORY to each record.
+    """
+
+    name = "categorize"
+
+    def __init__(self, field="CONTENT", engine=None):
+        self.field = field
+        self.engine = engine or BucketEngine()
+        self.category_counts = Counter()
+
+    def __call__(self, records):
+        label = self.engine.label
+        field = self.field
+        for item in records:
+            category = label(count_words(item.get(field) or ""))
+            item["CATEGORY"] = category
+            self.category_counts[category] += 1
+            yield item
+
+    def summary(self):
+        return {"categories": dict(self.category_counts)}
+
+
+def _batches(records, size):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _drain(inbox):
+    # Yield records from ("batch", records) messages until ("done", ...) / ("error", exc)
+    while True:
+        kind, payload = inbox.get()
+        if kind == "batch":
+            yield from payload
+        elif kind == "error":
+            raise payload
+        else:
+            return
+
+
+def _put(outbox, message, stop=None):
+    # Blocking put that gives up (returns False) once the consumer has stopped
+    # reading, so a full queue cannot hang the join after a downstream error
+    while True:
+        if stop is not None and stop.is_set():
+            return False
+        try:
+            outbox.put(message, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+
+
+def _feed(records, outbox, batch_size, stop=None):
+    try:
+        for batch in _batches(records, batch_size):
+            if not _put(outbox, ("batch", batch), stop):
+                return
+        _put(outbox, ("done", None), stop)
+    except BaseException as error:
+        _put(outbox, ("error", error), stop)
+
+
+def threaded(records, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+    """
+    Run the upstream iterator in a thread, handing batches over a bounded queue.
+    """
+    handoff = queue.Queue(queue_size)
+    stop = threading.Event()
+    thread = threading.Thread(target=_feed, args=(records, handoff, batch_size, stop), daemon=True)
+    thread.start()
+    try:
+        yield from _drain(handoff)
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _stage_worker(stage, inbox, outbox, batch_size):
+    try:
+        for batch in _batches(stage(_drain(inbox)), batch_size):
+            outbox.put(("batch", batch))
+        summary = stage.summary() if hasattr(stage, "summary") else {}
+        outbox.put(("done", summary))
+    except BaseException as error:
+        outbox.put(("error", error))
+
+
+def in_process(stage, records, summaries, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+    """
+    Run `stage` in a child process; records travel in batches over bounded queues.
+
+    A feeder thread sends upstream records; the stage's summary() comes back
+    with the end-of-stream message and is stored in summaries[stage.name].
+    """
+    inbox = multiprocessing.Queue(queue_size)
+    outbox = multiprocessing.Queue(queue_size)
+    worker = multiprocessing.Process(target=_stage_worker, args=(stage, inbox, outbox, batch_size), daemon=True)
+    worker.start()
+    stop = threading.Event()
+    feeder = threading.Thread(target=_feed, args=(records, inbox, batch_size, stop), daemon=True)
+    feeder.start()
+    try:
+        while True:
+            kind, payload = outbox.get()
+            if kind == "batch":
+                yield from payload
+            elif kind == "error":
+                raise payload
+            else:
+                summaries[stage.name] = payload
+                return
+    finally:
+        stop.set()
+        if worker.is_alive():
+            worker.terminate()
+        worker.join()
+        feeder.join()
+        # Batches still buffered for a worker that is gone must not block exit
+        inbox.cancel_join_thread()
+
+
+def _counted(records, counts, name):
+    n = 0
+    try:
+        for item in records:
+            n += 1
+            yield item
+    finally:
+        counts[name] = n
+
+
+def _checkpoint(records, path, written):
+    # Tee records to disk while they flow on to the next stage
+    with open_writer(path, indent=4) as writer:
+        for item in records:
+            writer.write(item)
+            yield item
+    written.append(path)
+
+
+def run_pipeline(source, stages, output_file=None, checkpoints=None, mode="inline",
+                 queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+    """
+    Stream records from `source` through `stages` in one pass.
+
+    mode="inline" chains plain generators in this thread; "thread" puts a
+    bounded queue and a thread between stages; "process" runs each stage in
+    its own process. Nothing touches disk except output_file and the
+    checkpoints, a {stage name or "source": path} dict of where to save the
+    records leaving that step. Returns a report dict.
+    """
+    checkpoints = dict(checkpoints or {})
+    unknown = set(checkpoints) - {"source"} - {stage.name for stage in stages}
+    if unknown:
+        raise ValueError(f"Checkpoints for unknown steps: {sorted(unknown)}")
+
+    start = time.perf_counter()
+    counts = {}
+    summaries = {}
+    written = []
+
+    records = _counted(source, counts, "source")
+    if "source" in checkpoints:
+        records = _checkpoint(records, checkpoints["source"], written)
+    for stage in stages:
+        if mode == "process":
+            records = in_process(stage, records, summaries, queue_size, batch_size)
+        else:
+            if mode == "thread":
+                records = threaded(records, queue_size, batch_size)
+            records = stage(records)
+        records = _counted(records, counts, stage.name)
+        if stage.name in checkpoints:
+            records = _checkpoint(records, checkpoints[stage.name], written)
+
+    if output_file:
+        with open_writer(output_file, indent=4) as writer:
+            for item in records:
+                writer.write(item)
+        written.append(output_file)
+    else:
+        for _ in records:
+            pass
+
+    if mode != "process":
+        summaries.update({stage.name: stage.summary() for stage in stages if hasattr(stage, "summary")})
+    return {
+        "mode": mode,
+        "records": counts,
+        "summaries": summaries,
+        "files": {path: os.path.getsize(path) for path in written},
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def print_report(report):
+    records = report["records"]
+    print(f"Pipeline ({report['mode']}) finished in {report['seconds']:.2f}s")
+    for name, count in records.items():
+        print(f"  {name:<12} {count:>10} records")
+        for key, value in report["summaries"].get(name, {}).items():
+            print(f"    {key}: {value}")
+    written = report["files"]
+    if written:
+        print(f"Written to disk: {sum(written.values()) / 1e6:.1f} MB")
+        for path, size in written.items():
+            print(f"  {path} ({size / 1e6:.1f} MB)")
+    if report["seconds"] > 0:
+        print(f"Throughput: {records['source'] / report['seconds']:,.0f} records/s")
+
+
+def _checkpoint_arg(value):
+    step, sep, path = value.partition("=")
+    if not sep or not path:
+        raise argparse.ArgumentTypeError("expected STEP=PATH")
+    return step, path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Stream records from a CSV, TSV, JSON or Parquet/Arrow file (reader chosen by suffix) "
+                    "through dedup / filter / categorize in one process, without intermediate files.")
+    parser.add_argument("input", help="CSV (csvToJson), TSV (csvToJsonType2), JSON/JSON Lines or Parquet/Arrow records")
+    parser.add_argument("--source", choices=sorted(SOURCES), help="input reader (default: from the suffix)")
+    parser.add_argument("--stages", default="filter,categorize",
+                        help="comma-separated steps from: dedup, filter, categorize (default: %(default)s)")
+    parser.add_argument("--output", help="final records (.json or .jsonl, optionally .gz/.zst, or .parquet/.arrow)")
+    parser.add_argument("--checkpoint", action="append", type=_checkpoint_arg, default=[], metavar="STEP=PATH",
+                        help="also save the records leaving STEP (source or a stage name); repeatable")
+    parser.add_argument("--mode", choices=MODES, default="inline")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dedup-fields", help="dedup: comma-separated text fields (default: first of "
+                                               "BODY_TEXT, articleText, CONTENT present)")
+    parser.add_argument("--near", action="store_true", help="dedup: also drop near duplicates (MinHash/LSH)")
+    parser.add_argument("--required", help="filter: comma-separated required fields "
+                                           f"(default: {','.join(REQUIRED_FIELDS)})")
+    parser.add_argument("--jurisdictions", help="filter: comma-separated leagueDivision values (default: U.S.)")
+    parser.add_argument("--normalize", action="store_true", help="filter: ignore case and extra whitespace")
+    parser.add_argument("--content-field", default="CONTENT", help="categorize: field to count words in")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    stage_types = {"dedup": lambda: DedupStage(args.dedup_fields.split(",") if args.dedup_fields else None,
+                                               near=args.near),
+                   "filter": lambda: FilterStage(
+                       args.required.split(",") if args.required else REQUIRED_FIELDS,
+                       args.jurisdictions.split(",") if args.jurisdictions else US_JURISDICTIONS,
+                       normalize=args.normalize),
+                   "categorize": lambda: CategorizeStage(args.content_field)}
+    names = [name.strip() for name in args.stages.split(",") if name.strip()]
+    unknown = [name for name in names if name not in stage_types]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    source = SOURCES[args.source or source_for(args.input)](args.input)
+    with step(f"Run pipeline ({args.mode})") as ran:
+        report = run_pipeline(source, [stage_types[name]() for name in names], args.output,
+                              dict(args.checkpoint), args.mode, args.queue_size, args.batch_size)
+        ran.records = report["records"]["source"]
+    print_report(report)
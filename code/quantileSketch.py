@@ -0,0 +1,116 @@
+import math
+
+import numpy as np
+
+
+class DDSketch:
+    """
+    Mergeable quantile sketch for non-negative values (DDSketch, Masson et al. 2019).
+
+    Values are counted in logarithmic buckets of ratio gamma = (1 + a) / (1 - a),
+    so quantile(q) is within a relative error of `relative_accuracy` (a) of the
+    sample x at rank floor(q * (n - 1)): |estimate - x| <= a * x. With the
+    default a = 0.01 a p99 of 120 s is reported somewhere in [118.8 s, 121.2 s].
+    pandas interpolates linearly between that sample and the next one, so the
+    two can also differ by the gap between neighbouring samples.
+
+    Memory is one counter per occupied bucket: about ln(max / min) / (2 a)
+    buckets, e.g. ~1,000 for values between 1 ms and 10^6 s at a = 0.01.
+    Two sketches with the same accuracy merge exactly by adding counters.
+    """
+
+    # Values at or below this are counted as zero (durations are >= 0)
+    MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values):
+        """
+        Add a batch (array-like) of values; NaN values are ignored.
+        """
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        if (values < 0).any():
+            raise ValueError("DDSketch only accepts non-negative values")
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values > self.MIN_INDEXABLE]
+        self.zero_count += len(values) - len(positive)
+        keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                 return_counts=True)
+        bins = self.bins
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            bins[key] = bins.get(key, 0) + count
+
+    def merge(self, other):
+        """
+        Fold another sketch (same relative_accuracy) into this one.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """
+        Estimated value at quantile q (0..1); NaN for an empty sketch.
+        """
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                # Midpoint of the bucket (in relative terms), clamped to what was seen
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs):
+        return [self.quantile(q) for q in qs]
+
+    def to_dict(self):
+        """
+        JSON-serializable form; from_dict() restores an identical sketch.
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "zero_count": self.zero_count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "bins": {str(key): count for key, count in sorted(self.bins.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.count = data["count"]
+        sketch.zero_count = data["zero_count"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        sketch.bins = {int(key): count for key, count in data["bins"].items()}
+        return sketch
@@ -1,7 +1,129 @@
+import argparse
+import glob
 import json
 import csv
+import os
+import tempfile
+import time
+from multiprocessing import Pool
 
-def analyze_results(json_file):
+from jsonStream import detect_encoding, iter_json_member
+from stepTrace import add_trace_arguments, start_from_args, step
+
+# Error request IDs kept in memory before --stream spills them to a temporary file
+SPILL_AFTER = 100_000
+
+
+class ErrorIds:
+    """
+    Append-only list of error request IDs.
+
+    Once it holds more than spill_after IDs (None: never) they move to a
+    temporary file, one JSON value per line, so memory stays bounded however
+    many requests failed.
+    """
+
+    def __init__(self, spill_after=None):
+        self.spill_after = spill_after
+        self.ids = []
+        self.count = 0
+        self.file = None
+
+    def append(self, request_id):
+        self.count += 1
+        if self.file is not None:
+            self.file.write(json.dumps(request_id) + "\n")
+            return
+        self.ids.append(request_id)
+        if self.spill_after is not None and len(self.ids) > self.spill_after:
+            self.file = tempfile.TemporaryFile("w+", encoding="utf-8")
+            self.file.writelines(json.dumps(eid) + "\n" for eid in self.ids)
+            self.ids = []
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.file is None:
+            yield from self.ids
+            return
+        self.file.seek(0)
+        for line in self.file:
+            yield json.loads(line)
+        self.file.seek(0, 2)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def result_class(result):
+    """
+    "completed_with_results", "completed_empty", "error" or "other" for one result object.
+    """
+    if isinstance(result, dict):
+        status = result.get('status', '')
+        if status == 'Completed':
+            if result.get('result') and isinstance(result['result'], list) and result['result']:
+                return "completed_with_results"
+            return "completed_empty"
+        elif status == 'Error':
+            return "error"
+    return "other"
+
+
+def count_results(results, error_ids):
+    """
+    Count statuses over any iterable of result objects, collecting error IDs.
+    """
+    counts = {"total": 0, "completed": 0, "completed_with_results": 0, "error": 0}
+
+    for result in results:
+        counts["total"] += 1
+        kind = result_class(result)
+        if kind == "completed_with_results":
+            counts["completed"] += 1
+            counts["completed_with_results"] += 1
+        elif kind == "completed_empty":
+            counts["completed"] += 1
+        elif kind == "error":
+            counts["error"] += 1
+            error_ids.append(result.get('requestId', 'N/A'))
+
+    return counts
+
+
+def write_summary(counts, error_ids, output_csv="Results_Summary.csv", extra_rows=()):
+    total_count = counts["total"]
+    completed_count = counts["completed"]
+    error_count = counts["error"]
+
+    # Percentages (avoid division by zero)
+    completed_percent = (completed_count / total_count * 100) if total_count else 0
+    error_percent = (error_count / total_count * 100) if total_count else 0
+
+    # Save summary to CSV
+    with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        # Header
+        writer.writerow(["Metric", "Value"])
+        writer.writerow(["Total objects", total_count])
+        writer.writerow(["Completed", f"{completed_count} ({completed_percent:.2f}%)"])
+        writer.writerow(["Completed with non-empty results", counts["completed_with_results"]])
+        writer.writerow(["Error", f"{error_count} ({error_percent:.2f}%)"])
+        writer.writerows(extra_rows)
+
+        # Empty line then errors
+        writer.writerow([])
+        writer.writerow(["Error Request IDs"])
+        for eid in error_ids:
+            writer.writerow([eid])
+
+    print(f"Processing complete! Results saved to '{output_csv}'.")
+
+
+def analyze_results(json_file, output_csv="Results_Summary.csv"):
     try:
         # Try with utf-8 first
         with open(json_file, 'r', encoding='utf-8') as file:
@@ -19,49 +141,163 @@ def analyze_results(json_file):
         print("Invalid JSON structure: expected a dictionary with 'results' key.")
         return
 
-    results = data['results']
-    total_count = len(results)
+    error_ids = []
+    counts = count_results(data['results'], error_ids)
+    write_summary(counts, error_ids, output_csv)
+    return counts
+
+
+def analyze_results_stream(json_file, output_csv="Results_Summary.csv", spill_after=SPILL_AFTER):
+    """
+    Same summary as analyze_results() in one pass with bounded memory.
+
+    The encoding is detected once from the BOM / first bytes, `results`
+    items are decoded one at a time, and only the counters and the error
+    IDs (spilled to disk past spill_after) are kept.
+    """
+    error_ids = ErrorIds(spill_after)
+    try:
+        encoding = detect_encoding(json_file)
+        counts = count_results(iter_json_member(json_file, "results", encoding=encoding), error_ids)
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+        error_ids.close()
+        print(f"Error reading file: {e}")
+        return
+    except (KeyError, ValueError):
+        error_ids.close()
+        print("Invalid JSON structure: expected a dictionary with 'results' key.")
+        return
 
-    completed_count = 0
-    completed_with_results_count = 0
-    error_count = 0
+    try:
+        write_summary(counts, error_ids, output_csv)
+    finally:
+        error_ids.close()
+    return counts
+
+
+def _count_file(job):
+    index, json_file = job
+    start = time.perf_counter()
     error_ids = []
+    try:
+        encoding = detect_encoding(json_file)
+        counts = count_results(iter_json_member(json_file, "results", encoding=encoding), error_ids)
+        problem = ""
+    except (KeyError, ValueError, OSError) as e:
+        # A bad shard is reported in the breakdown instead of stopping the batch
+        counts = {"total": 0, "completed": 0, "completed_with_results": 0, "error": 0}
+        error_ids = []
+        problem = f"{type(e).__name__}: {e}"
+    return index, json_file, counts, error_ids, problem, time.perf_counter() - start
 
-    for result in results:
-        if isinstance(result, dict):
-            status = result.get('status', '')
-            request_id = result.get('requestId', 'N/A')
-
-            if status == 'Completed':
-                completed_count += 1
-                if result.get('result') and isinstance(result['result'], list) and result['result']:
-                    completed_with_results_count += 1
-            elif status == 'Error':
-                error_count += 1
-                error_ids.append(request_id)
 
-    # Percentages (avoid division by zero)
-    completed_percent = (completed_count / total_count * 100) if total_count else 0
-    error_percent = (error_count / total_count * 100) if total_count else 0
+def _id_key(request_id):
+    # Hashable form of any JSON request ID (lists and objects included)
+    return json.dumps(request_id, sort_keys=True)
 
-    # Save summary to CSV
-    with open("Results_Summary.csv", 'w', newline='', encoding='utf-8') as csvfile:
+
+def analyze_many(json_files, output_csv="Results_Summary.csv", breakdown_csv="Results_By_File.csv",
+                 workers=None, spill_after=SPILL_AFTER):
+    """
+    Stream many result files across a process pool and roll them up.
+
+    Writes the usual summary for all files together (with error request
+    IDs de-duplicated across files) and a per-file breakdown, and returns
+    the rolled-up counts. Each file's error IDs are spilled past spill_after
+    as its result arrives, so memory stays bounded however many files failed.
+    """
+    start = time.perf_counter()
+    totals = {"total": 0, "completed": 0, "completed_with_results": 0, "error": 0}
+    per_file = [None] * len(json_files)
+    file_error_ids = [None] * len(json_files)
+
+    jobs = list(enumerate(json_files))
+    workers = min(workers or os.cpu_count(), len(jobs)) or 1
+    unique_error_ids = ErrorIds(spill_after)
+    try:
+        with Pool(workers) as pool:
+            # Shards finish in any order; rows are put back in input order
+            for index, json_file, counts, error_ids, problem, seconds in pool.imap_unordered(_count_file, jobs):
+                for key, value in counts.items():
+                    totals[key] += value
+                per_file[index] = (json_file, counts, problem, seconds)
+                file_error_ids[index] = ErrorIds(spill_after)
+                for eid in error_ids:
+                    file_error_ids[index].append(eid)
+
+        # First occurrence wins, in input order, so the output does not depend on scheduling
+        seen = set()
+        for error_ids in file_error_ids:
+            for eid in error_ids:
+                key = _id_key(eid)
+                if key not in seen:
+                    seen.add(key)
+                    unique_error_ids.append(eid)
+            error_ids.close()
+
+        failed = sum(1 for _, _, problem, _ in per_file if problem)
+        write_summary(totals, unique_error_ids, output_csv, [
+            ["Files", len(json_files)],
+            ["Files that could not be read", failed],
+            ["Unique error request IDs", len(unique_error_ids)],
+        ])
+    finally:
+        unique_error_ids.close()
+        for error_ids in file_error_ids:
+            if error_ids is not None:
+                error_ids.close()
+
+    with open(breakdown_csv, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile)
-        # Header
-        writer.writerow(["Metric", "Value"])
-        writer.writerow(["Total objects", total_count])
-        writer.writerow(["Completed", f"{completed_count} ({completed_percent:.2f}%)"])
-        writer.writerow(["Completed with non-empty results", completed_with_results_count])
-        writer.writerow(["Error", f"{error_count} ({error_percent:.2f}%)"])
+        writer.writerow(["File", "Total objects", "Completed", "Completed with non-empty results", "Error",
+                         "Completed (%)", "Error (%)", "Seconds", "Problem"])
+        for json_file, counts, problem, seconds in per_file:
+            total = counts["total"]
+            writer.writerow([
+                json_file, total, counts["completed"], counts["completed_with_results"], counts["error"],
+                f"{counts['completed'] / total * 100:.2f}" if total else "0.00",
+                f"{counts['error'] / total * 100:.2f}" if total else "0.00",
+                f"{seconds:.3f}", problem,
+            ])
+    print(f"Per-file breakdown saved to '{breakdown_csv}'.")
 
-        # Empty line then errors
-        writer.writerow([])
-        writer.writerow(["Error Request IDs"])
-        for eid in error_ids:
-            writer.writerow([eid])
+    elapsed = time.perf_counter() - start
+    print(f"{len(json_files)} files, {totals['total']} records in {elapsed:.2f}s with {workers} workers: "
+          f"{len(json_files) / elapsed:.1f} files/s, {totals['total'] / elapsed:,.0f} records/s")
+    if failed:
+        print(f"{failed} files could not be read; see the Problem column")
+    return totals
+
+
+if __name__ == "__main__":
+    # Run
+    json_file_path = 'DataOutput.json'
+
+    parser = argparse.ArgumentParser(description="Count result statuses and list error request IDs.")
+    parser.add_argument("json_file", nargs="*", default=[json_file_path],
+                        help="result file(s) or glob patterns; several files are rolled up")
+    parser.add_argument("--output", default="Results_Summary.csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="read `results` incrementally in bounded memory (for multi-GB files; "
+                             "always on with several files)")
+    parser.add_argument("--spill-after", type=int, default=SPILL_AFTER,
+                        help="with --stream or several files, error IDs kept in memory before spilling to "
+                             "a temporary file")
+    parser.add_argument("--workers", type=int, help="processes for several files (default: all cores)")
+    parser.add_argument("--breakdown", default="Results_By_File.csv", help="per-file CSV for several files")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
 
-    print("Processing complete! Results saved to 'Results_Summary.csv'.")
+    json_files = []
+    for pattern in args.json_file:
+        json_files.extend(sorted(glob.glob(pattern)) or [pattern])
 
-# Run
-json_file_path = 'DataOutput.json'
-analyze_results(json_file_path)
+    with step("Count results") as counted:
+        if len(json_files) > 1:
+            counts = analyze_many(json_files, args.output, args.breakdown, args.workers, args.spill_after)
+        elif args.stream:
+            counts = analyze_results_stream(json_files[0], args.output, args.spill_after)
+        else:
+            counts = analyze_results(json_files[0], args.output)
+        counted.records = counts["total"] if counts else 0
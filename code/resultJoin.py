@@ -0,0 +1,181 @@
+import argparse
+import glob
+
+import numpy as np
+import pandas as pd
+
+from jsonStream import detect_encoding, iter_json_member
+from perfAnalyzerCore import CRITERIA, PERCENTILE_LABELS, PERCENTILES, add_durations
+from perfStream import CHUNK_ROWS, iter_log_chunks
+from quantileSketch import DDSketch
+from resultCount import result_class
+from stepTrace import add_trace_arguments, start_from_args, step
+
+RESULT_CLASSES = ["completed_with_results", "completed_empty", "error", "other"]
+CLASS_LABELS = {
+    "completed_with_results": "Completed with results",
+    "completed_empty": "Completed, empty result",
+    "error": "Error",
+    "other": "Other status",
+}
+
+# Empty completions faster than this percentile of completed-with-results are flagged
+FAST_PERCENTILE = 0.05
+
+
+def build_result_index(json_files):
+    """
+    Hash index requestId -> result class over result files, streamed one item at a time.
+
+    IDs are compared as strings; a later duplicate overwrites an earlier one.
+    Returns (index, duplicates).
+    """
+    codes = {kind: code for code, kind in enumerate(RESULT_CLASSES)}
+    index = {}
+    duplicates = 0
+    for json_file in json_files:
+        encoding = detect_encoding(json_file)
+        for result in iter_json_member(json_file, "results", encoding=encoding):
+            if not isinstance(result, dict) or result.get("requestId") is None:
+                continue
+            request_id = str(result["requestId"])
+            if request_id in index:
+                duplicates += 1
+            index[request_id] = codes[result_class(result)]
+    return index, duplicates
+
+
+class LatencyJoin:
+    """
+    Per-result-class latency of perf-log requests, joined on requestId.
+
+    The perf log is streamed in chunks through the result index; each class
+    keeps a count, a running sum and a DDSketch, so memory is the index
+    plus the completed-empty requests kept as fast-result candidates.
+    """
+
+    def __init__(self, index, relative_accuracy=0.01, duplicates=0):
+        self.index = index
+        self.duplicates = duplicates
+        self.counts = np.zeros(len(RESULT_CLASSES), dtype=np.int64)
+        self.sums = np.zeros(len(RESULT_CLASSES))
+        self.sketches = [DDSketch(relative_accuracy) for _ in RESULT_CLASSES]
+        self.log_rows = 0
+        self.unmatched = 0
+        self.no_duration = 0
+        self.matched_ids = set()
+        self._empty = []
+
+    def update(self, chunk, criterion):
+        add_durations(chunk, criterion)
+        self.log_rows += len(chunk)
+        request_ids = chunk["requestId"].astype(str)
+        codes = request_ids.map(self.index)
+        matched = codes.notna().to_numpy()
+        self.unmatched += int((~matched).sum())
+        self.matched_ids.update(request_ids[matched])
+
+        durations = chunk["duration_sec"].to_numpy(dtype="float64")
+        with np.errstate(invalid="ignore"):
+            timed = matched & (durations >= 0)
+        self.no_duration += int((matched & ~timed).sum())
+        codes = codes.to_numpy()[timed].astype(np.int64)
+        durations = durations[timed]
+
+        self.counts += np.bincount(codes, minlength=len(RESULT_CLASSES))
+        self.sums += np.bincount(codes, weights=durations, minlength=len(RESULT_CLASSES))
+        for code, sketch in enumerate(self.sketches):
+            sketch.add(durations[codes == code])
+
+        empty = codes == RESULT_CLASSES.index("completed_empty")
+        if empty.any():
+            self._empty.append(pd.DataFrame({
+                "requestId": request_ids.to_numpy()[timed][empty],
+                "duration_sec": durations[empty],
+            }))
+
+    @property
+    def results_without_timing(self):
+        return len(self.index) - len(self.matched_ids)
+
+    def class_table(self):
+        rows = []
+        for code, kind in enumerate(RESULT_CLASSES):
+            count = int(self.counts[code])
+            sketch = self.sketches[code]
+            row = {"Result": CLASS_LABELS[kind], "Requests": count,
+                   "Avg (s)": self.sums[code] / count if count else float("nan")}
+            row.update({f"{label} (s)": value
+                        for label, value in zip(PERCENTILE_LABELS, sketch.quantiles(PERCENTILES))})
+            row["Min (s)"] = sketch.min if count else float("nan")
+            row["Max (s)"] = sketch.max if count else float("nan")
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def fast_empty(self, threshold_sec=None):
+        """
+        Completed-empty requests faster than threshold_sec (default: the
+        FAST_PERCENTILE latency of completed-with-results), fastest first.
+        Returns (threshold, frame).
+        """
+        if threshold_sec is None:
+            threshold_sec = self.sketches[RESULT_CLASSES.index("completed_with_results")].quantile(FAST_PERCENTILE)
+        if not self._empty or np.isnan(threshold_sec):
+            return threshold_sec, pd.DataFrame(columns=["requestId", "duration_sec"])
+        empty = pd.concat(self._empty, ignore_index=True)
+        fast = empty[empty["duration_sec"] < threshold_sec].sort_values("duration_sec", kind="stable")
+        return threshold_sec, fast.reset_index(drop=True)
+
+
+def join_latency(result_files, log_file, criterion, chunk_rows=CHUNK_ROWS, relative_accuracy=0.01):
+    with step("Index results") as indexed:
+        index, duplicates = build_result_index(result_files)
+        indexed.records = len(index)
+    join = LatencyJoin(index, relative_accuracy, duplicates)
+    with step("Join perf log", records=0) as joined:
+        for chunk in iter_log_chunks(log_file, chunk_rows, text_columns=("requestId",)):
+            join.update(chunk, criterion)
+            joined.records += len(chunk)
+    return join
+
+
+def print_join(join, table, threshold_sec, fast):
+    print("\n--- Latency by Result ---")
+    print(f"Results indexed: {len(join.index)} ({join.duplicates} duplicate requestIds)")
+    print(f"Perf log rows: {join.log_rows}, without a result: {join.unmatched}, "
+          f"matched but without a duration: {join.no_duration}")
+    print(f"Results without timing: {join.results_without_timing}")
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.precision", 2):
+        print(table.to_string(index=False))
+    print(f"\nSuspiciously fast empty results (< {threshold_sec:.2f}s): {len(fast)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Latency percentiles per result class, joining result files with a perf log on requestId.")
+    parser.add_argument("log_file", help="perf-analyzer CSV/Excel log with requestId and timestamps")
+    parser.add_argument("result_files", nargs="+", help="result JSON files or glob patterns")
+    parser.add_argument("--criterion", choices=sorted(CRITERIA), default="status",
+                        help="which timestamp columns to use: created/updated (status) or started/ended (flag)")
+    parser.add_argument("--fast-sec", type=float,
+                        help="flag empty completions faster than this (default: the p5 of completed-with-results)")
+    parser.add_argument("--output", default="Latency_By_Result.csv")
+    parser.add_argument("--fast-output", default="Fast_Empty_Results.csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    result_files = []
+    for pattern in args.result_files:
+        result_files.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    join = join_latency(result_files, args.log_file, CRITERIA[args.criterion](), args.chunk_rows)
+    with step("Latency by result"):
+        table = join.class_table()
+        threshold_sec, fast = join.fast_empty(args.fast_sec)
+    print_join(join, table, threshold_sec, fast)
+
+    table.to_csv(args.output, index=False)
+    fast.to_csv(args.fast_output, index=False)
+    print(f"\nSaved '{args.output}' and '{args.fast_output}'.")
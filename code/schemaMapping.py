@@ -0,0 +1,118 @@
+import csv
+from operator import itemgetter
+
+
+class Constant:
+    """
+    Mapping source that always produces the same value (e.g. an empty "eventId").
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"Constant({self.value!r})"
+
+
+class RowMapping:
+    """
+    Declarative source column -> target key mapping, compiled once per header.
+
+    `spec` is a list of (target, source) or (target, source, default) tuples,
+    where source is a column name or a Constant. Columns missing from the
+    header produce the field's default (the mapping-wide `default` if unset),
+    which matches row.get(column, "") on a csv.DictReader row.
+    """
+
+    def __init__(self, spec, default=""):
+        self.fields = []
+        for entry in spec:
+            target, source = entry[0], entry[1]
+            field_default = entry[2] if len(entry) > 2 else default
+            self.fields.append((target, source, field_default))
+
+    @property
+    def targets(self):
+        return [target for target, _, _ in self.fields]
+
+    @property
+    def sources(self):
+        return [source for _, source, _ in self.fields if not isinstance(source, Constant)]
+
+    def compile(self, header):
+        """
+        Return a function turning one csv.reader row (list) into an output dict.
+
+        Constants and missing-column defaults are baked into a template dict;
+        per row only the column values are picked with a single itemgetter.
+        """
+        # Last occurrence wins for duplicate header names, as in DictReader
+        positions = {name: i for i, name in enumerate(header)}
+        template = {}
+        row_keys = []
+        indices = []
+        for target, source, default in self.fields:
+            if isinstance(source, Constant):
+                template[target] = source.value
+            elif source in positions:
+                template[target] = None
+                row_keys.append(target)
+                indices.append(positions[source])
+            else:
+                template[target] = default
+
+        width = len(header)
+        # DictReader fills short rows with None
+        padding = [None] * width
+
+        if not indices:
+            return lambda row: template.copy()
+        if len(indices) == 1:
+            index = indices[0]
+            pick = lambda row: (row[index],)
+        else:
+            pick = itemgetter(*indices)
+
+        def transform(row):
+            if len(row) < width:
+                row = row + padding[len(row):]
+            out = template.copy()
+            out.update(zip(row_keys, pick(row)))
+            return out
+
+        return transform
+
+    def map_frame(self, df, fill_missing=True):
+        """
+        Apply the mapping to a DataFrame column-wise (used by the pandas path).
+
+        With fill_missing=False, fields whose source column is absent are dropped
+        instead of filled with their default.
+        """
+        import pandas as pd
+
+        columns = {}
+        for target, source, default in self.fields:
+            if isinstance(source, Constant):
+                columns[target] = source.value
+            elif source in df.columns:
+                columns[target] = df[source]
+            elif fill_missing:
+                columns[target] = default
+        return pd.DataFrame(columns, index=df.index)
+
+
+def iter_mapped_rows(csv_file, mapping, delimiter=",", encoding="utf-8"):
+    """
+    Yield mapped dicts for every row of a delimited file, read with plain csv.reader.
+    """
+    with open(csv_file, "r", encoding=encoding, newline="") as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        transform = mapping.compile(header)
+        for row in reader:
+            # DictReader skips blank lines
+            if row:
+                yield transform(row)
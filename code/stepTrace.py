@@ -0,0 +1,349 @@
+import argparse
+import atexit
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, so no RSS / child CPU figures
+    resource = None
+
+# Set these instead of passing --trace / --profile, e.g. from a scheduled job
+TRACE_ENV = "STEP_TRACE"
+PROFILE_ENV = "STEP_PROFILE"
+PROFILERS = ["cprofile", "tracemalloc"]
+
+# Allocation sites listed in the tracemalloc dump
+TOP_ALLOCATIONS = 30
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _usage():
+    # (CPU seconds of finished child processes, peak RSS of this process in bytes)
+    if resource is None:
+        return 0.0, 0
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+    return children.ru_utime + children.ru_stime, peak
+
+
+def _mb(size):
+    return round(size / 1e6, 2)
+
+
+class Step:
+    """
+    One timed step; set `records` inside the with-block if it is not known up front.
+    """
+
+    def __init__(self, tracer, name, records=None):
+        self.tracer = tracer
+        self.name = name
+        self.records = records
+
+    def __enter__(self):
+        tracer = self.tracer
+        self.parent = tracer.stack[-1].name if tracer.stack else None
+        self.depth = len(tracer.stack)
+        tracer.stack.append(self)
+        # Reserve the slot now so steps are listed in the order they started
+        self._index = len(tracer.steps)
+        tracer.steps.append(None)
+        if tracer.profile == "tracemalloc":
+            tracemalloc.reset_peak()
+        self._child_cpu, self._peak = _usage()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        child_cpu, peak = _usage()
+        entry = {
+            "name": self.name,
+            "parent": self.parent,
+            "depth": self.depth,
+            "wall_sec": round(wall, 6),
+            "cpu_sec": round(cpu, 6),
+            "child_cpu_sec": round(child_cpu - self._child_cpu, 6),
+            "peak_rss_mb": _mb(peak),
+            "rss_growth_mb": _mb(peak - self._peak),
+        }
+        if self.records is not None:
+            entry["records"] = int(self.records)
+            entry["records_per_sec"] = round(self.records / wall, 1) if wall > 0 else None
+        if self.tracer.profile == "tracemalloc":
+            entry["python_peak_mb"] = _mb(tracemalloc.get_traced_memory()[1])
+        if exc_type is not None:
+            entry["error"] = exc_type.__name__
+        self.tracer.stack.pop()
+        self.tracer.steps[self._index] = entry
+        return False
+
+
+class _NoStep:
+    # Stand-in when tracing is off: keeps `records` like a Step (callers may
+    # count into it) and measures nothing
+
+    def __init__(self, records=None):
+        self.records = records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class Tracer:
+    """
+    Collects the steps of one script run and writes them as a JSON trace.
+
+    profile="cprofile" also dumps cProfile stats of the whole run to
+    <trace>.prof (open with pstats or snakeviz); "tracemalloc" records each
+    step's Python allocation peak and dumps the top allocation sites to
+    <trace>.tracemalloc.txt. Both slow the run down; plain tracing does not
+    measurably.
+    """
+
+    def __init__(self, path, profile=None, script=None):
+        if profile not in (None, *PROFILERS):
+            raise ValueError(f"Unknown profiler: {profile} (expected one of {', '.join(PROFILERS)})")
+        self.path = path
+        self.profile = profile
+        self.script = script or os.path.basename(sys.argv[0])
+        self.steps = []
+        self.stack = []
+        self.pid = os.getpid()
+        self.started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._profiler = None
+        if profile == "tracemalloc":
+            tracemalloc.start()
+        elif profile == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._child_cpu = _usage()[0]
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+
+    def step(self, name, records=None):
+        return Step(self, name, records)
+
+    def trace(self):
+        wall = time.perf_counter() - self._wall
+        child_cpu, peak = _usage()
+        return {
+            "script": self.script,
+            "argv": sys.argv[1:],
+            "started": self.started,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "profile": self.profile,
+            "total": {
+                "wall_sec": round(wall, 6),
+                "cpu_sec": round(time.process_time() - self._cpu, 6),
+                "child_cpu_sec": round(child_cpu - self._child_cpu, 6),
+                "peak_rss_mb": _mb(peak),
+            },
+            "steps": [entry for entry in self.steps if entry is not None],
+        }
+
+    def finish(self):
+        """
+        Write the trace (and profiler dump) and print a summary to stderr.
+        """
+        if self._profiler is not None:
+            self._profiler.disable()
+        trace = self.trace()
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=2)
+        print_trace(trace, sys.stderr)
+        print(f"Step trace saved to '{self.path}'", file=sys.stderr)
+
+        if self._profiler is not None:
+            self._profiler.dump_stats(self.path + ".prof")
+            print(f"cProfile stats saved to '{self.path}.prof'", file=sys.stderr)
+        elif self.profile == "tracemalloc":
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            with open(self.path + ".tracemalloc.txt", "w", encoding="utf-8") as f:
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+            print(f"Top allocations saved to '{self.path}.tracemalloc.txt'", file=sys.stderr)
+
+
+_tracer = None
+
+
+def start(path, profile=None, script=None):
+    """
+    Turn tracing on for this process; the trace is written when it exits.
+    """
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    _tracer = Tracer(path, profile, script)
+    atexit.register(_finish)
+    return _tracer
+
+
+def _finish():
+    # Forked workers (multiprocessing) inherit the tracer but must not write it
+    if _tracer is not None and _tracer.pid == os.getpid():
+        _tracer.finish()
+
+
+def step(name, records=None):
+    """
+    Context manager timing one named step, e.g.
+
+        with step("Step 1: Load requests") as s:
+            df = load(...)
+            s.records = len(df)
+
+    Measures nothing unless tracing was started.
+    """
+    if _tracer is None:
+        return _NoStep(records)
+    return _tracer.step(name, records)
+
+
+def add_trace_arguments(parser):
+    parser.add_argument("--trace", metavar="PATH",
+                        help=f"write a JSON trace of each step's wall/CPU time, peak RSS and records/s "
+                             f"(or set {TRACE_ENV})")
+    parser.add_argument("--profile", choices=PROFILERS,
+                        help=f"with --trace, also dump cProfile stats or tracemalloc's top allocations "
+                             f"(or set {PROFILE_ENV})")
+
+
+def start_from_args(args):
+    """
+    Start tracing if --trace or STEP_TRACE asks for it.
+    """
+    path = getattr(args, "trace", None) or os.environ.get(TRACE_ENV)
+    profile = getattr(args, "profile", None) or os.environ.get(PROFILE_ENV) or None
+    if path:
+        return start(path, profile)
+    if profile:
+        raise SystemExit(f"--profile / {PROFILE_ENV} needs --trace or {TRACE_ENV}")
+    return None
+
+
+def print_trace(trace, file=sys.stdout):
+    total = trace["total"]
+    children = f" (+{total['child_cpu_sec']:.3f}s in child processes)" if total["child_cpu_sec"] else ""
+    print(f"\n{trace['script']}: {total['wall_sec']:.3f}s wall, {total['cpu_sec']:.3f}s CPU{children}, "
+          f"peak RSS {total['peak_rss_mb']:.1f} MB", file=file)
+    for entry in trace["steps"]:
+        name = "  " * entry["depth"] + entry["name"]
+        # CPU time includes worker processes that finished during the step
+        cpu = entry["cpu_sec"] + entry["child_cpu_sec"]
+        rate = entry.get("records_per_sec")
+        rate = f"{rate:>12,.0f} rec/s" if rate is not None else ""
+        print(f"  {name:<44} {entry['wall_sec']:>9.3f}s {cpu:>9.3f}s CPU "
+              f"{entry['peak_rss_mb']:>9.1f} MB{rate}", file=file)
+
+
+# Comparing traces
+
+# (metric, "higher" / "lower" is worse)
+COMPARE_METRICS = [
+    ("wall_sec", "higher"),
+    ("cpu_sec", "higher"),
+    ("peak_rss_mb", "higher"),
+    ("records_per_sec", "lower"),
+]
+
+
+def load_trace(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def step_totals(trace):
+    """
+    {step name: metrics} with repeated steps (loops, several files) summed;
+    peak RSS is the highest seen and records/s is recomputed from the sums.
+    """
+    totals = {}
+    for entry in trace["steps"]:
+        total = totals.setdefault(entry["name"], {"calls": 0, "wall_sec": 0.0, "cpu_sec": 0.0,
+                                                  "peak_rss_mb": 0.0})
+        total["calls"] += 1
+        total["wall_sec"] += entry["wall_sec"]
+        total["cpu_sec"] += entry["cpu_sec"]
+        total["peak_rss_mb"] = max(total["peak_rss_mb"], entry["peak_rss_mb"])
+        if "records" in entry:
+            total["records"] = total.get("records", 0) + entry["records"]
+    for total in totals.values():
+        if "records" in total and total["wall_sec"] > 0:
+            total["records_per_sec"] = total["records"] / total["wall_sec"]
+    totals["(total)"] = dict(trace["total"], calls=1)
+    return totals
+
+
+def compare_traces(baseline, current, threshold_pct=10.0, min_sec=0.05):
+    """
+    Rows of (step, metric, baseline, current, change %, regressed) for the
+    steps both traces have.
+
+    A change beyond threshold_pct percent in the worse direction is a
+    regression. Timings of steps under min_sec in both runs are too noisy
+    to judge, so only their peak RSS can regress.
+    """
+    base, new = step_totals(baseline), step_totals(current)
+    rows = []
+    for name in [name for name in new if name in base]:
+        short = max(base[name]["wall_sec"], new[name]["wall_sec"]) < min_sec
+        for metric, worse in COMPARE_METRICS:
+            before, after = base[name].get(metric), new[name].get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else float("nan")
+            regressed = (change > threshold_pct) if worse == "higher" else (change < -threshold_pct)
+            if short and metric != "peak_rss_mb":
+                regressed = False
+            rows.append((name, metric, before, after, change, regressed))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two step traces written with --trace.")
+    parser.add_argument("baseline", help="trace JSON of the reference run")
+    parser.add_argument("current", help="trace JSON of the run to check")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="relative change (%%) in time, RSS or records/s that counts as a regression")
+    parser.add_argument("--min-sec", type=float, default=0.05,
+                        help="ignore time changes of steps shorter than this in both runs")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on any regression")
+    args = parser.parse_args()
+
+    baseline, current = load_trace(args.baseline), load_trace(args.current)
+    if baseline.get("profile") != current.get("profile"):
+        print(f"Note: profilers differ ({baseline.get('profile')} vs {current.get('profile')}); "
+              f"profiled runs are slower")
+    rows = compare_traces(baseline, current, args.threshold, args.min_sec)
+    print(f"{'Step':<44} {'Metric':<16} {'Baseline':>12} {'Current':>12} {'Change':>9}")
+    for name, metric, before, after, change, regressed in rows:
+        print(f"{name:<44} {metric:<16} {before:>12,.3f} {after:>12,.3f} {change:>+8.1f}%"
+              f"{'  REGRESSION' if regressed else ''}")
+    missing = [entry for entry in step_totals(baseline) if entry not in step_totals(current)]
+    if missing:
+        print(f"\nSteps only in the baseline: {', '.join(missing)}")
+
+    regressed = sorted({name for name, *_, flag in rows if flag})
+    if regressed:
+        print(f"\nRegressions against {os.path.basename(args.baseline)}: {', '.join(regressed)}")
+    if args.fail_on_regression and regressed:
+        raise SystemExit(1)
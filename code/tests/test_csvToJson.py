@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from csvToJson import convert_chunked, convert_in_memory
+
+HEADER = "ARTICLE_ID,EXTRA,CATEGORY_ID,BODY_TEXT,AUTHOR_ID,LANGUAGE_ORIGINAL"
+ROWS = [
+    '0,x,1,"first, quoted",12,en',
+    "1,x,2,second,13,de",
+    "2,x,3,third,,fr",
+    # Too many fields: a bad line, skipped and counted
+    "3," + ",".join(["junk"] * 19),
+    # Too few fields: kept, missing cells empty
+    "4,x,5",
+    "5,x,6,sixth,15,en",
+]
+
+
+@pytest.fixture
+def goldset(tmp_path):
+    path = tmp_path / "GOLDSET.csv"
+    path.write_text("\n".join([HEADER] + ROWS) + "\n", encoding="utf-8")
+    return path
+
+
+def _convert(convert, goldset, tmp_path, name, *args):
+    output = tmp_path / f"{name}.json"
+    result = convert(str(goldset), str(tmp_path / f"{name}.csv"), str(output), *args)
+    return result, output.read_text(encoding="utf-8")
+
+
+def test_c_engine_matches_in_memory_read(goldset, tmp_path):
+    rows, expected = _convert(convert_in_memory, goldset, tmp_path, "python")
+    # Two-row chunks: the blank AUTHOR_ID only shows up in some of them
+    (chunked_rows, bad_lines), actual = _convert(convert_chunked, goldset, tmp_path, "c", "c", 2, 64 << 20, "json",
+                                                 "infer", True)
+    assert (chunked_rows, bad_lines) == (rows, 1) == (5, 1)
+    assert actual == expected
+    record = json.loads(actual)[0]
+    assert record["ARTICLE_ID"] == 0 and record["AUTHOR_ID"] == 12.0
+
+
+def test_c_engine_text_default(goldset, tmp_path):
+    (rows, bad_lines), actual = _convert(convert_chunked, goldset, tmp_path, "c", "c", 2)
+    records = json.loads(actual)
+    assert (rows, bad_lines) == (5, 1)
+    assert records[0]["ARTICLE_ID"] == "0"
+    assert records[3] == {"ARTICLE_ID": "4", "CATEGORY_ID": "5", "BODY_TEXT": None, "AUTHOR_ID": None,
+                          "LANGUAGE_ORIGINAL": None}
+    assert "junk" not in actual
+
+
+def _spy_read_csv(monkeypatch):
+    calls = []
+    read_csv = pd.read_csv
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", spy)
+    return calls
+
+
+def _passes(calls):
+    # Header reads (nrows=0) aside
+    return [kwargs for kwargs in calls if kwargs.get("nrows") != 0]
+
+
+def test_c_engine_reads_the_file_once(goldset, tmp_path, monkeypatch):
+    calls = _spy_read_csv(monkeypatch)
+    _convert(convert_chunked, goldset, tmp_path, "c", "c", 2)
+    assert len(_passes(calls)) == 1
+
+
+def test_c_engine_keep_long_rows_reads_only_extracted_columns(goldset, tmp_path, monkeypatch):
+    calls = _spy_read_csv(monkeypatch)
+    (rows, bad_lines), actual = _convert(convert_chunked, goldset, tmp_path, "c", "c", 2, 64 << 20, "json",
+                                         "infer", False, False)
+    passes = _passes(calls)
+    assert len(passes) == 1 and "EXTRA" not in passes[0]["usecols"]
+    # The long row is kept, truncated to the extracted columns
+    assert (rows, bad_lines) == (6, 0)
+    assert json.loads(actual)[3]["ARTICLE_ID"] == "3"
+
+
+def test_read_errors_only_cover_the_input(goldset, tmp_path):
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "csvToJson.py")
+    missing = subprocess.run([sys.executable, script, str(tmp_path / "missing.csv")], cwd=tmp_path,
+                             capture_output=True, text=True)
+    assert "Error reading CSV" in missing.stdout
+    unwritable = subprocess.run([sys.executable, script, str(goldset), "--output", str(tmp_path / "no" / "out.json")],
+                                cwd=tmp_path, capture_output=True, text=True)
+    assert "Error reading CSV" not in unwritable.stdout
+    assert unwritable.returncode != 0 and "FileNotFoundError" in unwritable.stderr
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from dataFilter import FilterPipeline, PartitionWriter, is_valid_content, process_and_format_json
+
+
+def test_partition_writer_rejects_columnar_formats(tmp_path):
+    with pytest.raises(ValueError):
+        PartitionWriter(str(tmp_path), fmt="parquet")
+
+
+RECORDS = [
+    {"articleText": "a", "sportsOutlet": "o", "eventId": 1, "leagueDivision": "US"},
+    {"articleText": "", "sportsOutlet": "o", "eventId": 2, "leagueDivision": "US"},
+    {"articleText": "c", "sportsOutlet": "o", "eventId": 3, "leagueDivision": "Canada"},
+    {"articleText": "d", "sportsOutlet": None, "eventId": 4, "leagueDivision": "US"},
+    {"articleText": "e", "sportsOutlet": "o", "eventId": 5, "leagueDivision": "US"},
+]
+
+
+def test_add_counts():
+    pipeline = FilterPipeline([is_valid_content, ("second", bool)]).add_counts(10, [3, 2])
+    assert (pipeline.seen, pipeline.passed) == (10, 5)
+    assert pipeline.rejected == {"is_valid_content": 3, "second": 2}
+    with pytest.raises(ValueError):
+        pipeline.add_counts(1, [1])
+
+
+@pytest.mark.parametrize("suffix", ["parquet", "arrow"])
+def test_columnar_counts_match_json(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    from columnarStore import ColumnarWriter
+
+    source = tmp_path / f"in.{suffix}"
+    with ColumnarWriter(str(source), batch_rows=2) as writer:
+        for item in RECORDS:
+            writer.write(item)
+    (tmp_path / "in.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+
+    expected = process_and_format_json(str(tmp_path / "in.json"), str(tmp_path / "out.json"))
+    actual = process_and_format_json(str(source), str(tmp_path / "out2.json"))
+    assert (actual.seen, actual.passed, actual.rejected) == (expected.seen, expected.passed, expected.rejected)
+    assert (actual.seen, actual.passed) == (5, 2)
+    assert json.loads((tmp_path / "out2.json").read_text(encoding="utf-8")) == \
+        json.loads((tmp_path / "out.json").read_text(encoding="utf-8"))
@@ -0,0 +1,41 @@
+from dedupContent import Deduplicator, MinHashIndex
+
+TEXT = "the quick brown fox jumps over the lazy dog while the cat sleeps on the warm mat all day long"
+
+
+def _run(records, **kwargs):
+    dedup = Deduplicator(["BODY_TEXT"], **kwargs)
+    kept = list(dedup.run(records, keep_removed=True))
+    return dedup, kept
+
+
+def test_exact_duplicates():
+    records = [{"ARTICLE_ID": n, "BODY_TEXT": text} for n, text in enumerate(["a b", "c d", "a b", "A  B"])]
+    dedup, kept = _run(records, id_field="ARTICLE_ID")
+    assert [item["ARTICLE_ID"] for item in kept] == [0, 1, 3]
+    assert dedup.removed == [(2, "exact", 0, 1.0)]
+
+    dedup, kept = _run([dict(item) for item in records], normalize=True, id_field="ARTICLE_ID")
+    assert [item["ARTICLE_ID"] for item in kept] == [0, 1]
+    assert dedup.exact == 2
+
+
+def test_near_duplicates():
+    records = [{"BODY_TEXT": TEXT}, {"BODY_TEXT": TEXT + " today"}, {"BODY_TEXT": "something else entirely"}]
+    dedup, kept = _run(records, near=MinHashIndex(threshold=0.7))
+    assert kept == [records[0], records[2]]
+    assert dedup.near_duplicates == 1
+    kind, original, similarity = dedup.removed[0][1:]
+    assert (kind, original) == ("near", 0) and similarity >= 0.7
+
+
+def test_eviction_bounds_index_with_missing_ids():
+    # Blank ID cells arrive as None; the ring buffer must still evict
+    index = MinHashIndex(max_entries=3)
+    records = [{"ARTICLE_ID": None, "BODY_TEXT": " ".join(f"w{n}x{word}" for word in range(20))}
+               for n in range(20)]
+    dedup, kept = _run(records, near=index, id_field="ARTICLE_ID")
+    assert len(kept) == 20
+    assert index.size == 3
+    assert index.evicted == 17
+    assert sum(len(slots) for table in index.tables for slots in table.values()) == 3 * index.bands
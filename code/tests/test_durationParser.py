@@ -0,0 +1,56 @@
+import datetime
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import durationParser
+from durationParser import parse_duration, parse_duration_series
+
+PIECES = ["1", "05", "5.5", " 3", "1_0", "٣", "nan", "inf", "", "x", "-2", "1e2", "0x1", "+4", "None",
+          "5.", ".5", "1e", "Infinity", "-0", "1e\t98", "1e 2", "\t7"]
+OTHERS = [None, float("nan"), 3.5, 7, "abc", datetime.time(1, 2, 3)]
+
+
+def _fuzz_values(count=20000, seed=1):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        parts = rng.randint(0, 3)
+        values.append(":".join(rng.choice(PIECES) for _ in range(parts)) if parts else rng.choice(OTHERS))
+    return values
+
+
+@pytest.fixture(params=["arrow", "pandas"])
+def backend(request, monkeypatch):
+    if request.param == "arrow":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(durationParser, "pc", None)
+    return request.param
+
+
+@pytest.mark.parametrize("dtype", [object, "str"])
+def test_series_matches_scalar_parser(backend, dtype):
+    values = _fuzz_values()
+    if dtype == "str":
+        values = [value if isinstance(value, str) else None for value in values]
+    series = pd.Series(values, dtype=dtype)
+    expected = series.map(parse_duration).astype(float).to_numpy()
+    actual = parse_duration_series(series).to_numpy()
+    assert (np.isnan(expected) == np.isnan(actual)).all()
+    parsed = ~np.isnan(expected)
+    assert np.allclose(expected[parsed], actual[parsed])
+
+
+def test_auto_formats(backend):
+    values = pd.Series(["01:02:03.5", "1700000000123", "2:30", None, "x"])
+    result = parse_duration_series(values, "auto").tolist()
+    assert result[:3] == [3723.5, 1700000000.123, 150.0]
+    assert np.isnan(result[3]) and np.isnan(result[4])
+
+
+def test_pandas_rejects_what_float_rejects(monkeypatch):
+    monkeypatch.setattr(durationParser, "pc", None)
+    assert np.isnan(parse_duration_series(pd.Series(["1e\t98:7"]))[0])
@@ -0,0 +1,37 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import formatJson
+from jsonStream import reformat_json
+
+DOCUMENTS = [
+    '{"a": 1, "b": 2, "a": 3}',
+    '{"z": [1, {"y": 2, "x": 3}], "b": "\\u00e9", "z": [], "c": {}}',
+    '[{"a": 1, "a": 2}, 3]',
+    '{}',
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("sort_keys", [True, False])
+@pytest.mark.parametrize("indent", [4, None])
+def test_reformat_matches_json_dump(tmp_path, document, sort_keys, indent):
+    source = tmp_path / "in.json"
+    source.write_text(document, encoding="utf-8")
+    output = tmp_path / "out.json"
+    reformat_json(str(source), str(output), indent=indent, sort_keys=sort_keys)
+    expected = json.dumps(json.loads(document), indent=indent, sort_keys=sort_keys)
+    assert output.read_text(encoding="utf-8") == expected
+
+
+def test_orjson_engine_defaults_to_indent_2(tmp_path):
+    pytest.importorskip("orjson")
+    source = tmp_path / "in.json"
+    source.write_text('{"b": [1, 2], "a": 1}', encoding="utf-8")
+    output = tmp_path / "out.json"
+    subprocess.run([sys.executable, formatJson.__file__, str(source), str(output), "--engine", "orjson"],
+                   check=True, capture_output=True)
+    assert json.loads(output.read_text()) == {"a": 1, "b": [1, 2]}
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import perfBatch
+from perfBatch import run_names
+
+LOG = """requestId,created,updated,status
+r0,16:11.498,16:21.309,COMPLETED
+r1,25:22.307,25:24.600,COMPLETED
+"""
+
+
+def test_run_names_keep_same_named_logs_apart():
+    names = run_names(["a/run.csv", "b/run.csv", "c/other.csv", "x/a/run.xlsx", "y/a/run.csv"])
+    assert len(set(names.values())) == 5
+    assert names["a/run.csv"] != names["b/run.csv"]
+    assert names["c/other.csv"] == "other"
+
+
+def _batch(tmp_path, *args):
+    return subprocess.run([sys.executable, perfBatch.__file__, *args, "--workers", "1",
+                           "--output", str(tmp_path / "comparison.csv")],
+                          cwd=tmp_path, capture_output=True, text=True)
+
+
+def test_missing_baseline_is_a_usage_error(tmp_path):
+    (tmp_path / "run.csv").write_text(LOG)
+    result = _batch(tmp_path, "run.csv", "--baseline", "missing.csv")
+    assert result.returncode == 2
+    assert "does not exist" in result.stderr
+
+
+def test_reports_of_same_named_logs_do_not_overwrite(tmp_path):
+    for node in ("node1", "node2"):
+        os.makedirs(tmp_path / node)
+        (tmp_path / node / "run.csv").write_text(LOG)
+    result = _batch(tmp_path, "node1/run.csv", "node2/run.csv", "--reports", "--raw-format", "none")
+    assert result.returncode == 0, result.stderr
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith(".xlsx")) == [
+        "node1_run_with_duration_summary.xlsx", "node2_run_with_duration_summary.xlsx"]
@@ -0,0 +1,55 @@
+import gc
+
+import pytest
+
+from dataFilter import REQUIRED_FIELDS, FilterPipeline, has_fields, is_valid_content
+from pipeline import FilterStage, run_pipeline
+
+RECORDS = [
+    {"articleText": "a", "sportsOutlet": "o", "eventId": 1, "leagueDivision": "US"},
+    {"articleText": "", "sportsOutlet": "o", "eventId": 2, "leagueDivision": "US"},
+    {"articleText": "c", "sportsOutlet": "o", "eventId": 3, "leagueDivision": "Canada"},
+    {"sportsOutlet": "o", "eventId": 4},
+]
+
+
+def test_has_fields_is_is_valid_content():
+    predicate = has_fields(REQUIRED_FIELDS)
+    assert [predicate(item) for item in RECORDS] == [is_valid_content(item) for item in RECORDS]
+    assert predicate.__name__ == is_valid_content.__name__
+
+
+def test_filter_stage_matches_data_filter():
+    expected = FilterPipeline([is_valid_content])
+    kept = list(expected.run(dict(item) for item in RECORDS))
+    report = run_pipeline((dict(item) for item in RECORDS), [FilterStage(values=["US", "Canada"])])
+    assert report["records"]["filter"] == len(kept) == 2
+    assert report["summaries"]["filter"]["rejected"]["is_valid_content"] == expected.rejected["is_valid_content"]
+
+
+class FailingStage:
+    name = "failing"
+
+    def __init__(self, after):
+        self.after = after
+
+    def __call__(self, records):
+        for n, item in enumerate(records, 1):
+            if n == self.after:
+                raise ValueError(f"bad record {n}")
+            yield item
+
+
+def _run_failing(mode):
+    source = ({"eventId": n} for n in range(5))
+    run_pipeline(source, [FailingStage(4)], mode=mode, queue_size=1, batch_size=1)
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_stage_error_does_not_hang(mode):
+    # The stage stops reading with upstream batches still queued; the feeder
+    # must give up instead of blocking the join forever
+    with pytest.raises(ValueError, match="bad record 4"):
+        _run_failing(mode)
+    # Thread mode joins its feeder when the abandoned generators are collected
+    gc.collect()
@@ -0,0 +1,28 @@
+import csv
+import json
+
+from resultCount import analyze_many
+
+
+def _results(*ids):
+    return {"results": [{"status": "Error", "requestId": eid} for eid in ids] +
+                       [{"status": "Completed", "result": [1]}]}
+
+
+def _error_ids(path):
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        rows = list(csv.reader(csvfile))
+    return [row[0] for row in rows[rows.index(["Error Request IDs"]) + 1:]]
+
+
+def test_analyze_many_dedups_unhashable_ids_in_input_order(tmp_path):
+    files = []
+    for n, ids in enumerate([("a", ["x", 1], "b"), ({"id": 2}, "a"), (["x", 1], "c", {"id": 2})]):
+        path = tmp_path / f"r{n}.json"
+        path.write_text(json.dumps(_results(*ids)), encoding="utf-8")
+        files.append(str(path))
+
+    summary = str(tmp_path / "summary.csv")
+    totals = analyze_many(files, summary, str(tmp_path / "by_file.csv"), workers=2, spill_after=1)
+    assert totals == {"total": 11, "completed": 3, "completed_with_results": 3, "error": 8}
+    assert _error_ids(summary) == ["a", "['x', 1]", "b", "{'id': 2}", "c"]
@@ -0,0 +1,29 @@
+import json
+
+from perfAnalyzerCore import StatusCriterion
+from resultJoin import join_latency
+
+# Numeric IDs with a blank one: read per chunk, 124 used to come out as "124.0"
+LOG = """requestId,created,updated,status
+123,16:11.498,16:21.309,COMPLETED
+,16:11.498,16:21.309,COMPLETED
+124,25:22.307,25:24.600,COMPLETED
+125,25:22.000,25:23.000,COMPLETED
+"""
+
+RESULTS = {"results": [
+    {"requestId": 123, "status": "Completed", "result": [1]},
+    {"requestId": "124", "status": "Completed", "result": []},
+    {"requestId": 125, "status": "Error"},
+]}
+
+
+def test_numeric_ids_match_with_blank_ids(tmp_path):
+    log = tmp_path / "log.csv"
+    log.write_text(LOG)
+    results = tmp_path / "results.json"
+    results.write_text(json.dumps(RESULTS))
+    join = join_latency([str(results)], str(log), StatusCriterion(), chunk_rows=2)
+    assert join.log_rows == 4
+    assert join.unmatched == 1
+    assert join.results_without_timing == 0
@@ -0,0 +1,46 @@
+import json
+
+import stepTrace
+from perfAnalyzerCore import StatusCriterion
+from perfStream import analyze_stream
+from resultJoin import join_latency
+
+LOG = """requestId,created,updated,status
+r0,16:11.498,16:21.309,COMPLETED
+r1,25:22.307,25:24.600,COMPLETED
+r2,25:22.000,25:23.000,ERROR
+"""
+
+RESULTS = {"results": [
+    {"requestId": "r0", "status": "Completed", "result": [1]},
+    {"requestId": "r1", "status": "Completed", "result": []},
+    {"requestId": "r2", "status": "Error"},
+]}
+
+
+def _log(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(LOG)
+    return str(path)
+
+
+def test_disabled_step_keeps_records():
+    assert stepTrace._tracer is None
+    with stepTrace.step("Count", records=0) as counted:
+        counted.records += 3
+    assert counted.records == 3
+
+
+def test_stream_analysis_without_tracing(tmp_path):
+    assert stepTrace._tracer is None
+    run = analyze_stream(_log(tmp_path), StatusCriterion(), chunk_rows=2)
+    assert run.metrics["total_requests"] == 3
+
+
+def test_result_join_without_tracing(tmp_path):
+    assert stepTrace._tracer is None
+    results = tmp_path / "results.json"
+    results.write_text(json.dumps(RESULTS))
+    join = join_latency([str(results)], _log(tmp_path), StatusCriterion(), chunk_rows=2)
+    assert join.log_rows == 3
+    assert join.unmatched == 0
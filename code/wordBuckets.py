@@ -0,0 +1,146 @@
+import argparse
+import bisect
+import re
+from collections import Counter
+
+import numpy as np
+
+# Upper bound (inclusive) of every bucket but the last, and the bucket names
+DEFAULT_BOUNDARIES = [500, 1000, 5000, 25000]
+DEFAULT_LABELS = ["Small", "Medium", "Large", "XLarge", "XXLarge"]
+DEFAULT_PERCENTILES = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+
+# Largest slice of text split at once when counting words
+WORD_WINDOW = 1 << 16
+
+_space = re.compile(r"\s")
+
+
+def count_words(text):
+    """
+    Count whitespace-separated words, same result as len(text.split()).
+
+    Long texts are split a window at a time (cut on whitespace), so the
+    temporary word list never grows past WORD_WINDOW characters' worth.
+    """
+    if len(text) <= WORD_WINDOW:
+        return len(text.split())
+    count = 0
+    start = 0
+    while start < len(text):
+        match = _space.search(text, start + WORD_WINDOW)
+        end = match.start() if match else len(text)
+        count += len(text[start:end].split())
+        start = end
+    return count
+
+
+class BucketEngine:
+    """
+    Assign word counts to size buckets from configurable boundaries.
+
+    A count belongs to the first bucket whose boundary it does not exceed;
+    anything above the last boundary goes to the final bucket. With the
+    defaults this is the Small/Medium/Large/XLarge/XXLarge ladder.
+    """
+
+    def __init__(self, boundaries=DEFAULT_BOUNDARIES, labels=DEFAULT_LABELS):
+        boundaries = list(boundaries)
+        labels = list(labels)
+        if len(labels) != len(boundaries) + 1:
+            raise ValueError(f"Expected {len(boundaries) + 1} labels for "
+                             f"{len(boundaries)} boundaries, got {len(labels)}")
+        if any(a >= b for a, b in zip(boundaries, boundaries[1:])):
+            raise ValueError(f"Boundaries must be strictly increasing: {boundaries}")
+        self.labels = labels
+        self._bounds = boundaries
+        self.boundaries = np.asarray(boundaries, dtype=np.int64)
+
+    @classmethod
+    def from_spec(cls, boundaries=None, labels=None):
+        """
+        Build an engine from comma-separated strings, e.g. "500,1000" and "S,M,L".
+        """
+        bounds = [int(b) for b in boundaries.split(",")] if boundaries else DEFAULT_BOUNDARIES
+        if labels:
+            names = [label.strip() for label in labels.split(",")]
+        elif bounds == DEFAULT_BOUNDARIES:
+            names = DEFAULT_LABELS
+        else:
+            names = [f"<={b}" for b in bounds] + [f">{bounds[-1]}"]
+        return cls(bounds, names)
+
+    def label(self, word_count):
+        """
+        Bucket name for a single word count.
+        """
+        return self.labels[bisect.bisect_left(self._bounds, word_count)]
+
+    def assign(self, word_counts):
+        """
+        Bucket index for every count in a batch, in one searchsorted call.
+        """
+        return np.searchsorted(self.boundaries, word_counts, side="left")
+
+    def categories(self, word_counts):
+        return np.asarray(self.labels, dtype=object)[self.assign(word_counts)]
+
+    def category_counts(self, word_counts):
+        """
+        Counter of bucket name -> number of records, like the script summary.
+        """
+        totals = np.bincount(self.assign(word_counts), minlength=len(self.labels))
+        return Counter({label: int(n) for label, n in zip(self.labels, totals) if n})
+
+
+def word_counts(records, field="CONTENT", counter=None):
+    """
+    Word count of every record's `field` as an int64 array.
+
+    `counter(item)` replaces the direct count, e.g. WordCountCache.word_count.
+    """
+    if counter is None:
+        return np.fromiter((count_words(item[field]) for item in records), dtype=np.int64)
+    return np.fromiter((counter(item) for item in records), dtype=np.int64)
+
+
+def percentiles(word_counts, q=DEFAULT_PERCENTILES):
+    if len(word_counts) == 0:
+        return {p: None for p in q}
+    return dict(zip(q, np.percentile(word_counts, q)))
+
+
+def histogram(word_counts, bins=10):
+    """
+    (counts, edges) of word counts; `bins` is a count or a list of edges.
+    """
+    return np.histogram(word_counts, bins=bins)
+
+
+def print_word_count_stats(word_counts, bins=10):
+    print("\nWord count percentiles:")
+    for p, value in percentiles(word_counts).items():
+        print(f"p{p}: {value:.0f}" if value is not None else f"p{p}: N/A")
+
+    if len(word_counts):
+        print("\nWord count histogram:")
+        counts, edges = histogram(word_counts, bins)
+        for n, low, high in zip(counts, edges, edges[1:]):
+            print(f"{low:>10.0f} - {high:<10.0f} {n}")
+
+
+if __name__ == "__main__":
+    # Re-bucket counts saved by categorizeContent.py --save-counts
+    parser = argparse.ArgumentParser(description="Re-bucket saved word counts.")
+    parser.add_argument("counts_file", help=".npy file of word counts")
+    parser.add_argument("--boundaries", help="comma-separated bucket upper bounds")
+    parser.add_argument("--labels", help="comma-separated bucket names")
+    parser.add_argument("--bins", type=int, default=10, help="histogram bins")
+    args = parser.parse_args()
+
+    from categorizeContent import print_summary
+
+    counts = np.load(args.counts_file)
+    engine = BucketEngine.from_spec(args.boundaries, args.labels)
+    print_summary(engine.category_counts(counts), len(counts), engine.labels)
+    print_word_count_stats(counts, args.bins)
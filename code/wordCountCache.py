@@ -0,0 +1,115 @@
+import hashlib
+import sqlite3
+import time
+
+from wordBuckets import count_words
+
+# Pending inserts/touches are written in batches of this many rows
+FLUSH_EVERY = 10000
+
+
+def content_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class WordCountCache:
+    """
+    Persistent SQLite cache of word counts, so reruns only count new or changed articles.
+
+    Records are keyed by `key_field` (e.g. "ARTICLE_ID") when given, with a
+    digest of the content stored to detect edits; otherwise the content digest
+    itself is the key. Every lookup stamps the entry with the current run, so
+    entries not seen for a while can be evicted with evict_stale().
+    """
+
+    def __init__(self, path, key_field=None, field="CONTENT"):
+        self.path = path
+        self.key_field = key_field
+        self.field = field
+        self.run_started = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._upserts = []
+        self._touches = []
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS word_counts ("
+            " key TEXT PRIMARY KEY,"
+            " digest BLOB NOT NULL,"
+            " word_count INTEGER NOT NULL,"
+            " category TEXT,"
+            " last_seen REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def word_count(self, item, engine=None):
+        """
+        Word count of item[field], from the cache when the content is unchanged.
+        """
+        text = item[self.field]
+        digest = content_digest(text)
+        key = str(item[self.key_field]) if self.key_field else digest.hex()
+        row = self.conn.execute(
+            "SELECT digest, word_count FROM word_counts WHERE key = ?", (key,)).fetchone()
+        if row and row[0] == digest:
+            self.hits += 1
+            self._touches.append((self.run_started, key))
+            count = row[1]
+        else:
+            self.misses += 1
+            count = count_words(text)
+            category = engine.label(count) if engine else None
+            self._upserts.append((key, digest, count, category, self.run_started))
+        if len(self._upserts) + len(self._touches) >= FLUSH_EVERY:
+            self.flush()
+        return count
+
+    def flush(self):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO word_counts VALUES (?, ?, ?, ?, ?)", self._upserts)
+            self.conn.executemany(
+                "UPDATE word_counts SET last_seen = ? WHERE key = ?", self._touches)
+        self._upserts.clear()
+        self._touches.clear()
+
+    def evict_stale(self, max_age_days=None):
+        """
+        Delete entries not seen for max_age_days, or not seen in this run if None.
+        """
+        self.flush()
+        cutoff = self.run_started
+        if max_age_days is not None:
+            cutoff -= max_age_days * 86400
+        with self.conn:
+            deleted = self.conn.execute(
+                "DELETE FROM word_counts WHERE last_seen < ?", (cutoff,)).rowcount
+        self.evicted += deleted
+        return deleted
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups * 100) if lookups else 0,
+            "evicted": self.evicted,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"\nCache ({self.path}): {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.2f}% hit rate), {stats['evicted']} evicted")
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()